@@ -1,54 +1,249 @@
 from flask import Flask, render_template, request, jsonify
 import os
 import ntpath
-from html_parser import parse_html
-from pdf_parser import parse_pdf
+import gzip
+import shutil
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from parser_dispatcher import detect_format, parse_program, supported_extensions
 from config import load_config, save_config
+from parse_cache import ParseCache, stream_digest
+from jobs import JobQueue, QueueFull
+from pricing import classify_material, price_program, program_total
+from quotes import QuoteStore
+from utils import get_directory_index
 
 app = Flask(__name__)
 app.config['UPLOAD_FOLDER'] = os.path.join(os.getcwd(), 'uploads')
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+# Maksymalny rozmiar pamięci podręcznej wyników parsowania (w bajtach)
+app.config['PARSE_CACHE_MAX_BYTES'] = 256 * 1024 * 1024
+
+# Czy zapisywać przesłane raporty w UPLOAD_FOLDER (parsowanie i tak odbywa się z pamięci)
+app.config['UPLOAD_PERSIST'] = False
+
+# Liczba procesów do równoległego przetwarzania stron dużych plików PDF. Domyślnie 1 –
+# odczyt równoległy trzeba włączyć jawnie; korzysta wtedy ze wspólnej puli procesów
+# pdf_parser (kontekst "spawn"), a nie z osobnej puli dla każdego żądania.
+app.config['PDF_WORKERS'] = 1
+
+# Liczba wątków parsujących przesłane pliki oraz limit zadań w kolejce
+app.config['UPLOAD_WORKERS'] = 2
+app.config['UPLOAD_QUEUE_SIZE'] = 8
+# Liczba plików parsowanych jednocześnie w ramach jednej partii (/upload_batch).
+# Partia zrównolegla tylko pliki – PDF-y w partii są parsowane bez puli procesów (pdf_workers=1).
+app.config['BATCH_PARSE_WORKERS'] = 4
+
+parse_cache = ParseCache(max_bytes=app.config['PARSE_CACHE_MAX_BYTES'])
+quote_store = QuoteStore()
+upload_jobs = JobQueue(workers=app.config['UPLOAD_WORKERS'], max_pending=app.config['UPLOAD_QUEUE_SIZE'])
 
 # Wczytanie konfiguracji przy starcie aplikacji
 config = load_config()
 
-def serialize_program(program):
-    """Konwertuje obiekt program na słownik."""
-    details = []
-    for d in program.details:
-        dims = d.dimensions.replace("mm", "").strip().split("x")
-        dim_x = dims[0].strip() if len(dims) >= 1 else ""
-        dim_y = dims[1].strip() if len(dims) >= 2 else ""
-        detail_dict = {
-            "image_path": d.image_path,
-            "name": d.name,
-            "dimensions": d.dimensions,
-            "dim_x": dim_x,
-            "dim_y": dim_y,
-            "bending_count": 0,   # Domyślnie 0
-            "cut_time": d.cut_time,
-            "quantity": d.quantity,
-            "weight": d.weight,   # Wartość potrzebna do obliczenia kosztu materiału
-            "cutting_cost": d.cutting_cost(config, program.material),
-            "material_cost": d.material_cost(config, program.material),
-            "total_cost": d.total_cost(config, program.material),
-            "total_cost_quantity": d.total_cost(config, program.material) * d.quantity
-        }
-        details.append(detail_dict)
-    return {
+# Nagłówek, którym klient wybiera format odpowiedzi z danymi programu
+RESPONSE_FORMAT_HEADER = "X-Response-Format"
+# Nagłówek z identyfikatorem sesji wyceny klienta (programy trzymane po stronie serwera)
+QUOTE_ID_HEADER = "X-Quote-Id"
+COLUMNAR_FORMAT = "columnar"
+# Odpowiedzi mniejsze niż ten rozmiar (w bajtach) nie są kompresowane
+GZIP_MIN_BYTES = 1024
+
+DETAIL_COLUMNS = [
+    "image_path", "name", "dimensions", "dim_x", "dim_y", "cut_time", "quantity", "weight",
+    "cutting_cost", "material_cost", "total_cost", "total_cost_quantity",
+]
+
+def split_dimensions(dimensions):
+    """Rozdziela napis "X x Y mm" na (dim_x, dim_y)."""
+    dims = dimensions.replace("mm", "").strip().split("x")
+    dim_x = dims[0].strip() if len(dims) >= 1 else ""
+    dim_y = dims[1].strip() if len(dims) >= 2 else ""
+    return dim_x, dim_y
+
+def serialize_program(program, columnar=False, quote=None):
+    """
+    Konwertuje obiekt program na słownik.
+    Koszty wszystkich detali są liczone jednym przebiegiem silnika wyceny (pricing),
+    a koszt programu sumuje te same wartości.
+    Przy columnar=True detale są zwracane jako tablice wartości dla każdej kolumny
+    zamiast listy słowników z powtarzającymi się kluczami.
+    Jeśli podano sesję wyceny, program jest w niej zapamiętywany, a wynik zawiera jego program_id.
+    """
+    pricing = price_program(program, config)
+    details = program.details
+    dims = [split_dimensions(d.dimensions) for d in details]
+    columns = {
+        "image_path": [d.image_path for d in details],
+        "name": [d.name for d in details],
+        "dimensions": [d.dimensions for d in details],
+        "dim_x": [dim_x for dim_x, _ in dims],
+        "dim_y": [dim_y for _, dim_y in dims],
+        "cut_time": [d.cut_time for d in details],
+        "quantity": [d.quantity for d in details],
+        "weight": [d.weight for d in details],   # Wartość potrzebna do obliczenia kosztu materiału
+        "cutting_cost": pricing.cutting_cost.tolist(),
+        "material_cost": pricing.material_cost.tolist(),
+        "total_cost": pricing.total_cost.tolist(),
+        "total_cost_quantity": pricing.total_cost_quantity.tolist(),
+    }
+    result = {
         "name": program.name,
         "material": program.material,
         "thicknes": program.thicknes,
         "machine_time": program.machine_time,
         "program_counts": program.program_counts,
-        "details": details,
-        "total_cost": program.total_cost(config)
+        "material_class": classify_material(program.material),
+        "total_cost": program_total(pricing, config)
     }
+    if quote is not None:
+        result["quote_id"] = quote.id
+        result["program_id"] = quote.add(program, config, pricing)
+    if columnar:
+        result["format"] = COLUMNAR_FORMAT
+        result["detail_count"] = len(program.details)
+        # Liczba gięć jest zawsze 0 przy wczytaniu – nie powtarzamy jej dla każdego detalu
+        result["detail_defaults"] = {"bending_count": 0}
+        result["details"] = columns
+    else:
+        result["details"] = [
+            {**dict(zip(DETAIL_COLUMNS, row)), "bending_count": 0}   # Domyślnie 0
+            for row in zip(*(columns[name] for name in DETAIL_COLUMNS))
+        ]
+    return result
+
+def wants_columnar():
+    return request.headers.get(RESPONSE_FORMAT_HEADER, "").lower() == COLUMNAR_FORMAT
+
+def request_quote():
+    """
+    Sesja wyceny wskazana nagłówkiem X-Quote-Id. Zwraca (sesja, odpowiedź błędu):
+    bez nagłówka (None, None), a dla nieznanego lub wygasłego identyfikatora (None, 404).
+    Sesje zakłada wyłącznie POST /quote.
+    """
+    quote_id = request.headers.get(QUOTE_ID_HEADER)
+    if not quote_id:
+        return None, None
+    quote = quote_store.get(quote_id)
+    if quote is None:
+        return None, (jsonify({"error": "Nieznana lub wygasła sesja wyceny – odśwież stronę."}), 404)
+    return quote, None
+
+def json_response(data, status=200):
+    """Odpowiedź JSON kompresowana gzipem, jeśli klient to akceptuje, a treść jest duża."""
+    response = jsonify(data)
+    response.status_code = status
+    response.vary.add("Accept-Encoding")
+    body = response.get_data()
+    if len(body) >= GZIP_MIN_BYTES and "gzip" in request.headers.get("Accept-Encoding", "").lower():
+        response.set_data(gzip.compress(body, compresslevel=6))
+        response.headers["Content-Encoding"] = "gzip"
+    return response
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
+PROGRAM_EXTENSIONS = supported_extensions()
+# Rysunki detali przesyłane razem z raportami HTML (wyszukiwane po nazwie w katalogu raportu)
+DRAWING_EXTENSIONS = (".bmp", ".png", ".jpg", ".jpeg", ".gif")
+
+def receive_upload(file, directory):
+    """
+    Odbiera przesłany raport bez pośredniego pliku: skrót SHA-256 jest liczony w trakcie
+    czytania strumienia żądania, a parsery dostają bajty bezpośrednio.
+    Zwraca (ścieżka, skrót, zawartość). Ścieżka wskazuje katalog, w którym parser HTML
+    szuka rysunków; plik powstaje tylko przy UPLOAD_PERSIST, pod nazwą ze skrótu treści,
+    więc równoczesne przesłania plików o tej samej nazwie się nie nadpisują.
+    """
+    digest, data = stream_digest(file.stream)
+    base_name = ntpath.basename(file.filename)
+    if not app.config['UPLOAD_PERSIST']:
+        return os.path.join(directory, base_name), digest, data
+    path = os.path.join(directory, digest + os.path.splitext(base_name)[1].lower())
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    return path, digest, data
+
+def load_program(file_path, digest, data, job=None, pdf_workers=None):
+    """
+    Zwraca program z pamięci podręcznej albo parsuje treść pliku i zapisuje wynik w cache.
+    Format wybierany jest po sygnaturze treści, a rozszerzenie rozstrzyga tylko, gdy jej brak.
+    pdf_workers – liczba procesów dla stron PDF (domyślnie PDF_WORKERS).
+    """
+    if job:
+        job.set_stage("cache")
+    fmt = detect_format(file_path, data)
+    context = None
+    if fmt.name == "html":
+        # Ścieżki rysunków w wyniku HTML zależą od plików w katalogu raportu
+        context = get_directory_index(os.path.dirname(file_path)).signature(DRAWING_EXTENSIONS)
+    cache_key = parse_cache.key(digest, fmt.name, context)
+    program = parse_cache.get(cache_key)
+    if program is None:
+        if job:
+            job.set_stage("parsing")
+        if pdf_workers is None:
+            pdf_workers = app.config['PDF_WORKERS']
+        program = parse_program(file_path, data=data, fmt=fmt, pdf_workers=pdf_workers)
+        parse_cache.put(cache_key, program)
+    return program
+
+def process_upload(job, file_path, digest, data, columnar=False, quote=None):
+    """Zadanie kolejki – parsuje przesłany plik (lub bierze wynik z cache) i zwraca dane programu."""
+    program = load_program(file_path, digest, data, job)
+    job.set_stage("pricing")
+    return serialize_program(program, columnar, quote)
+
+def process_batch(job, files, batch_dir, columnar=False, quote=None):
+    """
+    Zadanie kolejki dla wielu plików – parsuje je współbieżnie i zwraca zbiorczą odpowiedź.
+    Błąd jednego pliku nie przerywa pozostałych: trafia do listy "errors".
+    Współbieżność jest jednopoziomowa: pliki w wątkach, PDF-y bez własnej puli procesów.
+    Katalog partii (rysunki detali) jest usuwany po zakończeniu zadania, chyba że włączono UPLOAD_PERSIST.
+    """
+    results = [None] * len(files)
+    errors = []
+    job.set_parsed(0, len(files))
+    try:
+        with ThreadPoolExecutor(max_workers=app.config['BATCH_PARSE_WORKERS']) as executor:
+            futures = {
+                executor.submit(load_program, file_path, digest, data, pdf_workers=1): (index, original_name)
+                for index, (original_name, file_path, digest, data) in enumerate(files)
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                index, original_name = futures[future]
+                try:
+                    results[index] = (original_name, future.result())
+                except Exception as e:
+                    print(f"Błąd parsowania pliku {original_name}:", e)
+                    errors.append({"filename": original_name, "error": str(e)})
+                job.set_parsed(done, len(files))
+    finally:
+        if not app.config['UPLOAD_PERSIST']:
+            shutil.rmtree(batch_dir, ignore_errors=True)
+    job.set_stage("pricing")
+    programs = []
+    for item in results:
+        if item is not None:
+            original_name, program = item
+            programs.append({"filename": original_name, "program": serialize_program(program, columnar, quote)})
+    return {"programs": programs, "errors": errors}
+
+def queue_response(job_or_error, **extra):
+    """Odpowiedź na zlecenie zadania: 202 z identyfikatorem albo 503, gdy kolejka jest pełna."""
+    if isinstance(job_or_error, QueueFull):
+        response = jsonify({"error": f"Serwer jest zajęty – spróbuj ponownie za chwilę. {job_or_error}", **extra})
+        response.headers["Retry-After"] = "5"
+        return response, 503
+    response = jsonify({**job_or_error.to_dict(), **extra})
+    response.headers["Location"] = f"/jobs/{job_or_error.id}"
+    return response, 202
+
 @app.route('/upload', methods=['POST'])
 def upload():
     if 'file' not in request.files:
@@ -56,19 +251,77 @@ def upload():
     file = request.files['file']
     if file.filename == '':
         return jsonify({"error": "Nie wybrano pliku"}), 400
-    filename = os.path.join(app.config['UPLOAD_FOLDER'], file.filename)
-    file.save(filename)
-    ext = os.path.splitext(filename)[1].lower()
-    program = None
-    if ext == ".html":
-        program = parse_html(filename)
-    elif ext == ".pdf":
-        program = parse_pdf(filename)
-    else:
+    ext = os.path.splitext(file.filename)[1].lower()
+    if ext not in PROGRAM_EXTENSIONS:
         return jsonify({"error": "Nieobsługiwany typ pliku"}), 400
+    quote, error = request_quote()
+    if error:
+        return error
+    file_path, digest, data = receive_upload(file, app.config['UPLOAD_FOLDER'])
+    try:
+        job = upload_jobs.submit(file.filename, process_upload, file_path, digest, data,
+                                 wants_columnar(), quote)
+    except QueueFull as e:
+        return queue_response(e)
+    return queue_response(job)
+
+@app.route('/upload_batch', methods=['POST'])
+def upload_batch():
+    """
+    Przyjmuje wiele plików (np. cały upuszczony katalog) w jednym żądaniu.
+    Raporty HTML/PDF i programy LST są parsowane współbieżnie (z pamięci) w jednym zadaniu kolejki;
+    rysunki detali są tylko zapisywane w katalogu partii, aby parser HTML mógł je znaleźć.
+    Pliki innych typów są pomijane i zgłaszane w odpowiedzi.
+    """
+    uploaded = [f for f in request.files.getlist('files') if f.filename]
+    if not uploaded:
+        return jsonify({"error": "Brak plików"}), 400
+    accepted = []
+    skipped = []
+    for file in uploaded:
+        # Przy upuszczeniu katalogu nazwa zawiera ścieżkę względną
+        base_name = ntpath.basename(file.filename)
+        ext = os.path.splitext(base_name)[1].lower()
+        if ext in PROGRAM_EXTENSIONS + DRAWING_EXTENSIONS:
+            accepted.append((file, base_name, ext))
+        else:
+            skipped.append(file.filename)
+    if not any(ext in PROGRAM_EXTENSIONS for _, _, ext in accepted):
+        return jsonify({"error": "Brak plików HTML/PDF/LST", "skipped": skipped}), 400
+    quote, error = request_quote()
+    if error:
+        return error
+    # Osobny katalog dla partii – rysunki o tej samej nazwie z różnych partii się nie nadpisują.
+    # Raporty są parsowane z pamięci; na dysk trafiają tylko rysunki (i raporty przy UPLOAD_PERSIST).
+    batch_dir = os.path.join(app.config['UPLOAD_FOLDER'], uuid.uuid4().hex)
+    programs = []
+    used_names = set()
+    for index, (file, base_name, ext) in enumerate(accepted):
+        if ext in PROGRAM_EXTENSIONS:
+            file_path, digest, data = receive_upload(file, batch_dir)
+            programs.append((file.filename, file_path, digest, data))
+            continue
+        if base_name.lower() in used_names:
+            base_name = f"{index}_{base_name}"
+        used_names.add(base_name.lower())
+        os.makedirs(batch_dir, exist_ok=True)
+        file.save(os.path.join(batch_dir, base_name))
+    try:
+        job = upload_jobs.submit(f"{len(programs)} plików", process_batch, programs, batch_dir, wants_columnar(),
+                                 quote)
+    except QueueFull as e:
+        if not app.config['UPLOAD_PERSIST']:
+            shutil.rmtree(batch_dir, ignore_errors=True)
+        return queue_response(e, skipped=skipped)
+    return queue_response(job, skipped=skipped)
 
-    program_data = serialize_program(program)
-    return jsonify(program_data)
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = upload_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Nieznane zadanie"}), 404
+    # Wynik zakończonego zadania może zawierać tysiące detali – kompresujemy go
+    return json_response(job.to_dict())
 
 @app.route('/update_config', methods=['POST'])
 def update_config():
@@ -80,7 +333,27 @@ def update_config():
     # Aktualizujemy globalną konfigurację
     global config
     config = load_config()
-    return jsonify({"success": True, "config": config})
+    response = {"success": True, "config": config}
+    # Klient z sesją wyceny dostaje tylko zmienione koszty wierszy programów,
+    # których materiał ma nową stawkę – pozostałe programy nie są przeliczane
+    quote, _ = request_quote()
+    if quote is not None:
+        changed_classes, deltas = quote.reprice(config)
+        response["changed_material_classes"] = sorted(changed_classes)
+        response["deltas"] = deltas
+    return json_response(response)
+
+@app.route('/quote', methods=['POST'])
+def create_quote():
+    """Zakłada sesję wyceny; identyfikator (losowy, z serwera) klient wysyła potem w nagłówku X-Quote-Id."""
+    return jsonify({"quote_id": quote_store.create().id}), 201
+
+@app.route('/quote/<quote_id>/programs/<program_id>', methods=['DELETE'])
+def remove_quote_program(quote_id, program_id):
+    quote = quote_store.get(quote_id)
+    if quote is None or not quote.remove(program_id):
+        return jsonify({"error": "Nieznany program"}), 404
+    return jsonify({"success": True})
 
 @app.route('/get_config', methods=['GET'])
 def get_config():
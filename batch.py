@@ -0,0 +1,195 @@
+"""
+Wsadowe przetwarzanie katalogu raportów (HTML/PDF) i programów LST z linii poleceń.
+
+Pliki są parsowane równolegle w puli procesów, a wyniki (programy i detale
+wycenione według config.json) są strumieniowane jako JSONL lub CSV.
+Na końcu na stderr wypisywane jest podsumowanie przepustowości.
+
+Przykład:
+    python batch.py raporty/ --format csv -o wynik.csv --workers 8
+"""
+
+import argparse
+import csv
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from config import load_config
+from parser_dispatcher import detect_format, parse_program, supported_extensions
+from pricing import price_program, program_total
+from utils import set_temp_image_dir
+
+SUPPORTED_EXTENSIONS = supported_extensions()
+
+CSV_COLUMNS = [
+    "file", "program", "material", "thicknes", "machine_time", "program_counts",
+    "detail", "quantity", "dimensions", "cut_time", "weight",
+    "cutting_cost", "material_cost", "total_cost", "total_cost_quantity",
+]
+
+
+def find_reports(directory: str) -> list:
+    """Zwraca posortowaną listę plików raportów w katalogu (rekursywnie)."""
+    paths = []
+    for root, dirs, files in os.walk(directory):
+        for f in files:
+            if os.path.splitext(f)[1].lower() in SUPPORTED_EXTENSIONS:
+                paths.append(os.path.join(root, f))
+    paths.sort()
+    return paths
+
+
+def count_pages(file_path: str, fmt=None) -> int:
+    fmt = fmt or detect_format(file_path)
+    if fmt is not None and fmt.name == "pdf":
+        import fitz
+        with fitz.open(file_path) as doc:
+            return doc.page_count
+    return 1
+
+
+def parse_report(file_path: str, config: dict) -> dict:
+    """
+    Funkcja procesu roboczego – parsuje jeden plik i zwraca wycenione dane programu.
+    Błędy parsowania są zwracane w polu "error", aby nie przerywać całej partii.
+    """
+    start = time.perf_counter()
+    result = {"file": file_path, "pages": 0}
+    try:
+        fmt = detect_format(file_path)
+        program = parse_program(file_path, fmt=fmt)
+        result["pages"] = count_pages(file_path, fmt)
+        pricing = price_program(program, config)
+        details = []
+        for i, d in enumerate(program.details):
+            details.append({
+                "name": d.name,
+                "quantity": d.quantity,
+                "dimensions": d.dimensions,
+                "cut_time": d.cut_time,
+                "weight": d.weight,
+                "cutting_cost": pricing.cutting_cost[i],
+                "material_cost": pricing.material_cost[i],
+                "total_cost": pricing.total_cost[i],
+                "total_cost_quantity": pricing.total_cost_quantity[i],
+            })
+        result["program"] = {
+            "name": program.name,
+            "material": program.material,
+            "thicknes": program.thicknes,
+            "machine_time": program.machine_time,
+            "program_counts": program.program_counts,
+            "details": details,
+            "total_cost": program_total(pricing, config),
+        }
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def _init_worker(image_dir: str):
+    """
+    Parsery wypisują diagnostykę na stdout – w procesach roboczych kierujemy ją do os.devnull.
+    Obrazy detali (niepotrzebne do wyceny) trafiają do katalogu tymczasowego przebiegu,
+    a nie do static/images/generated aplikacji.
+    """
+    sys.stdout = open(os.devnull, "w")
+    set_temp_image_dir(image_dir)
+
+
+class JsonlWriter:
+    def __init__(self, out):
+        self.out = out
+
+    def write(self, result: dict):
+        self.out.write(json.dumps(result, ensure_ascii=False) + "\n")
+        self.out.flush()
+
+
+class CsvWriter:
+    """Jeden wiersz na detal; pliki z błędem dają jeden wiersz z pustymi polami detalu."""
+
+    def __init__(self, out):
+        self.out = out
+        self.writer = csv.DictWriter(out, fieldnames=CSV_COLUMNS + ["error"], extrasaction="ignore")
+        self.writer.writeheader()
+
+    def write(self, result: dict):
+        program = result.get("program")
+        if program is None:
+            self.writer.writerow({"file": result["file"], "error": result.get("error", "")})
+        else:
+            base = {
+                "file": result["file"],
+                "program": program["name"],
+                "material": program["material"],
+                "thicknes": program["thicknes"],
+                "machine_time": program["machine_time"],
+                "program_counts": program["program_counts"],
+            }
+            for d in program["details"]:
+                row = dict(base)
+                row.update(d)
+                row["detail"] = d["name"]
+                self.writer.writerow(row)
+        self.out.flush()
+
+
+def print_summary(results: list, elapsed: float, slowest: int, stream=sys.stderr):
+    files = len(results)
+    pages = sum(r["pages"] for r in results)
+    errors = [r for r in results if "error" in r]
+    print(f"Plików: {files} (błędy: {len(errors)}), stron: {pages}, czas: {elapsed:.2f} s", file=stream)
+    if elapsed > 0:
+        print(f"Przepustowość: {files / elapsed:.2f} plików/s, {pages / elapsed:.2f} stron/s", file=stream)
+    if slowest:
+        print("Najwolniejsze pliki:", file=stream)
+        for r in sorted(results, key=lambda r: r["seconds"], reverse=True)[:slowest]:
+            print(f"  {r['seconds']:8.3f} s  {r['file']}", file=stream)
+    for r in errors:
+        print(f"Błąd: {r['file']}: {r['error']}", file=stream)
+
+
+def run_batch(directory: str, out, output_format: str = "jsonl", workers: int = None, slowest: int = 5) -> list:
+    paths = find_reports(directory)
+    config = load_config()
+    writer = CsvWriter(out) if output_format == "csv" else JsonlWriter(out)
+    results = []
+    start = time.perf_counter()
+    image_dir = tempfile.mkdtemp(prefix="batch_images_")
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(image_dir,)) as executor:
+            futures = [executor.submit(parse_report, path, config) for path in paths]
+            for future in as_completed(futures):
+                result = future.result()
+                writer.write(result)
+                results.append(result)
+    finally:
+        shutil.rmtree(image_dir, ignore_errors=True)
+    print_summary(results, time.perf_counter() - start, slowest)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Wsadowa wycena raportów HTML/PDF z katalogu.")
+    parser.add_argument("directory", help="Katalog z raportami (przeszukiwany rekursywnie)")
+    parser.add_argument("-f", "--format", choices=["jsonl", "csv"], default="jsonl", help="Format wyjścia")
+    parser.add_argument("-o", "--output", help="Plik wyjściowy (domyślnie stdout)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Liczba procesów (domyślnie liczba rdzeni)")
+    parser.add_argument("--slowest", type=int, default=5, help="Ile najwolniejszych plików pokazać w podsumowaniu")
+    args = parser.parse_args(argv)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as out:
+            run_batch(args.directory, out, args.format, args.workers, args.slowest)
+    else:
+        run_batch(args.directory, sys.stdout, args.format, args.workers, args.slowest)
+
+
+if __name__ == "__main__":
+    main()
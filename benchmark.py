@@ -0,0 +1,350 @@
+"""
+Benchmark parserów z generatorami syntetycznych raportów.
+
+Generatory tworzą (w katalogu tymczasowym) raporty PDF starego i nowego typu,
+raporty HTML w układzie z komentarzami-kotwicami (cp1250) oraz pliki LST
+z sekcjami BEGIN_PARTS_IN_PROGRAM i START_TEXT/STOP_TEXT. Rozmiar raportów
+jest ustawiany liczbą detali, stron i punktów konturu.
+
+Mierzony jest najlepszy czas z kilku powtórzeń oraz szczytowe zużycie pamięci
+(tracemalloc – tylko alokacje Pythona, bez pamięci bibliotek C jak PyMuPDF).
+Wyniki trafiają do pliku JSON; z opcją --compare porównywane są z zapisaną
+linią bazową, a regresje powyżej progu kończą program kodem 1.
+
+Przykład:
+    python benchmark.py --details 500 --points 2000 --save
+    python benchmark.py --details 500 --points 2000 --compare
+"""
+
+import argparse
+import contextlib
+import gc
+import importlib.util
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BASELINE_FILE = "benchmark_baseline.json"
+
+# Czcionki TTF z polskimi znakami – wbudowane czcionki PDF (Base14) ich nie obsługują
+FONT_CANDIDATES = [
+    r"C:\Windows\Fonts\arial.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/dejavu/DejaVuSans.ttf",
+    "/Library/Fonts/Arial.ttf",
+]
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842
+LINE_HEIGHT = 11
+
+
+def find_font() -> str:
+    for path in FONT_CANDIDATES:
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError("Nie znaleziono czcionki TTF z polskimi znakami – podaj ją opcją --font")
+
+
+# ---------------------------------------------------------------------------
+# Generatory raportów
+# ---------------------------------------------------------------------------
+
+def _detail_values(i: int) -> dict:
+    return {
+        "name": f"DETAL_{i:05d}",
+        "quantity": 1 + i % 7,
+        "x": 20 + (i * 13) % 900,
+        "y": 15 + (i * 29) % 600,
+        "minutes": 0.05 + (i % 50) / 100,
+        "weight": 0.1 + (i % 40) / 10,
+    }
+
+
+def _write_pdf(path: str, lines: list, font: str, min_pages: int = 1, with_images: bool = False,
+               image_marker: str = None):
+    """Zapisuje linie tekstu do PDF (łamanie stron co tyle linii, ile zmieści się na stronie)."""
+    import fitz
+    doc = fitz.open()
+    per_page = (PAGE_HEIGHT - 80) // LINE_HEIGHT
+    pages = [lines[i:i + per_page] for i in range(0, len(lines), per_page)] or [[]]
+    while len(pages) < min_pages:
+        pages.append([])
+    pixmap = None
+    if with_images:
+        pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 32, 32), False)
+        pixmap.clear_with(128)
+    for page_lines in pages:
+        page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+        y = 40
+        for line in page_lines:
+            page.insert_text((40, y), line, fontname="F0", fontfile=font, fontsize=8)
+            if pixmap is not None and image_marker and line.startswith(image_marker):
+                page.insert_image(fitz.Rect(480, y - 8, 512, y + 24), pixmap=pixmap)
+            y += LINE_HEIGHT
+    doc.save(path)
+    doc.close()
+
+
+def make_old_pdf(path: str, details: int, font: str, pages: int = 1, with_images: bool = True):
+    lines = [
+        "RAPORT PROGRAMU",
+        "NAZWA PROGRAMU: PROG0001AB",
+        "MATERIAŁ (ARKUSZ): 1.4301-3 3000x1500",
+        "CZAS MASZYNOWY: 01:23:45.00 [h:m:s]",
+        "ILOŚĆ PRZEBIEGÓW PROGRAMU: 2",
+        "INFORMACJA O DETALU",
+        "INFORMACJA O DETALU",
+    ]
+    for i in range(1, details + 1):
+        v = _detail_values(i)
+        lines += [
+            f"NUMER CZĘŚCI: {i}",
+            "NAZWA PLIKU GEO:",
+            f"C:\\Geometrie\\Kunde\\{v['name']}.geo",
+            f"ILOŚĆ: {v['quantity']}",
+            f"WYMIARY: {v['x']},000 x {v['y']},000 mm",
+            f"CZAS OBRÓBKI: {v['minutes']:.2f} min",
+            f"CIĘŻAR: {v['weight']:.3f} kg".replace(".", ","),
+        ]
+    _write_pdf(path, lines, font, pages, with_images, image_marker="NUMER CZĘŚCI")
+
+
+def make_new_pdf(path: str, details: int, font: str, pages: int = 1, with_plan: bool = True,
+                 with_images: bool = True):
+    lines = []
+    if with_plan:
+        lines.append("Plan konfiguracji: 1")
+    lines += [
+        "Liczba detali:  Liczba arkuszy:",
+        f"PROG0002  {details}  1",
+        "S235JR----3000x1500 (1.0038)",
+        "3000,00 x 1500,00 x 3,00 mm",
+        "Czas trwania",
+        "0:45:12  3",
+        "Informacja o pojedynczych detalach/zleceniu",
+    ]
+    for i in range(1, details + 1):
+        v = _detail_values(i)
+        lines += [
+            f"Nr części: {i}",
+            f"Plik geo: C:\\Geometrie\\{v['name']}.geo",
+            f"{v['x']},00 x {v['y']},00 mm",
+            f"Szt.: {v['quantity']}",
+            f"00:{int(v['minutes'] * 60) // 60:02d}:{int(v['minutes'] * 60) % 60:02d}",
+            f"Masa detalu: {v['weight']:.2f} kg".replace(".", ","),
+        ]
+    lines.append("Zlecenia wykonania")
+    _write_pdf(path, lines, font, pages, with_images, image_marker="Nr części")
+
+
+def make_html(path: str, details: int):
+    rows = []
+    for i in range(1, details + 1):
+        v = _detail_values(i)
+        block = [
+            f'<tr><td><img src="{v["name"]}.BMP"></td><td>NUMER CZĘŚCI: {i}</td></tr>',
+            f'<tr><td>NAZWA PLIKU GEO:</td><td>C:\\Geometrie\\{v["name"]}.GEO</td></tr>',
+            f'<tr><td>ILOŚĆ:</td><td>{v["quantity"]}</td></tr>',
+            f'<tr><td>WYMIARY:</td><td>{v["x"]},000 x {v["y"]},000 mm</td></tr>',
+            f'<tr><td>CZAS OBRÓBKI:</td><td>{v["minutes"]:.2f} min</td></tr>',
+            f'<tr><td>CIĘŻAR:</td><td>{v["weight"]:.3f} kg</td></tr>',
+        ]
+        block += ['<tr><td>&nbsp;</td><td>&nbsp;</td></tr>'] * (15 - len(block))
+        rows.extend(block)
+    html = "\n".join([
+        "<html><head><title>Raport</title></head><body>",
+        "<table>",
+        "<!--Programm-Nummer und Bemerkung-->",
+        "<tr><td>Program:</td><td><b>PROG0003</b></td></tr>",
+        "<!--Material (Technologietabelle)-->",
+        "<tr><td>Materiał:</td><td><b>1.0038-5 3000x1500</b></td></tr>",
+        "<!--Maschinenzeit/Tafel-->",
+        "<tr><td>Czas:</td><td><nobr>1:02:03 [h:m:s]</nobr></td></tr>",
+        "<!--Anzahl Programmdurchlauefe-->",
+        "<tr><td>Powtórzenia:</td><td>4</td></tr>",
+        "</table>",
+        "<!--HTML-Block: Einzelteil-Informationen mit Grafiken, ohne Barcode-->",
+        "<table>",
+        *rows,
+        "</table>",
+        "</body></html>",
+    ])
+    with open(path, "w", encoding="cp1250") as f:
+        f.write(html)
+
+
+LST_COLUMNS = [
+    "Geometriefilename", "Anzahl", "Bearbeitungszeit", "Abmessung X", "Abmessung Y",
+    "Gewicht", "Teilenummer", "Drehlage", "Schnittlaenge", "Reserve 1", "Reserve 2",
+    "Reserve 3", "Tafel X", "Tafel Y", "Reserve 4", "Laser X", "Laser Y",
+]
+
+
+def make_lst(path: str, details: int, points: int):
+    import math
+    out = ["BEGIN_EINRICHTEPLAN_INFO", "C", "ZA,MM,2",
+           "MM,AT,1,'   ',1,2,1,1,'Material',T,'C1'", "MM,AT,1,'   ',2,2,1,1,'Blechdicke',T,'C2'",
+           "ZA,DA,1", "DA,'1.0038',3.000", "ENDE_EINRICHTEPLAN_INFO", "BEGIN_PARTS_IN_PROGRAM", "C",
+           f"ZA,MM,{len(LST_COLUMNS)}"]
+    for idx, col in enumerate(LST_COLUMNS, start=1):
+        out.append(f"MM,AT,1,'   ',{idx},2,1,1,'{col}',T,'C{idx}'")
+    out.append(f"ZA,DA,{details}")
+    for i in range(1, details + 1):
+        v = _detail_values(i)
+        out.append(f"DA,'C:\\Geometrie\\{v['name']}.GEO',{v['quantity']},{v['minutes']:.2f},"
+                   f"{v['x']}.000,{v['y']}.000,{v['weight']:.3f},{i},0,")
+        out.append(f"*{2 * (v['x'] + v['y']):.3f},0,0,0,{v['x']}.000,{v['y']}.000,0,"
+                   f"{v['x'] / 2:.3f},{v['y'] / 2:.3f}")
+    out += ["ENDE_PARTS_IN_PROGRAM", "BEGIN_PROGRAMM"]
+    n = 10
+    for i in range(1, details + 1):
+        v = _detail_values(i)
+        out += ["START_TEXT", f"({v['name']}.GEO)", f"N{n}G90", f"N{n + 10}G0X{v['x'] / 2:.3f}Y0.000"]
+        n += 20
+        for k in range(points):
+            a = 2 * math.pi * k / points
+            out.append(f"N{n}G1X{v['x'] / 2 * math.cos(a):.3f}Y{v['y'] / 2 * math.sin(a):.3f}")
+            n += 10
+        out.append("STOP_TEXT")
+    out.append("ENDE_PROGRAMM")
+    with open(path, "w", encoding="cp1250") as f:
+        f.write("\n".join(out) + "\n")
+
+
+# ---------------------------------------------------------------------------
+# Pomiar
+# ---------------------------------------------------------------------------
+
+def measure(func, repeat: int) -> dict:
+    """Najlepszy czas z `repeat` wywołań oraz szczyt pamięci z osobnego przebiegu pod tracemalloc."""
+    best = None
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(repeat):
+            gc.collect()
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        gc.collect()
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {"seconds": round(best, 6), "peak_kb": round(peak / 1024, 1)}
+
+
+def cold_import(module: str, cwd: str):
+    """Import modułu w nowym interpreterze (zimny start) – katalog roboczy cwd, moduły z katalogu benchmarku."""
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, "-c", f"import {module}"], cwd=cwd, env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def build_cases(work_dir: str, args) -> dict:
+    from html_parser import parse_html
+    from lst_parser import LSTParser
+    from lst_geo_extractor import extract_geo_data_from_lst
+    from lst_metrics import measure_file
+
+    cases = {}
+    html_path = os.path.join(work_dir, "report.html")
+    make_html(html_path, args.details)
+    cases["parse_html"] = lambda: parse_html(html_path)
+    cases["parse_html_bs4"] = lambda: parse_html(html_path, engine="bs4")
+
+    lst_path = os.path.join(work_dir, "program.LST")
+    make_lst(lst_path, args.details, args.points)
+    with open(lst_path, "r", encoding="cp1250") as f:
+        lst_content = f.read()
+    with open(lst_path, "rb") as f:
+        lst_bytes = f.read()
+    cases["lst_parse_content"] = lambda: LSTParser().parse_content(lst_content)
+    cases["lst_parse_bytes"] = lambda: LSTParser().parse_bytes(lst_bytes)
+    cases["lst_measure_file"] = lambda: measure_file(lst_path)
+    cases["extract_geo_data_from_lst"] = lambda: extract_geo_data_from_lst(lst_path)
+
+    # Zimny start: parsery i ich biblioteki ładowane są dopiero przy pierwszym pliku (parser_dispatcher)
+    cases["startup_batch"] = lambda: cold_import("batch", work_dir)
+    if importlib.util.find_spec("flask"):
+        cases["startup_app"] = lambda: cold_import("app", work_dir)
+
+    if not args.skip_pdf:
+        from pdf_parser import parse_pdf
+        font = args.font or find_font()
+        old_path = os.path.join(work_dir, "old.pdf")
+        new_path = os.path.join(work_dir, "new.pdf")
+        new_noplan_path = os.path.join(work_dir, "new_noplan.pdf")
+        make_old_pdf(old_path, args.details, font, args.pages)
+        make_new_pdf(new_path, args.details, font, args.pages, with_plan=True)
+        make_new_pdf(new_noplan_path, args.details, font, args.pages, with_plan=False)
+        cases["parse_pdf_old"] = lambda: parse_pdf(old_path)
+        cases["parse_pdf_new"] = lambda: parse_pdf(new_path)
+        cases["parse_pdf_new_without_plan"] = lambda: parse_pdf(new_noplan_path)
+    return cases
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get("cases", {}).get(name)
+        if not base or not base.get("seconds"):
+            continue
+        ratio = result["seconds"] / base["seconds"]
+        if ratio > threshold:
+            regressions.append((name, base["seconds"], result["seconds"], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark parserów raportów i plików LST.")
+    parser.add_argument("--details", type=int, default=200, help="Liczba detali w raporcie")
+    parser.add_argument("--pages", type=int, default=1, help="Minimalna liczba stron raportów PDF")
+    parser.add_argument("--points", type=int, default=500, help="Liczba punktów konturu detalu w LST")
+    parser.add_argument("--repeat", type=int, default=3, help="Liczba powtórzeń każdego pomiaru")
+    parser.add_argument("--font", help="Czcionka TTF do generowania PDF")
+    parser.add_argument("--skip-pdf", action="store_true", help="Pomiń przypadki PDF")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="Plik linii bazowej (JSON)")
+    parser.add_argument("--save", action="store_true", help="Zapisz wyniki jako nową linię bazową")
+    parser.add_argument("--compare", action="store_true", help="Porównaj wyniki z linią bazową")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Próg regresji (krotność czasu bazowego)")
+    args = parser.parse_args(argv)
+
+    sizes = {"details": args.details, "pages": args.pages, "points": args.points}
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        cases = build_cases(work_dir, args)
+        for name, func in cases.items():
+            results[name] = measure(func, args.repeat)
+            print(f"{name:32s} {results[name]['seconds']:10.4f} s  {results[name]['peak_kb']:12.1f} KiB")
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sizes": sizes,
+        "cases": results,
+    }
+    exit_code = 0
+    if args.compare:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("sizes") != sizes:
+            print(f"Uwaga: rozmiary linii bazowej ({baseline.get('sizes')}) różnią się od bieżących ({sizes})")
+        regressions = compare(results, baseline, args.threshold)
+        for name, before, after, ratio in regressions:
+            print(f"REGRESJA {name}: {before:.4f} s -> {after:.4f} s (x{ratio:.2f})")
+        if regressions:
+            exit_code = 1
+    if args.save:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4, ensure_ascii=False)
+        print(f"Zapisano linię bazową: {args.baseline}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,9 +3,8 @@ import os
 import ntpath
 from PySide6 import QtCore, QtGui, QtWidgets
 from PySide6.QtWidgets import QMainWindow, QFileDialog, QTableWidgetItem
-from html_parser import parse_html
-from pdf_parser import parse_pdf
 from config import load_config
+from parser_dispatcher import detect_format, parse_program, supported_extensions
 from models import Program
 
 
@@ -32,6 +31,16 @@ class Ui_MainWindow(object):
         self.btn_Open_File.setGeometry(QtCore.QRect(1, 9, 121, 28))
         self.btn_Open_File.setObjectName("btn_Open_File")
 
+        # Liczba procesów do równoległego parsowania stron PDF
+        self.label_Pdf_Workers = QtWidgets.QLabel(self.tab)
+        self.label_Pdf_Workers.setGeometry(QtCore.QRect(1, 45, 80, 25))
+        self.label_Pdf_Workers.setObjectName("label_Pdf_Workers")
+        self.spin_Pdf_Workers = QtWidgets.QSpinBox(self.tab)
+        self.spin_Pdf_Workers.setGeometry(QtCore.QRect(82, 45, 40, 25))
+        self.spin_Pdf_Workers.setRange(1, os.cpu_count() or 1)
+        self.spin_Pdf_Workers.setValue(os.cpu_count() or 1)
+        self.spin_Pdf_Workers.setObjectName("spin_Pdf_Workers")
+
         # Etykieta ścieżki programu
         self.label_Program_Path = QtWidgets.QLabel(self.tab)
         self.label_Program_Path.setGeometry(QtCore.QRect(0, 200, 135, 25))
@@ -174,6 +183,7 @@ class Ui_MainWindow(object):
         _translate = QtCore.QCoreApplication.translate
         MainWindow.setWindowTitle(_translate("MainWindow", "LassSup"))
         self.btn_Open_File.setText(_translate("MainWindow", "Wczytaj plik"))
+        self.label_Pdf_Workers.setText(_translate("MainWindow", "Procesy PDF:"))
         self.label_Program_Path.setText(_translate("MainWindow", "Ścieżka programu:"))
         self.groupBox_ProgramDatas.setTitle(_translate("MainWindow", "Dane programu:"))
         self.label_Program_Name.setText(_translate("MainWindow", "Nazwa programu:"))
@@ -194,19 +204,17 @@ class Ui_MainWindow(object):
 
     def OpenFileDialog(self):
         home_dir = os.path.expanduser("~")
-        fname, _ = QFileDialog.getOpenFileName(None, 'Otwórz plik', home_dir, 'Pliki HTML/PDF (*.html *.pdf)')
+        patterns = " ".join("*" + ext for ext in supported_extensions())
+        fname, _ = QFileDialog.getOpenFileName(None, 'Otwórz plik', home_dir, f'Pliki HTML/PDF/LST ({patterns})')
         if fname:
             # Czyszczenie tabeli przy każdym nowym wczytaniu pliku
             self.tableWidget.setRowCount(0)
             self.lbl_Program_Path_Value.setHidden(False)
             self.lbl_Program_Path_Value.setText(fname)
-            ext = os.path.splitext(fname)[1].lower()
-            if ext == ".html":
-                self.current_program = parse_html(fname)
-            elif ext == ".pdf":
-                self.current_program = parse_pdf(fname)
-            else:
+            fmt = detect_format(fname)
+            if fmt is None:
                 return
+            self.current_program = parse_program(fname, fmt=fmt, pdf_workers=self.spin_Pdf_Workers.value())
             self.lbl_Program_Name_Value.setHidden(False)
             self.lbl_Program_Name_Value.setText(self.current_program.name)
             self.lbl_Material_Value.setHidden(False)
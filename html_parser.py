@@ -1,161 +1,555 @@
 import os
 import ntpath
 import re
-from bs4 import BeautifulSoup, Comment
+from html.entities import html5
+from html.parser import HTMLParser
 from models import Program, Detail
-from utils import copy_image_to_static, normalize_filename, find_file_recursive
+from utils import copy_image_to_static, normalize_filename, get_directory_index
 
-def parse_html(file_path: str) -> Program:
-    """Parsuje plik HTML z danymi programu laserowego i zwraca obiekt Program."""
-    with open(file_path, "r", encoding="cp1250") as f:
-        html_content = f.read()
+PROGRAM_NAME_ANCHOR = "Programm-Nummer und Bemerkung"
+MATERIAL_ANCHOR = "Material (Technologietabelle)"
+MACHINE_TIME_ANCHOR = "Maschinenzeit/Tafel"
+PROGRAM_COUNTS_ANCHOR = "Anzahl Programmdurchlauefe"
+DETAILS_ANCHOR = "HTML-Block: Einzelteil-Informationen mit Grafiken, ohne Barcode"
+
+# Kotwica komentarza -> (pole nagłówka, znacznik w następnym wierszu-rodzeństwie, z którego bierzemy tekst)
+SIBLING_ANCHORS = {
+    PROGRAM_NAME_ANCHOR: ("program_name", "b"),
+    MATERIAL_ANCHOR: ("material", "b"),
+    MACHINE_TIME_ANCHOR: ("machine_time", "nobr"),
+}
+
+# Elementy puste HTML – tak jak w BeautifulSoup zamykane od razu po otwarciu
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "keygen", "link", "menuitem",
+    "meta", "param", "source", "track", "wbr", "basefont", "bgsound", "command", "frame",
+    "image", "isindex", "nextid", "spacer",
+}
+
+# Tekst tych elementów nie wchodzi do get_text() w BeautifulSoup (napisy Script, Stylesheet,
+# TemplateString, RubyTextString, RubyParenthesisString); CDATA jest zawsze tekstem
+NON_TEXT_ELEMENTS = {"script", "style", "template", "rt", "rp"}
+
+
+def parse_html(file_path: str, engine: str = "fast", data: bytes = None) -> Program:
+    """
+    Parsuje plik HTML z danymi programu laserowego i zwraca obiekt Program.
+    engine="fast" – zdarzenia html.parser bez budowania drzewa (domyślny),
+    engine="bs4" – pełne drzewo BeautifulSoup (wzorcowa implementacja, ten sam wynik).
+    Jeśli podano data, treść jest dekodowana z pamięci – file_path wskazuje wtedy
+    tylko katalog, w którym szukamy rysunków detali (plik nie musi istnieć).
+    """
+    if data is not None:
+        # Odpowiednik open(..., encoding="cp1250"): uniwersalne znaki końca linii
+        html_content = data.decode("cp1250").replace("\r\n", "\n").replace("\r", "\n")
+    else:
+        with open(file_path, "r", encoding="cp1250") as f:
+            html_content = f.read()
+    if engine == "bs4":
+        header, rows = _scan_bs4(html_content)
+    else:
+        header, rows = _scan_events(html_content)
+    details = _build_details(rows, file_path)
+
+    program = Program(
+        name=header["program_name"],
+        material=header["material"],
+        thicknes=header["thicknes"],
+        machine_time=header["machine_time"],
+        program_counts=header["program_counts"],
+        details=details
+    )
+    return program
+
+
+def _empty_header() -> dict:
+    return {"program_name": "", "material": "", "thicknes": "", "machine_time": "", "program_counts": ""}
+
+
+def _apply_header_value(header: dict, field: str, text: str):
+    """Przetwarza tekst znaleziony przy kotwicy i zapisuje go w nagłówku."""
+    if field == "program_name":
+        header["program_name"] = text
+    elif field == "material":
+        material_sub = text[:10]
+        try:
+            minus_index = material_sub.index('-')
+            header["material"] = material_sub[:minus_index]
+        except ValueError:
+            header["material"] = material_sub
+        try:
+            thicknes_str = text[minus_index + 1:minus_index + 2].strip()
+            header["thicknes"] = abs(float(thicknes_str))
+        except (ValueError, UnboundLocalError):
+            header["thicknes"] = 10000
+    elif field == "machine_time":
+        index = text.find('[')
+        header["machine_time"] = text[:index].strip() if index != -1 else text
+    elif field == "program_counts":
+        for txt in text:
+            if txt.isdigit():
+                header["program_counts"] = int(txt)
+                break
+
+
+def _scan_bs4(html_content: str):
+    """
+    Odczytuje nagłówek programu i wiersze tabeli detali z drzewa BeautifulSoup.
+    Wiersz to lista komórek (tekst, src pierwszego obrazka lub None).
+    """
+    from bs4 import BeautifulSoup, Comment
     soup = BeautifulSoup(html_content, 'html.parser')
 
     # Odczytujemy wszystkie komentarze
     comments = soup.find_all(string=lambda text: isinstance(text, Comment))
 
-    # Parsowanie danych programu z komentarzy
-    program_name = ""
-    material = ""
-    thicknes = ""
-    machine_time = ""
-    program_counts = ""
-
+    header = _empty_header()
     for comment in comments:
-        if comment.strip() == "Programm-Nummer und Bemerkung":
-            tr = comment.find_next_sibling('tr')
-            if tr:
-                b_tag = tr.find('b')
-                if b_tag:
-                    program_name = b_tag.get_text(strip=True)
-        elif comment.strip() == "Material (Technologietabelle)":
-            tr = comment.find_next_sibling('tr')
-            if tr:
-                b_tag = tr.find('b')
-                if b_tag:
-                    material_string = b_tag.get_text(strip=True)
-                    material_sub = material_string[:10]
-                    try:
-                        minus_index = material_sub.index('-')
-                        material = material_sub[:minus_index]
-                    except ValueError:
-                        material = material_sub
-                    try:
-                        thicknes_str = material_string[minus_index + 1:minus_index + 2].strip()
-                        thicknes = abs(float(thicknes_str))
-                    except (ValueError, UnboundLocalError):
-                        thicknes = 10000
-        elif comment.strip() == "Maschinenzeit/Tafel":
+        anchor = comment.strip()
+        if anchor in SIBLING_ANCHORS:
+            field, tag_name = SIBLING_ANCHORS[anchor]
             tr = comment.find_next_sibling('tr')
             if tr:
-                nobr_tag = tr.find('nobr')
-                if nobr_tag:
-                    text = nobr_tag.get_text(strip=True)
-                    index = text.find('[')
-                    machine_time = text[:index].strip() if index != -1 else text
-        elif comment.strip() == "Anzahl Programmdurchlauefe":
+                tag = tr.find(tag_name)
+                if tag:
+                    _apply_header_value(header, field, tag.get_text(strip=True))
+        elif anchor == PROGRAM_COUNTS_ANCHOR:
             tr = comment.find_next('tr')
             if tr:
-                tds = tr.find_all('td')
-                for td in tds:
-                    txt = td.get_text(strip=True)
-                    if txt.isdigit():
-                        program_counts = int(txt)
-                        break
-
-    # Parsowanie detali z sekcji "HTML-Block: Einzelteil-Informationen mit Grafiken, ohne Barcode"
-    details = []
-    detail_comment = None
+                _apply_header_value(header, "program_counts", [td.get_text(strip=True) for td in tr.find_all('td')])
+
+    rows = []
     for comment in comments:
-        if comment.strip() == "HTML-Block: Einzelteil-Informationen mit Grafiken, ohne Barcode":
-            detail_comment = comment
+        if comment.strip() == DETAILS_ANCHOR:
+            table = comment.find_next('table')
+            if table:
+                for tr in table.find_all('tr'):
+                    cells = []
+                    for td in tr.find_all('td'):
+                        img_tag = td.find("img")
+                        src = img_tag["src"] if img_tag and img_tag.has_attr("src") else None
+                        cells.append((td.get_text(strip=True), src))
+                    rows.append(cells)
             break
-    if detail_comment:
-        table = detail_comment.find_next('table')
-        if table:
-            rows = table.find_all('tr')
-            i = 0
-            while i < len(rows):
-                tds = rows[i].find_all('td')
-                if len(tds) >= 2 and "NUMER CZĘŚCI:" in tds[1].get_text(strip=True):
-                    detail_data = {}
-                    img_tag = tds[0].find("img")
-                    if img_tag and img_tag.has_attr("src"):
-                        image_src = img_tag["src"].strip()
-                        image_src_norm = normalize_filename(image_src)
-                        base = os.path.basename(image_src_norm)
-                        directory = os.path.dirname(file_path)
-                        original_image_path = find_file_recursive(directory, base)
-                        print(f"Normalized image path: {repr(original_image_path)}")
-                        if original_image_path and os.path.exists(original_image_path):
-                            image_path = copy_image_to_static(original_image_path)
-                            print(f"Image copied to: {image_path}")
-                        else:
-                            image_path = None
-                            print("File not found after normalization.")
-                    else:
-                        image_path = None
-                    for j in range(i, min(i + 15, len(rows))):
-                        cells = rows[j].find_all('td')
-                        if len(cells) < 2:
-                            continue
-                        key = cells[0].get_text(strip=True)
-                        value = cells[1].get_text(strip=True)
-                        if key.upper().startswith("NAZWA PLIKU GEO:"):
-                            value = ntpath.basename(value)
-                            value_pure = ntpath.splitext(value)[0]
-                            detail_data["geo_file"] = value_pure
-                        elif key.upper().startswith("ILOŚĆ:"):
-                            try:
-                                detail_data["quantity"] = int(value)
-                            except ValueError:
-                                detail_data["quantity"] = 1
-                        elif key.upper().startswith("WYMIARY:"):
-                            m = re.match(r"([\d,\.]+)\s*x\s*([\d,\.]+)", value)
-                            if m:
-                                x = float(m.group(1).replace(',', '.'))
-                                y = float(m.group(2).replace(',', '.'))
-                                detail_data["dimensions"] = f"{x:.2f} x {y:.2f} mm"
-                            else:
-                                detail_data["dimensions"] = value
-                        elif key.upper().startswith("CZAS OBRÓBKI:") and value.endswith("min"):
-                            m = re.search(r'([\d\.]+)\s*min', value, re.IGNORECASE)
-                            if m:
-                                minutes = float(m.group(1))
-                                seconds = int(round(minutes * 60))
-                                detail_data["cut_time"] = seconds / 3600.0
-                            else:
-                                detail_data["cut_time"] = 0.0
-                        elif key.upper().startswith("CIĘŻAR:") and value.endswith("kg"):
-                            m = re.search(r'([\d,\.]+)\s*kg', value, re.IGNORECASE)
-                            if m:
-                                detail_data["weight"] = float(m.group(1).replace(',', '.'))
-                            else:
-                                detail_data["weight"] = 0.0
-                    if ("geo_file" in detail_data and "quantity" in detail_data and
-                        "dimensions" in detail_data and "cut_time" in detail_data):
-                        detail_data.setdefault("cut_length", 0.0)
-                        detail_data.setdefault("weight", 0.0)
-                        detail = Detail(
-                            name=detail_data["geo_file"],
-                            quantity=detail_data["quantity"],
-                            dimensions=detail_data["dimensions"],
-                            cut_time=detail_data["cut_time"],
-                            cut_length=detail_data["cut_length"],
-                            weight=detail_data["weight"],
-                            image_path=image_path if image_path and os.path.exists(image_path) else None
-                        )
-                        details.append(detail)
-                    i += 15
+    return header, rows
+
+
+# Kody 0x80–0x9F w odwołaniach &#...; są znakami windows-1252 (jak w bs4.dammit.UnicodeDammit)
+_WINDOWS_1252_REFERENCES = {}
+for _code in range(0x80, 0xA0):
+    try:
+        _WINDOWS_1252_REFERENCES[_code] = bytes([_code]).decode("cp1252")
+    except UnicodeDecodeError:
+        pass
+_DECIMAL_REFERENCE_RE = re.compile("^([0-9]+)(.*)")
+_HEX_REFERENCE_RE = re.compile("^([0-9a-f]+)(.*)")
+_entity_characters = None
+
+
+def _entity_character(name: str):
+    """Znak encji nazwanej (nazwa bez średnika) – tabela jak EntitySubstitution w bs4."""
+    global _entity_characters
+    if _entity_characters is None:
+        characters = {}
+        for name_with_semicolon, character in sorted(html5.items()):
+            characters.setdefault(name_with_semicolon.rstrip(";"), character)
+        _entity_characters = characters
+    return _entity_characters.get(name)
+
+
+def _character_reference(name: str) -> tuple:
+    """
+    Odwołanie numeryczne &#...; jako (znak, pozostały tekst) – tak jak
+    BeautifulSoupHTMLParser.handle_charref (liczba z prefiksu nazwy, reszta jest tekstem).
+    """
+    base = 10
+    reference_re = _DECIMAL_REFERENCE_RE
+    if name[:1] in ("x", "X"):
+        name = name[1:]
+        base = 16
+        reference_re = _HEX_REFERENCE_RE
+    extra = ""
+    try:
+        code = int(name, base)
+    except ValueError:
+        match = reference_re.search(name)
+        if match is None:
+            return "", name
+        code = int(match.group(1), base)
+        extra = match.group(2)
+    if code == 0 or code > 0x10FFFF or 0xD800 <= code <= 0xDFFF:
+        return "\ufffd", extra
+    return _WINDOWS_1252_REFERENCES.get(code) or chr(code), extra
+
+
+class _ReportParser(HTMLParser):
+    """
+    Tokenizacja raportu tym samym html.parser.HTMLParser, którego używa BeautifulSoup
+    (features="html.parser"), z obsługą zdarzeń jak w BeautifulSoupHTMLParser:
+    kolejne fragmenty tekstu i odwołania do znaków łączą się w jeden napis aż do
+    najbliższego znacznika, komentarza lub deklaracji, a zawartość <![CDATA[...]]>
+    jest osobnym napisem. Dzięki temu podział na znaczniki i tekst jest identyczny
+    z engine="bs4" także dla uszkodzonego HTML. Strukturę odtwarza _ReportScanner.
+    """
+
+    def __init__(self, scanner):
+        super().__init__(convert_charrefs=False)
+        self.scanner = scanner
+        self.data = []
+        # Elementy puste zamknięte przy otwarciu – ich znacznik zamykający jest pomijany
+        self.already_closed_empty_element = []
+
+    def flush(self, cdata=False):
+        if self.data:
+            text = "".join(self.data)
+            self.data = []
+            self.scanner._text(text, cdata)
+
+    def handle_starttag(self, tag, attrs):
+        self.flush()
+        self.scanner._start(tag, attrs)
+        if tag in VOID_ELEMENTS:
+            self.already_closed_empty_element.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.flush()
+        self.scanner._start(tag, attrs)
+        self.flush()
+        self.scanner._end(tag)
+
+    def handle_endtag(self, tag):
+        if tag in self.already_closed_empty_element:
+            self.already_closed_empty_element.remove(tag)
+            return
+        self.flush()
+        self.scanner._end(tag)
+
+    def handle_data(self, data):
+        self.data.append(data)
+
+    def handle_charref(self, name):
+        character, extra = _character_reference(name)
+        if character:
+            self.data.append(character)
+        if extra:
+            self.data.append(extra)
+
+    def handle_entityref(self, name):
+        character = _entity_character(name)
+        self.data.append(character if character is not None else "&" + name)
+
+    def handle_comment(self, data):
+        self.flush()
+        self.scanner._comment(data)
+
+    def handle_decl(self, decl):
+        self.flush()
+
+    def handle_pi(self, data):
+        self.flush()
+
+    def unknown_decl(self, data):
+        self.flush()
+        if data.upper().startswith("CDATA["):
+            self.data.append(data[len("CDATA["):])
+            self.flush(cdata=True)
+
+    def close(self):
+        super().close()
+        self.flush()
+        self.scanner.finish()
+
+
+class _Element:
+    __slots__ = ("name", "texts", "img_seen", "img_src", "sibling_wants", "child_wants", "collects_tds",
+                 "on_close")
+
+    def __init__(self, name):
+        self.name = name
+        self.texts = None          # lista fragmentów tekstu, jeśli zbieramy get_text() elementu
+        self.img_seen = False
+        self.img_src = None
+        self.sibling_wants = None  # kotwice czekające na <tr> będący dzieckiem tego elementu
+        self.child_wants = None    # (znacznik, pole, numer kotwicy) – pierwszy potomek o tej nazwie
+        self.collects_tds = None   # listy komórek, do których trafiają potomne <td>
+        self.on_close = None
+
+
+class _ReportScanner:
+    """
+    Jednoprzebiegowy, zdarzeniowy odczyt raportu. Odtwarza semantykę wywołań
+    BeautifulSoup z _scan_bs4 (find_next_sibling, find_next, find_all, get_text(strip=True))
+    bez budowania drzewa: stos otwartych elementów jest zamykany tak samo
+    jak w BeautifulSoup (elementy puste od razu, znacznik zamykający zdejmuje
+    ze stosu wszystko do ostatniego elementu o tej nazwie).
+    Liczniki obserwatorów pozwalają pominąć całą logikę dla znaczników, na które nikt nie czeka.
+    """
+
+    def __init__(self):
+        self.root = _Element("[document]")
+        self.stack = [self.root]
+        self.capturing = 0       # otwarte elementy zbierające tekst
+        self.td_collectors = 0   # otwarte elementy zbierające potomne <td>
+        self.child_watchers = 0  # otwarte <tr> czekające na pierwszy <b>/<nobr>
+        self.open_cells = 0      # otwarte komórki, w których szukamy obrazka
+        self.non_text = 0        # otwarte elementy NON_TEXT_ELEMENTS – ich tekst nie wchodzi do get_text()
+        self.header_values = {}  # pole -> (numer kotwicy, wartość) – wygrywa ostatnia kotwica
+        self.anchor_count = 0
+        self.next_tr_wants = []
+        self.detail_state = "before"
+        self.detail_table = None
+        self.rows = []
+
+    def finish(self):
+        while len(self.stack) > 1:
+            self._close(self.stack.pop())
+
+    # --- tekst -----------------------------------------------------------
+
+    def _text(self, raw, cdata=False):
+        if not self.capturing or (self.non_text and not cdata):
+            return
+        text = raw.strip()
+        if text:
+            for element in self.stack:
+                if element.texts is not None:
+                    element.texts.append(text)
+
+    # --- znaczniki ---------------------------------------------------------
+
+    def _start(self, tag, attrs):
+        element = _Element(tag)
+
+        if tag == "tr":
+            parent = self.stack[-1]
+            if parent.sibling_wants:
+                element.child_wants = parent.sibling_wants
+                parent.sibling_wants = None
+                self.child_watchers += 1
+            if self.next_tr_wants:
+                cells = []
+                orders = self.next_tr_wants
+                self.next_tr_wants = []
+                element.collects_tds = [cells]
+                element.on_close = [lambda cells=cells, orders=orders: self._resolve_counts(cells, orders)]
+            if self.detail_state == "in_table":
+                cells = []
+                self.rows.append(cells)
+                element.collects_tds = (element.collects_tds or []) + [cells]
+            if element.collects_tds:
+                self.td_collectors += 1
+        elif tag == "table":
+            if self.detail_state == "waiting":
+                self.detail_state = "in_table"
+                self.detail_table = element
+        elif tag == "td":
+            if self.td_collectors:
+                element.texts = []
+                self.capturing += 1
+                self.open_cells += 1
+                for open_element in self.stack:
+                    if open_element.collects_tds:
+                        for cells in open_element.collects_tds:
+                            cells.append(element)
+        elif tag == "img":
+            if self.open_cells:
+                src = None
+                for name, value in attrs:
+                    # Ostatnie wystąpienie atrybutu wygrywa, jak w BeautifulSoup
+                    if name == "src":
+                        src = value or ""
+                for open_element in self.stack:
+                    if open_element.name == "td" and open_element.texts is not None and not open_element.img_seen:
+                        open_element.img_seen = True
+                        open_element.img_src = src
+        elif tag in NON_TEXT_ELEMENTS:
+            self.non_text += 1
+
+        if self.child_watchers:
+            self._match_child_wants(element)
+
+        if tag in VOID_ELEMENTS:
+            self._close(element)
+        else:
+            self.stack.append(element)
+
+    def _match_child_wants(self, element):
+        tag = element.name
+        for open_element in self.stack:
+            if not open_element.child_wants:
+                continue
+            remaining = []
+            for want in open_element.child_wants:
+                tag_name, field, order = want
+                if tag_name == tag:
+                    if element.texts is None:
+                        element.texts = []
+                        self.capturing += 1
+                    element.on_close = (element.on_close or []) + [
+                        lambda element=element, field=field, order=order:
+                        self._set_header(field, order, "".join(element.texts))
+                    ]
                 else:
-                    i += 1
+                    remaining.append(want)
+            open_element.child_wants = remaining
+            if not remaining:
+                self.child_watchers -= 1
 
-    program = Program(
-        name=program_name,
-        material=material,
-        thicknes=thicknes,
-        machine_time=machine_time,
-        program_counts=program_counts,
-        details=details
-    )
-    return program
+    def _end(self, tag):
+        stack = self.stack
+        if stack[-1].name == tag:
+            self._close(stack.pop())
+            return
+        if tag in VOID_ELEMENTS:
+            return
+        for index in range(len(stack) - 2, 0, -1):
+            if stack[index].name == tag:
+                while len(stack) > index:
+                    self._close(stack.pop())
+                return
+
+    def _comment(self, data):
+        anchor = data.strip()
+        if anchor in SIBLING_ANCHORS:
+            field, tag_name = SIBLING_ANCHORS[anchor]
+            self.anchor_count += 1
+            parent = self.stack[-1]
+            parent.sibling_wants = (parent.sibling_wants or []) + [(tag_name, field, self.anchor_count)]
+        elif anchor == PROGRAM_COUNTS_ANCHOR:
+            self.anchor_count += 1
+            self.next_tr_wants.append(self.anchor_count)
+        elif anchor == DETAILS_ANCHOR and self.detail_state == "before":
+            self.detail_state = "waiting"
+
+    # --- zamykanie elementów i wyniki ------------------------------------
+
+    def _close(self, element):
+        if element.texts is not None:
+            self.capturing -= 1
+            # <td> zbiera tekst tylko jako komórka wiersza
+            if element.name == "td":
+                self.open_cells -= 1
+        if element.name == "tr":
+            if element.collects_tds:
+                self.td_collectors -= 1
+            if element.child_wants:
+                self.child_watchers -= 1
+        elif element.name in NON_TEXT_ELEMENTS:
+            self.non_text -= 1
+        if element.on_close:
+            for callback in element.on_close:
+                callback()
+        if element is self.detail_table:
+            self.detail_state = "done"
+
+    def _set_header(self, field, order, value):
+        current = self.header_values.get(field)
+        if current is None or current[0] < order:
+            self.header_values[field] = (order, value)
+
+    def _resolve_counts(self, cells, orders):
+        texts = ["".join(cell.texts) for cell in cells]
+        # Bez liczby w wierszu poprzednia wartość zostaje (jak w wersji na drzewie)
+        if any(txt.isdigit() for txt in texts):
+            for order in orders:
+                self._set_header("program_counts", order, texts)
+
+    def result(self):
+        header = _empty_header()
+        # Kolejność kotwic w dokumencie decyduje, która wartość wygrywa (jak w pętli po komentarzach)
+        for field, (order, value) in sorted(self.header_values.items(), key=lambda item: item[1][0]):
+            _apply_header_value(header, field, value)
+        rows = [[("".join(cell.texts), cell.img_src) for cell in cells] for cells in self.rows]
+        return header, rows
+
+
+def _scan_events(html_content: str):
+    scanner = _ReportScanner()
+    parser = _ReportParser(scanner)
+    parser.feed(html_content)
+    parser.close()
+    return scanner.result()
+
+
+def _build_details(rows: list, file_path: str) -> list:
+    """Buduje listę detali z wierszy tabeli z sekcji "HTML-Block: Einzelteil-Informationen mit Grafiken, ohne Barcode"."""
+    details = []
+    # Indeks plików katalogu raportu – jeden na całe parsowanie zamiast os.walk dla każdego detalu
+    image_index = None
+    i = 0
+    while i < len(rows):
+        tds = rows[i]
+        if len(tds) >= 2 and "NUMER CZĘŚCI:" in tds[1][0]:
+            detail_data = {}
+            image_src = tds[0][1]
+            if image_src is not None:
+                image_src = image_src.strip()
+                image_src_norm = normalize_filename(image_src)
+                base = os.path.basename(image_src_norm)
+                if image_index is None:
+                    image_index = get_directory_index(os.path.dirname(file_path))
+                original_image_path = image_index.find(base)
+                print(f"Normalized image path: {repr(original_image_path)}")
+                if original_image_path and os.path.exists(original_image_path):
+                    image_path = copy_image_to_static(original_image_path)
+                    print(f"Image copied to: {image_path}")
+                else:
+                    image_path = None
+                    print("File not found after normalization.")
+            else:
+                image_path = None
+            for j in range(i, min(i + 15, len(rows))):
+                cells = rows[j]
+                if len(cells) < 2:
+                    continue
+                key = cells[0][0]
+                value = cells[1][0]
+                if key.upper().startswith("NAZWA PLIKU GEO:"):
+                    value = ntpath.basename(value)
+                    value_pure = ntpath.splitext(value)[0]
+                    detail_data["geo_file"] = value_pure
+                elif key.upper().startswith("ILOŚĆ:"):
+                    try:
+                        detail_data["quantity"] = int(value)
+                    except ValueError:
+                        detail_data["quantity"] = 1
+                elif key.upper().startswith("WYMIARY:"):
+                    m = re.match(r"([\d,\.]+)\s*x\s*([\d,\.]+)", value)
+                    if m:
+                        x = float(m.group(1).replace(',', '.'))
+                        y = float(m.group(2).replace(',', '.'))
+                        detail_data["dimensions"] = f"{x:.2f} x {y:.2f} mm"
+                    else:
+                        detail_data["dimensions"] = value
+                elif key.upper().startswith("CZAS OBRÓBKI:") and value.endswith("min"):
+                    m = re.search(r'([\d\.]+)\s*min', value, re.IGNORECASE)
+                    if m:
+                        minutes = float(m.group(1))
+                        seconds = int(round(minutes * 60))
+                        detail_data["cut_time"] = seconds / 3600.0
+                    else:
+                        detail_data["cut_time"] = 0.0
+                elif key.upper().startswith("CIĘŻAR:") and value.endswith("kg"):
+                    m = re.search(r'([\d,\.]+)\s*kg', value, re.IGNORECASE)
+                    if m:
+                        detail_data["weight"] = float(m.group(1).replace(',', '.'))
+                    else:
+                        detail_data["weight"] = 0.0
+            if ("geo_file" in detail_data and "quantity" in detail_data and
+                "dimensions" in detail_data and "cut_time" in detail_data):
+                detail_data.setdefault("cut_length", 0.0)
+                detail_data.setdefault("weight", 0.0)
+                detail = Detail(
+                    name=detail_data["geo_file"],
+                    quantity=detail_data["quantity"],
+                    dimensions=detail_data["dimensions"],
+                    cut_time=detail_data["cut_time"],
+                    cut_length=detail_data["cut_length"],
+                    weight=detail_data["weight"],
+                    image_path=image_path if image_path and os.path.exists(image_path) else None
+                )
+                details.append(detail)
+            i += 15
+        else:
+            i += 1
+    return details
@@ -0,0 +1,119 @@
+"""
+Kolejka zadań przetwarzania przesłanych plików.
+Upload tylko zapisuje plik i zleca zadanie – parsowanie odbywa się w ograniczonej
+puli wątków, a klient odpytuje o stan (etap, procent, wynik).
+Gdy liczba oczekujących zadań osiągnie limit, nowe zlecenia są odrzucane (QueueFull),
+zamiast gromadzić się w pamięci.
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+# Etapy zadania i odpowiadający im postęp w procentach
+STAGES = {
+    "queued": 0,
+    "cache": 10,
+    "parsing": 20,
+    "pricing": 90,
+    "done": 100,
+    "error": 100,
+}
+
+# Czas (s), przez jaki zakończone zadania są dostępne do odczytu
+FINISHED_JOB_TTL = 600
+
+
+class QueueFull(Exception):
+    """Kolejka zadań jest pełna – klient powinien ponowić próbę później."""
+
+
+@dataclass
+class Job:
+    id: str
+    filename: str
+    stage: str = "queued"
+    progress: int = 0
+    result: object = None
+    error: str = None
+    created: float = field(default_factory=time.time)
+    finished: float = None
+
+    @property
+    def done(self) -> bool:
+        return self.stage in ("done", "error")
+
+    def set_stage(self, stage: str):
+        self.stage = stage
+        self.progress = STAGES[stage]
+
+    def set_parsed(self, done: int, total: int):
+        """Postęp etapu parsowania dla zadań obejmujących wiele plików."""
+        self.stage = "parsing"
+        start, end = STAGES["parsing"], STAGES["pricing"]
+        self.progress = start + (end - start) * done // max(total, 1)
+
+    def to_dict(self) -> dict:
+        data = {
+            "job_id": self.id,
+            "filename": self.filename,
+            "stage": self.stage,
+            "progress": self.progress,
+            "done": self.done,
+        }
+        if self.stage == "done":
+            data["result"] = self.result
+        elif self.stage == "error":
+            data["error"] = self.error
+        return data
+
+
+class JobQueue:
+    """
+    Pula wątków z ograniczoną liczbą zadań oczekujących i wykonywanych.
+    Funkcja zadania dostaje obiekt Job jako pierwszy argument, aby mogła raportować etap.
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 8):
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="upload-job")
+        self._jobs = {}
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def submit(self, filename: str, func, *args) -> Job:
+        with self._lock:
+            self._prune()
+            if self._active >= self.max_pending:
+                raise QueueFull(f"Kolejka zadań jest pełna ({self.max_pending})")
+            job = Job(id=uuid.uuid4().hex, filename=filename)
+            self._jobs[job.id] = job
+            self._active += 1
+        self._executor.submit(self._run, job, func, args)
+        return job
+
+    def get(self, job_id: str) -> Job:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job: Job, func, args):
+        try:
+            job.result = func(job, *args)
+            job.set_stage("done")
+        except Exception as e:
+            print(f"Błąd zadania {job.id} ({job.filename}):", e)
+            job.error = str(e)
+            job.set_stage("error")
+        finally:
+            job.finished = time.time()
+            with self._lock:
+                self._active -= 1
+
+    def _prune(self):
+        """Usuwa zakończone zadania starsze niż FINISHED_JOB_TTL."""
+        limit = time.time() - FINISHED_JOB_TTL
+        expired = [job_id for job_id, job in self._jobs.items() if job.finished and job.finished < limit]
+        for job_id in expired:
+            del self._jobs[job_id]
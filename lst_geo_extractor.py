@@ -1,5 +1,8 @@
 import os
 import csv
+import ntpath
+from concurrent.futures import ThreadPoolExecutor
+from lst_reader import LSTReader
 
 
 def extract_geo_data_from_lst(lst_filename):
@@ -7,30 +10,43 @@ def extract_geo_data_from_lst(lst_filename):
     Wczytuje plik LST (w kodowaniu cp1250) i wyszukuje w nim sekcję BEGIN_PARTS_IN_PROGRAM.
     Zbiera kolejne linie zaczynające się od "DA," lub "*", łączy linie kontynuacyjne i zwraca listę
     bloków tekstowych – każdy odpowiada jednemu rekordowi dotyczącym geometrii.
+    Plik jest mapowany (LSTReader) – odczytywana i dekodowana jest tylko sama sekcja.
     """
-    with open(lst_filename, 'r', encoding='cp1250') as f:
-        lines = f.readlines()
+    with LSTReader(lst_filename) as reader:
+        start = reader.seek("BEGIN_PARTS_IN_PROGRAM")
+        end = reader.seek("ENDE_PARTS_IN_PROGRAM")
+        # Sekcja zaczyna się od linii ze znacznikiem; koniec przed początkiem – brak sekcji
+        if start == -1 or -1 < end < start:
+            return []
+        return collect_da_blocks(_parts_lines(reader.lines(start)))
 
-    in_section = False
-    da_blocks = []
-    current_block = []
+
+def _parts_lines(lines):
+    """Linie sekcji BEGIN_PARTS_IN_PROGRAM – do pierwszej linii ze znacznikiem końca."""
     for line in lines:
         if "BEGIN_PARTS_IN_PROGRAM" in line:
-            in_section = True
             continue
         if "ENDE_PARTS_IN_PROGRAM" in line:
-            in_section = False
             break
-        if in_section:
-            line = line.rstrip("\n")
-            if line.startswith("DA,") or line.startswith("*"):
-                if line.startswith("DA,") and current_block:
-                    da_blocks.append(" ".join(current_block))
-                    current_block = []
-                # Jeśli linia zaczyna się od "*" – usuń znak "*" i ewentualne spacje
-                if line.startswith("*"):
-                    line = line.lstrip("*").strip()
-                current_block.append(line)
+        yield line
+
+
+def collect_da_blocks(lines) -> list:
+    """
+    Łączy rekordy DA z liniami kontynuacyjnymi ("*") w bloki tekstowe.
+    Pozostałe linie (np. definicje kolumn MM,AT) są pomijane.
+    """
+    da_blocks = []
+    current_block = []
+    for line in lines:
+        if line.startswith("DA,") or line.startswith("*"):
+            if line.startswith("DA,") and current_block:
+                da_blocks.append(" ".join(current_block))
+                current_block = []
+            # Jeśli linia zaczyna się od "*" – usuń znak "*" i ewentualne spacje
+            if line.startswith("*"):
+                line = line.lstrip("*").strip()
+            current_block.append(line)
     if current_block:
         da_blocks.append(" ".join(current_block))
     return da_blocks
@@ -49,46 +65,15 @@ def parse_da_block(da_block):
     return fields
 
 
-def generate_geo_file_content(fields):
-    """
-    Na podstawie listy pól (pobranych z rekordu DA) generuje przykładową treść pliku GEO.
-
-    UWAGA: Poniższy szablon jest przykładowy – należy go dostosować do Twoich wymagań.
-    """
-    # Wyszukujemy nazwę pliku GEO – pierwsze pole kończące się na ".GEO"
-    geo_filename = None
-    for f in fields:
-        if f.upper().endswith(".GEO"):
-            geo_filename = os.path.basename(f)
-            break
-    if not geo_filename:
-        geo_filename = "unknown.GEO"
-
-    # Przykładowe pobranie kilku danych – indeksy należy dopasować do Twojego formatu DA
-    try:
-        length = float(fields[8])
-    except:
-        length = 3049.25
-    try:
-        sheet_x = float(fields[12])
-        sheet_y = float(fields[13])
-    except:
-        sheet_x = 54.09
-        sheet_y = 75.0
-    try:
-        laser_x = float(fields[15])
-        laser_y = float(fields[16])
-    except:
-        laser_x = 22.23
-        laser_y = 37.5
-
-    content = f"""#~1
+# Szablon pliku GEO: stały szkielet, w który wstawiane są wartości z rekordu DA (formatowanie %).
+# Szablon jest przykładowy – należy go dostosować do wymagań.
+GEO_TEMPLATE = """#~1
 1.03
 2
 29.09.2020
 0.000000000 0.000000000 0.000000000
-{sheet_x:0.9f} {sheet_y:0.9f} 0.000000000
-{length:0.9f}
+%(sheet_x).9f %(sheet_y).9f 0.000000000
+%(length).9f
 1
 0.001000000
 0
@@ -126,9 +111,9 @@ LASER
 0.000000000 0.000000000 1.000000000 0.000000000
 0.000000000 0.000000000 0.000000000 1.000000000
 0.000000000 0.000000000 0.000000000
-{sheet_x:0.9f} {sheet_y:0.9f} 0.000000000
-{laser_x:0.9f} {laser_y:0.9f} 0.000000000
-{length:0.9f}
+%(sheet_x).9f %(sheet_y).9f 0.000000000
+%(laser_x).9f %(laser_y).9f 0.000000000
+%(length).9f
 0
 ##~~
 #~30
@@ -150,7 +135,7 @@ P
 |~
 P
 2
-{sheet_x:0.9f} {sheet_y:0.9f} 0.000000000
+%(sheet_x).9f %(sheet_y).9f 0.000000000
 |~
 ##~~
 #~33
@@ -159,9 +144,9 @@ P
 0
 0.000000000 0.000000000 1.000000000
 0.000000000 0.000000000 0.000000000
-{sheet_x:0.9f} {sheet_y:0.9f} 0.000000000
-{laser_x:0.9f} {laser_y:0.9f} 0.000000000
-{length:0.9f}
+%(sheet_x).9f %(sheet_y).9f 0.000000000
+%(laser_x).9f %(laser_y).9f 0.000000000
+%(length).9f
 0
 ##~~
 #~331
@@ -169,25 +154,116 @@ P
 #~END
 #~EOF
 """
-    return geo_filename, content
+
+# Indeksy pól rekordu DA wstawianych do szablonu – indeksy należy dopasować do formatu DA
+GEO_FIELDS = {"length": 8, "sheet_x": 12, "sheet_y": 13, "laser_x": 15, "laser_y": 16}
+# Pola odczytywane razem – błąd jednego z nich dotyczy całej grupy
+GEO_FIELD_GROUPS = (("length",), ("sheet_x", "sheet_y"), ("laser_x", "laser_y"))
+# Wartości zastępcze używane przez generate_geo_file_content poza trybem ścisłym
+GEO_DEFAULTS = {"length": 3049.25, "sheet_x": 54.09, "sheet_y": 75.0, "laser_x": 22.23, "laser_y": 37.5}
+
+# Liczba wątków zapisu (domyślnie zapis sekwencyjny – więcej wątków opłaca się tylko na dyskach
+# sieciowych lub wolnych nośnikach) i liczba plików zapisywanych w jednym zadaniu puli
+GEO_EXPORT_WORKERS = 1
+GEO_EXPORT_BATCH = 64
+
+
+def _geo_values(fields, strict: bool) -> dict:
+    values = {}
+    for group in GEO_FIELD_GROUPS:
+        try:
+            values.update((name, float(fields[GEO_FIELDS[name]])) for name in group)
+        except (IndexError, ValueError):
+            if strict:
+                raise ValueError("Nieprawidłowe lub brakujące pole rekordu DA: " + "/".join(
+                    f"{name} (pole {GEO_FIELDS[name]})" for name in group))
+            values.update((name, GEO_DEFAULTS[name]) for name in group)
+    return values
+
+
+def generate_geo_file_content(fields, strict: bool = False):
+    """
+    Na podstawie listy pól (pobranych z rekordu DA) generuje treść pliku GEO.
+    Zwraca (nazwa pliku GEO, treść). W trybie ścisłym brak nazwy pliku lub błędne
+    pole liczbowe zgłasza ValueError zamiast podstawiać wartości zastępcze.
+    Nazwa jest brana bez ścieżki zarówno windowsowej, jak i uniksowej (ntpath.basename) –
+    dla rekordu DA ze ścieżką "C:\\Geometrie\\DETAL.GEO" zwracane jest "DETAL.GEO",
+    podczas gdy wcześniejsze os.path.basename pod Linuksem zostawiało całą ścieżkę w nazwie.
+    """
+    # Wyszukujemy nazwę pliku GEO – pierwsze pole kończące się na ".GEO"
+    geo_filename = None
+    for f in fields:
+        if f.upper().endswith(".GEO"):
+            geo_filename = ntpath.basename(f)
+            break
+    if not geo_filename:
+        if strict:
+            raise ValueError("Brak nazwy pliku GEO w rekordzie DA")
+        geo_filename = "unknown.GEO"
+    return geo_filename, GEO_TEMPLATE % _geo_values(fields, strict)
+
+
+def _write_geo_batch(batch: list) -> list:
+    """Zapisuje partię plików (ścieżka, treść); zwraca listę (ścieżka, błąd lub None)."""
+    results = []
+    for path, content in batch:
+        try:
+            with open(path, "w", encoding="cp1250") as f:
+                f.write(content)
+            results.append((path, None))
+        except (OSError, UnicodeError) as e:
+            results.append((path, e))
+    return results
+
+
+def export_geo_files(lst_filename, output_dir, workers: int = GEO_EXPORT_WORKERS,
+                     batch_size: int = GEO_EXPORT_BATCH) -> dict:
+    """
+    Generuje pliki GEO dla wszystkich rekordów DA pliku LST i zapisuje je partiami w puli wątków.
+    Zwraca raport: {"written": [ścieżki], "errors": [{"record", "filename", "error"}]} –
+    rekord z błędnymi danymi nie jest zapisywany z wartościami zastępczymi.
+    """
+    written = []
+    errors = []
+    files = []
+    for record, block in enumerate(extract_geo_data_from_lst(lst_filename), start=1):
+        geo_filename = None
+        try:
+            fields = parse_da_block(block)
+            geo_filename, geo_content = generate_geo_file_content(fields, strict=True)
+        except (ValueError, csv.Error) as e:
+            errors.append({"record": record, "filename": geo_filename, "error": str(e)})
+            continue
+        files.append((record, os.path.join(output_dir, geo_filename), geo_content))
+
+    os.makedirs(output_dir, exist_ok=True)
+    batches = [files[i:i + batch_size] for i in range(0, len(files), batch_size)]
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(batches)))) as executor:
+        for batch, results in zip(batches, executor.map(_write_geo_batch, [
+            [(path, content) for _, path, content in batch] for batch in batches
+        ])):
+            for (record, _, _), (path, error) in zip(batch, results):
+                if error is None:
+                    written.append(path)
+                else:
+                    errors.append({"record": record, "filename": os.path.basename(path), "error": str(error)})
+    return {"written": written, "errors": errors}
 
 
-def extract_geo_files(lst_filename, output_dir):
+def extract_geo_files(lst_filename, output_dir, workers: int = GEO_EXPORT_WORKERS):
     """
     Główna funkcja, która:
       - wczytuje plik LST,
       - wyodrębnia rekordy DA dotyczące geometrii,
-      - dla każdego rekordu generuje plik GEO i zapisuje go do output_dir.
+      - dla każdego rekordu generuje plik GEO i zapisuje go do output_dir (export_geo_files,
+        workers wątków zapisu).
+    Zwraca raport eksportu; błędne rekordy są wypisywane.
     """
-    da_blocks = extract_geo_data_from_lst(lst_filename)
-    for block in da_blocks:
-        fields = parse_da_block(block)
-        geo_filename, geo_content = generate_geo_file_content(fields)
-        print(geo_filename)
-        print(output_dir)
-        output_path = os.path.join(output_dir, geo_filename)
-        with open(output_path, "w", encoding="cp1250") as f:
-            f.write(geo_content)
+    report = export_geo_files(lst_filename, output_dir, workers=workers)
+    print(f"Zapisano {len(report['written'])} plików GEO do {output_dir}")
+    for error in report["errors"]:
+        print(f"Błąd rekordu DA {error['record']} ({error['filename'] or 'brak nazwy'}): {error['error']}")
+    return report
 
 def main(lst_filename=None, output_dir=None):
     extract_geo_files(lst_filename, output_dir)
@@ -0,0 +1,256 @@
+"""
+Metryki geometrii detali z programu LST: długość cięcia, długość przejazdów szybkich (G0),
+liczba przebić, obrys i pole powierzchni.
+Linie sekcji START_TEXT ... STOP_TEXT są interpretowane jak G-code: modalne G0/G1/G2/G3,
+G90/G91 (współrzędne absolutne/przyrostowe), środek łuku z I/J względem punktu początkowego.
+Ruchy trafiają do tablic kolumnowych, a długości i pola liczone są na całych kolumnach;
+łuki liczone są analitycznie (bez interpolacji odcinkami).
+"""
+
+import math
+import re
+from array import array
+from dataclasses import dataclass
+from operator import mul, sub
+from lst_parser import (
+    MARKER_RE, MARKER_RE_BYTES, WORD_RE, _LONE_CR_RE_BYTES, _NUMBER, geometry_sections,
+    section_geo_name,
+)
+from lst_reader import LSTReader
+
+RAPID, LINEAR, ARC_CW, ARC_CCW = range(4)
+TAU = 2 * math.pi
+
+# Typowa linia: [N..][G..][X..][Y..][I..][J..][F..]; każda inna trafia do grupy 6
+_MOVE_LINE = (
+    r'^[ \t]*(?:[Nn]\d+[ \t]*)?(?:[Gg](\d+)[ \t]*)?'
+    r'(?:[Xx](' + _NUMBER + r')[ \t]*)?(?:[Yy](' + _NUMBER + r')[ \t]*)?'
+    r'(?:[Ii](' + _NUMBER + r')[ \t]*)?(?:[Jj](' + _NUMBER + r')[ \t]*)?'
+    r'(?:[Ff]' + _NUMBER + r'[ \t]*)?\r?$|^(.*?)\r?$'
+)
+MOVE_LINE_RE = re.compile(_MOVE_LINE, re.M)
+MOVE_LINE_RE_BYTES = re.compile(_MOVE_LINE.encode(), re.M)
+# Komentarze NC: w nawiasach (także niedomknięte) oraz od średnika do końca linii
+COMMENT_RE = re.compile(r'\([^)]*\)?|;.*')
+# Linia NC po usunięciu komentarzy: wyłącznie słowa adresowe (litera i liczba); inne linie
+# (nazwy detali, etykiety typu PLATE_X500Y500) nie zawierają ruchów i są pomijane
+NC_BLOCK_RE = re.compile(r'(?:[ \t]*[A-Za-z]' + _NUMBER + r')*[ \t]*')
+
+
+@dataclass
+class GeometryMetrics:
+    cut_length: float = 0.0    # długość cięcia (G1/G2/G3) [mm]
+    rapid_length: float = 0.0  # długość przejazdów szybkich (G0) [mm]
+    pierce_count: int = 0      # liczba przebić (rozpoczęć cięcia po przejeździe)
+    bbox: tuple = None         # obrys toru cięcia (min_x, min_y, max_x, max_y)
+    area: float = 0.0          # pole: największy kontur minus pozostałe (otwory) [mm²]
+
+
+class _Moves:
+    """Ruchy sekcji w kolumnach: przejazdy, odcinki i łuki cięcia oraz początki konturów."""
+
+    def __init__(self):
+        self.rapid = (array("d"), array("d"), array("d"), array("d"))
+        # Wszystkie ruchy cięcia (łuki jako cięciwy) – do długości odcinków, obrysu i pola
+        self.cut = (array("d"), array("d"), array("d"), array("d"))
+        self.linear = array("b")
+        # Łuki: indeks ruchu cięcia, środek, kierunek
+        self.arc_index = array("l")
+        self.arc_center = (array("d"), array("d"))
+        self.arc_clockwise = array("b")
+        self.contour_starts = array("l")
+
+
+def _read_moves(block, move_re) -> _Moves:
+    moves = _Moves()
+    rapid_x0, rapid_y0, rapid_x1, rapid_y1 = (column.append for column in moves.rapid)
+    cut_x0, cut_y0, cut_x1, cut_y1 = (column.append for column in moves.cut)
+    cut_count = 0
+    linear = moves.linear.append
+    motion = LINEAR  # bez słowa G ruch traktowany jest jak cięcie (jak kontur z LSTParser)
+    incremental = False
+    cutting = False
+    x = y = None
+    for g, gx, gy, gi, gj, other in move_re.findall(block):
+        if other:
+            if isinstance(other, bytes):
+                other = other.decode("cp1250")
+            other = COMMENT_RE.sub("", other)
+            if not NC_BLOCK_RE.fullmatch(other):
+                continue
+            words = {}
+            for letter, value in WORD_RE.findall(other):
+                letter = letter.upper()
+                if letter == "G":
+                    # Kody z częścią ułamkową (np. G41.1) nie zmieniają trybu ruchu
+                    code = float(value)
+                    if code.is_integer():
+                        motion, incremental = _apply_g(int(code), motion, incremental)
+                else:
+                    words.setdefault(letter, value)
+            gx, gy, gi, gj = (words.get(k, "") for k in "XYIJ")
+        elif g:
+            motion, incremental = _apply_g(int(g), motion, incremental)
+        if gx and gy and not incremental:
+            new_x = float(gx)
+            new_y = float(gy)
+        elif not gx and not gy:
+            continue
+        elif x is None:
+            # Pierwsze położenie w sekcji – nieznany punkt startowy, ruch tylko ustala pozycję
+            new_x = float(gx) if gx else 0.0
+            new_y = float(gy) if gy else 0.0
+        elif incremental:
+            new_x = x + float(gx) if gx else x
+            new_y = y + float(gy) if gy else y
+        else:
+            new_x = float(gx) if gx else x
+            new_y = float(gy) if gy else y
+        if motion == RAPID:
+            if x is not None:
+                rapid_x0(x)
+                rapid_y0(y)
+                rapid_x1(new_x)
+                rapid_y1(new_y)
+            cutting = False
+        else:
+            if not cutting:
+                moves.contour_starts.append(cut_count)
+                cutting = True
+            if x is not None:
+                if motion == LINEAR:
+                    linear(1)
+                else:
+                    linear(0)
+                    moves.arc_index.append(cut_count)
+                    moves.arc_center[0].append(x + (float(gi) if gi else 0.0))
+                    moves.arc_center[1].append(y + (float(gj) if gj else 0.0))
+                    moves.arc_clockwise.append(motion == ARC_CW)
+                cut_x0(x)
+                cut_y0(y)
+                cut_x1(new_x)
+                cut_y1(new_y)
+                cut_count += 1
+        x = new_x
+        y = new_y
+    return moves
+
+
+def _apply_g(code: int, motion: int, incremental: bool) -> tuple:
+    if code in (RAPID, LINEAR, ARC_CW, ARC_CCW):
+        return code, incremental
+    if code == 90:
+        return motion, False
+    if code == 91:
+        return motion, True
+    return motion, incremental
+
+
+def arc_sweep(x0, y0, x1, y1, cx, cy, clockwise: bool) -> tuple:
+    """
+    Promień i kąt łuku (dodatni dla G3, ujemny dla G2).
+    Łuk kończący się w punkcie początkowym jest pełnym okręgiem.
+    """
+    radius = math.hypot(x0 - cx, y0 - cy)
+    a0 = math.atan2(y0 - cy, x0 - cx)
+    a1 = math.atan2(y1 - cy, x1 - cx)
+    if clockwise:
+        sweep = -((a0 - a1) % TAU) or -TAU
+    else:
+        sweep = (a1 - a0) % TAU or TAU
+    return radius, sweep
+
+
+def _arc_extremes(cx, cy, radius, a0, sweep):
+    """Punkty łuku leżące na osiach (0°, 90°, 180°, 270°) – potrzebne do obrysu."""
+    for k in range(4):
+        angle = k * math.pi / 2
+        offset = (angle - a0) % TAU if sweep > 0 else (a0 - angle) % TAU
+        if offset <= abs(sweep):
+            yield cx + radius * math.cos(angle), cy + radius * math.sin(angle)
+
+
+def measure_moves(moves: _Moves) -> GeometryMetrics:
+    rapid_x0, rapid_y0, rapid_x1, rapid_y1 = moves.rapid
+    cut_x0, cut_y0, cut_x1, cut_y1 = moves.cut
+    metrics = GeometryMetrics(pierce_count=len(moves.contour_starts))
+    metrics.rapid_length = math.fsum(map(math.hypot, map(sub, rapid_x1, rapid_x0), map(sub, rapid_y1, rapid_y0)))
+    if not cut_x0:
+        return metrics
+
+    # Odcinki: długości na całych kolumnach (łuki zerowane i liczone osobno)
+    lengths = list(map(mul, map(math.hypot, map(sub, cut_x1, cut_x0), map(sub, cut_y1, cut_y0)), moves.linear))
+    # Składniki wzoru Gaussa (pole pod cięciwą) dla wszystkich ruchów cięcia
+    cross = list(map(sub, map(mul, cut_x0, cut_y1), map(mul, cut_x1, cut_y0)))
+    xs = [min(cut_x0), min(cut_x1), max(cut_x0), max(cut_x1)]
+    ys = [min(cut_y0), min(cut_y1), max(cut_y0), max(cut_y1)]
+    segments = [0.0] * len(cut_x0)
+    center_x, center_y = moves.arc_center
+    for k, i in enumerate(moves.arc_index):
+        x0, y0, cx, cy = cut_x0[i], cut_y0[i], center_x[k], center_y[k]
+        radius, sweep = arc_sweep(x0, y0, cut_x1[i], cut_y1[i], cx, cy, moves.arc_clockwise[k])
+        lengths[i] = radius * abs(sweep)
+        # Pole odcinka koła między łukiem a cięciwą (ze znakiem kierunku)
+        segments[i] = radius * radius * (sweep - math.sin(sweep))
+        for px, py in _arc_extremes(cx, cy, radius, math.atan2(y0 - cy, x0 - cx), sweep):
+            xs.append(px)
+            ys.append(py)
+    metrics.cut_length = math.fsum(lengths)
+    metrics.bbox = (min(xs), min(ys), max(xs), max(ys))
+
+    bounds = list(moves.contour_starts) + [len(cut_x0)]
+    areas = sorted(
+        (abs(math.fsum(cross[a:b]) + math.fsum(segments[a:b])) / 2 for a, b in zip(bounds, bounds[1:])),
+        reverse=True,
+    )
+    metrics.area = max(areas[0] - math.fsum(areas[1:]), 0.0)
+    return metrics
+
+
+def measure_geometry(block) -> GeometryMetrics:
+    """Metryki jednej sekcji geometrii (tekst lub bajty cp1250)."""
+    move_re = MOVE_LINE_RE if isinstance(block, str) else MOVE_LINE_RE_BYTES
+    return measure_moves(_read_moves(block, move_re))
+
+
+def _normalized(content, start: int, end: int) -> tuple:
+    """Treść z końcami linii "\\n" (samotne CR zamieniane tylko w razie potrzeby) i wyrażenie znaczników."""
+    if isinstance(content, str):
+        if "\r" in content:
+            content = content[start:end].replace("\r\n", "\n").replace("\r", "\n")
+            start, end = 0, None
+        return content, start, end, MARKER_RE
+    if _LONE_CR_RE_BYTES.search(content, start, len(content) if end is None else end):
+        content = bytes(content[start:end]).replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+        start, end = 0, None
+    return content, start, end, MARKER_RE_BYTES
+
+
+def measure_content(content, start: int = 0, end: int = None) -> list:
+    """
+    Metryki kolejnych detali (w kolejności LSTParser.parse_content) z treści pliku LST
+    lub jej zakresu [start, end) – np. sekcji BEGIN_PROGRAMM zmapowanego pliku.
+    """
+    content, start, end, marker_re = _normalized(content, start, end)
+    return [measure_geometry(content[a:b]) for a, b in geometry_sections(content, marker_re, start, end)]
+
+
+def measure_sections(content, start: int = 0, end: int = None) -> list:
+    """
+    Pary (nazwa pliku GEO albo None, GeometryMetrics) kolejnych sekcji geometrii.
+    Nazwa szukana jest od linii START_TEXT do końca sekcji (section_geo_name).
+    """
+    content, start, end, marker_re = _normalized(content, start, end)
+    newline = "\n" if isinstance(content, str) else b"\n"
+    sections = []
+    for a, b in geometry_sections(content, marker_re, start, end):
+        # Początek linii ze znacznikiem START_TEXT (a wskazuje na linię następną)
+        line_start = max(content.rfind(newline, start, max(a - 1, start)) + 1, start)
+        sections.append((section_geo_name(content, line_start, b), measure_geometry(content[a:b])))
+    return sections
+
+
+def measure_file(file_path: str) -> list:
+    """Metryki detali pliku LST – plik jest mapowany, kopiowane są tylko kolejne sekcje."""
+    with LSTReader(file_path) as reader:
+        return measure_content(reader.data)
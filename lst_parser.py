@@ -1,6 +1,118 @@
+import io
 import re
 import os
 import math
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, repeat
+from operator import add, sub
+from lst_reader import LSTReader
+
+# Liczba w słowie G-code – ta sama postać co w dotychczasowym wyszukiwaniu [Xx](...)
+_NUMBER = r'[-+]?\d*\.?\d+'
+# Białe znaki w obrębie linii (bez znaku nowej linii)
+_HSPACE = r'[^\S\n]'
+
+# Linie rozpoczynające/kończące sekcję geometrii (odpowiednik line.strip().upper().startswith(...))
+_MARKER = r'^' + _HSPACE + r'*(?:([Ss][Tt][Aa][Rr][Tt]_[Tt][Ee][Xx][Tt])|[Ss][Tt][Oo][Pp]_[Tt][Ee][Xx][Tt])'
+# Typowa linia ruchu: [N..][G..] X.. Y.. [I..][J..][F..] – X i Y brane bezpośrednio z dopasowania.
+# Każda inna linia trafia w całości do grupy 3 i jest analizowana słowo po słowie.
+_MOTION_LINE = (
+    r'^[ \t]*(?:[NnGg]\d+[ \t]*)*[Xx](' + _NUMBER + r')[ \t]*[Yy](' + _NUMBER + r')'
+    r'(?:[ \t]*[IiJjFf]' + _NUMBER + r')*[ \t]*\r?$|^(.*?)\r?$'
+)
+# Słowo adresowe G-code: litera i liczba (N10, G1, X-0.249, I.5, ...)
+_WORD = r'([A-Za-z])(' + _NUMBER + r')'
+
+MARKER_RE = re.compile(_MARKER, re.M)
+MOTION_LINE_RE = re.compile(_MOTION_LINE, re.M)
+WORD_RE = re.compile(_WORD)
+MARKER_RE_BYTES = re.compile(_MARKER.encode(), re.M)
+MOTION_LINE_RE_BYTES = re.compile(_MOTION_LINE.encode(), re.M)
+
+# Odwołanie do pliku GEO w sekcji geometrii (np. "(C:\Geometrie\DETAL_00001.GEO)") – nazwa to znaki
+# przed ".GEO" aż do separatora ścieżki, końca linii, cudzysłowu lub nawiasu (spacje należą do nazwy)
+GEO_SUFFIX_RE = re.compile(r"\.GEO\b", re.I)
+GEO_SUFFIX_RE_BYTES = re.compile(rb"\.GEO\b", re.I)
+_GEO_NAME_DELIMITERS = "\r\n\\/:'\"(),;="
+
+# Znaki, przy których podział na linie lub strip() w szybkiej ścieżce mógłby się różnić od
+# str.splitlines()/str.upper() – wtedy parsujemy linia po linii (ścieżka wzorcowa)
+_LINE_FALLBACK_CHARS = "\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029\u017f\ufb05\ufb06"
+# Bajty, które po dekodowaniu cp1250 są białymi znakami lub separatorami linii spoza ASCII
+_BYTES_FALLBACK = (b"\x0b", b"\x0c", b"\x1c", b"\x1d", b"\x1e", b"\x1f", b"\xa0")
+# Bajty niezdefiniowane w cp1250 – dekodowanie musi zgłosić błąd jak przy open(..., encoding='cp1250')
+_CP1250_UNDEFINED = (b"\x81", b"\x83", b"\x88", b"\x90", b"\x98")
+# Samodzielny CR (bez LF) jako znak końca linii
+_LONE_CR_RE_BYTES = re.compile(rb"\r(?!\n)")
+
+# Zalecane ustawienia lżejszego podglądu SVG (save_details(..., tolerance=SVG_SIMPLIFY_TOLERANCE,
+# precision=SVG_PRECISION)): tolerancja uproszczenia konturu [mm] i liczba miejsc po przecinku.
+# Domyślnie podgląd zawiera pełną geometrię – uproszczenie trzeba włączyć jawnie.
+SVG_SIMPLIFY_TOLERANCE = 0.05
+SVG_PRECISION = 3
+# Liczba punktów formatowanych i zapisywanych jednym wywołaniem write()
+SVG_WRITE_CHUNK = 4096
+# Minimalna liczba detali na proces przy równoległym zapisie
+MIN_DETAILS_PER_WORKER = 50
+
+
+def gcode_words(line) -> dict:
+    """
+    Dzieli linię G-code na słowa adresowe w jednym przebiegu.
+    Zwraca słownik: litera (wielka) -> tekst liczby z pierwszego wystąpienia tej litery.
+    Pierwsze wystąpienie odpowiada wynikowi re.search(r'[Xx](...)', line) dla każdej litery.
+    """
+    words = {}
+    for letter, value in WORD_RE.findall(line):
+        words.setdefault(letter.upper(), value)
+    return words
+
+
+def geometry_sections(content, marker_re=MARKER_RE, start: int = 0, end: int = None):
+    """
+    Zakresy (start, end) kolejnych sekcji geometrii detali: od linii po START_TEXT
+    do następnego znacznika START_TEXT/STOP_TEXT (lub końca zakresu [start, end) treści).
+    Dla treści bajtowej (także mmap) należy podać MARKER_RE_BYTES.
+    """
+    newline = "\n" if isinstance(content, str) else b"\n"
+    end = len(content) if end is None else end
+    geometry_start = None
+    for marker in marker_re.finditer(content, start, end):
+        if geometry_start is not None:
+            yield geometry_start, marker.start()
+            geometry_start = None
+        if marker.group(1):
+            line_end = content.find(newline, marker.end(), end)
+            geometry_start = end if line_end == -1 else line_end + 1
+    if geometry_start is not None:
+        yield geometry_start, end
+
+
+def section_geo_name(content, start: int = 0, end: int = None) -> str:
+    """
+    Nazwa pliku GEO (bez rozszerzenia) z pierwszego odwołania ".GEO" w zakresie [start, end)
+    treści (tekst lub bajty cp1250) albo None, gdy sekcja nie wskazuje swojego detalu.
+    """
+    geo_re = GEO_SUFFIX_RE if isinstance(content, str) else GEO_SUFFIX_RE_BYTES
+    match = geo_re.search(content, start, len(content) if end is None else end)
+    if match is None:
+        return None
+    delimiters = _GEO_NAME_DELIMITERS if isinstance(content, str) else _GEO_NAME_DELIMITERS.encode()
+    name_end = name_start = match.start()
+    while name_start > start and content[name_start - 1:name_start] not in delimiters:
+        name_start -= 1
+    name = content[name_start:name_end]
+    if not isinstance(name, str):
+        name = name.decode("cp1250", errors="replace")
+    return name.strip() or None
+
+
+def is_closed(points, tolerance=0.5) -> bool:
+    """Czy pierwszy i ostatni punkt (niepustego) konturu leżą w granicy tolerancji."""
+    first = points[0]
+    last = points[-1]
+    return math.hypot(first[0] - last[0], first[1] - last[1]) <= tolerance
 
 
 def close_contour(points, tolerance=0.5):
@@ -8,31 +120,152 @@ def close_contour(points, tolerance=0.5):
     Sprawdza, czy pierwszy i ostatni punkt listy są blisko siebie.
     Jeśli nie, dodaje pierwszy punkt na końcu, aby zamknąć kontur.
 
-    :param points: Lista punktów [(x, y), ...]
+    :param points: Lista punktów [(x, y), ...] lub Contour (zamykany w miejscu, bez kopiowania)
     :param tolerance: Maksymalne dopuszczalne odchylenie (mm), by uznać, że kontur jest zamknięty.
     :return: Lista punktów (może być wydłużona o pierwszy punkt, jeśli był brak zamknięcia)
     """
     if not points:
         return points
-    first = points[0]
-    last = points[-1]
-    if math.hypot(first[0] - last[0], first[1] - last[1]) > tolerance:
-        points.append(first)
+    if not is_closed(points, tolerance):
+        points.append(points[0])
     return points
 
 
+class Contour:
+    """
+    Kontur detalu przechowywany jako jedna tablica float64 o współrzędnych przeplatanych
+    (x0, y0, x1, y1, ...) – 16 bajtów na punkt zamiast krotki z dwoma obiektami float.
+    Zachowuje się jak lista krotek (x, y): append, indeksowanie, iteracja, len, porównanie.
+    """
+    __slots__ = ("coords",)
+
+    def __init__(self, points=None):
+        if isinstance(points, array):
+            self.coords = points
+        else:
+            self.coords = array("d", chain.from_iterable(points) if points else ())
+
+    def __len__(self) -> int:
+        return len(self.coords) // 2
+
+    def __bool__(self) -> bool:
+        return bool(self.coords)
+
+    def __iter__(self):
+        it = iter(self.coords)
+        return zip(it, it)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Contour index out of range")
+        return self.coords[2 * index], self.coords[2 * index + 1]
+
+    def __eq__(self, other):
+        if isinstance(other, Contour):
+            return self.coords == other.coords
+        try:
+            return list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"Contour({list(self)!r})"
+
+    def add(self, x: float, y: float):
+        self.coords.append(x)
+        self.coords.append(y)
+
+    def append(self, point):
+        x, y = point
+        self.coords.append(x)
+        self.coords.append(y)
+
+    def extend(self, points):
+        self.coords.extend(chain.from_iterable(points))
+
+    def copy(self) -> "Contour":
+        return Contour(array("d", self.coords))
+
+    def view(self) -> memoryview:
+        """Widok (bez kopiowania) na przeplatane współrzędne."""
+        return memoryview(self.coords)
+
+    def xs(self) -> memoryview:
+        return memoryview(self.coords)[0::2]
+
+    def ys(self) -> memoryview:
+        return memoryview(self.coords)[1::2]
+
+    def bbox(self) -> tuple:
+        """(min_x, min_y, max_x, max_y) liczone na widokach, bez kopiowania współrzędnych."""
+        xs, ys = self.xs(), self.ys()
+        return min(xs), min(ys), max(xs), max(ys)
+
+    def shift(self, dx: float, dy: float):
+        """Przesuwa kontur w miejscu."""
+        coords = self.coords
+        coords[0::2] = array("d", [x + dx for x in coords[0::2]])
+        coords[1::2] = array("d", [y + dy for y in coords[1::2]])
+
+
+def simplify_contour(points: Contour, tolerance: float) -> Contour:
+    """
+    Upraszcza kontur algorytmem Douglasa–Peuckera: pomija punkty odległe od uproszczonej
+    łamanej o nie więcej niż tolerance [mm]. Pierwszy i ostatni punkt są zawsze zachowane.
+    Odległości dla każdego zakresu liczone są jednym wyrażeniem na wycinkach tablicy współrzędnych.
+    """
+    count = len(points)
+    if tolerance <= 0 or count < 3:
+        return points
+    coords = points.coords
+    keep = bytearray(count)
+    keep[0] = keep[-1] = 1
+    stack = [(0, count - 1)]
+    while stack:
+        first, last = stack.pop()
+        x0, y0 = coords[2 * first], coords[2 * first + 1]
+        dx, dy = coords[2 * last] - x0, coords[2 * last + 1] - y0
+        xs = coords[2 * first + 2:2 * last:2]
+        ys = coords[2 * first + 3:2 * last:2]
+        norm = math.hypot(dx, dy)
+        if norm:
+            # |(p - p0) x d| = odległość od prostej * |d|
+            offset = y0 * dx - x0 * dy
+            distances = [abs(x * dy - y * dx + offset) for x, y in zip(xs, ys)]
+            limit = tolerance * norm
+        else:
+            # Kontur zamknięty (pierwszy punkt = ostatni) – odległość od punktu
+            distances = [math.hypot(x - x0, y - y0) for x, y in zip(xs, ys)]
+            limit = tolerance
+        farthest = max(distances)
+        if farthest > limit:
+            index = first + 1 + distances.index(farthest)
+            keep[index] = 1
+            if index - first > 1:
+                stack.append((first, index))
+            if last - index > 1:
+                stack.append((index, last))
+    return Contour(array("d", chain.from_iterable(
+        (coords[2 * i], coords[2 * i + 1]) for i in range(count) if keep[i]
+    )))
+
+
 class Detail:
     """
     Klasa reprezentująca pojedynczy detal z pliku LST.
-    Zawiera nazwę oraz listę punktów, które reprezentują geometrię (kontur).
+    Zawiera nazwę oraz kontur (Contour) – punkty, które reprezentują geometrię.
     """
 
     def __init__(self, name: str):
         self.name = name if name else "Unnamed_Detail"
-        self.points = []  # Lista punktów (x, y)
+        self.points = Contour()  # Punkty (x, y)
 
     def add_point(self, x: float, y: float):
-        self.points.append((x, y))
+        self.points.add(x, y)
 
     def to_svg_string(self, margin=10) -> str:
         """
@@ -42,30 +275,56 @@ class Detail:
         :param margin: Margines wokół rysunku.
         :return: Ciąg znaków zawierający kod SVG.
         """
-        pts = close_contour(self.points.copy())
+        out = io.StringIO()
+        self.write_svg(out, margin)
+        return out.getvalue()
+
+    def write_svg(self, f, margin=10, tolerance=0.0, precision=None):
+        """
+        Zapisuje SVG detalu bezpośrednio do pliku (strumieniowo, porcjami po SVG_WRITE_CHUNK punktów).
+
+        :param tolerance: Tolerancja uproszczenia konturu [mm] (0 – bez uproszczenia).
+        :param precision: Liczba miejsc po przecinku współrzędnych (None – pełna dokładność).
+        """
+        pts = simplify_contour(self.points, tolerance) if tolerance else self.points
         if not pts:
-            return ""
-        xs = [p[0] for p in pts]
-        ys = [p[1] for p in pts]
-        min_x, max_x = min(xs), max(xs)
-        min_y, max_y = min(ys), max(ys)
+            return
+        min_x, min_y, max_x, max_y = pts.bbox()
         width = (max_x - min_x) + 2 * margin
         height = (max_y - min_y) + 2 * margin
+        # Szablon pary współrzędnych; przy zadanej precyzji – stała liczba miejsc po przecinku
+        point_format = "{},{}" if precision is None else f"{{:.{precision}f}},{{:.{precision}f}}"
+        if precision is not None:
+            width, height = round(width, precision), round(height, precision)
+        f.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}">\n'
+                '  <polygon points="')
+
+        # Przesunięcie punktów, aby rysunek zaczynał się od (margin, margin).
+        # Zamknięcie konturu nie zmienia obrysu – pierwszy punkt jest dopisywany tylko przy zapisie.
+        coords = pts.coords
+        step = 2 * SVG_WRITE_CHUNK
+        chunks = ((coords[start:start + step:2], coords[start + 1:start + step:2])
+                  for start in range(0, len(coords), step))
+        if not is_closed(pts):
+            chunks = chain(chunks, [((coords[0],), (coords[1],))])
+        for n, (xs, ys) in enumerate(chunks):
+            xs = map(add, map(sub, xs, repeat(min_x)), repeat(margin))
+            ys = map(add, map(sub, ys, repeat(min_y)), repeat(margin))
+            if n:
+                f.write(" ")
+            f.write(" ".join(map(point_format.format, xs, ys)))
+        f.write('" fill="none" stroke="black" stroke-width="1" />\n</svg>')
 
-        # Przesunięcie punktów, aby rysunek zaczynał się od (margin, margin)
-        shifted_points = [(x - min_x + margin, y - min_y + margin) for x, y in pts]
-        points_str = " ".join(f"{x},{y}" for x, y in shifted_points)
-        svg_lines = [
-            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}">',
-            f'  <polygon points="{points_str}" fill="none" stroke="black" stroke-width="1" />',
-            '</svg>'
-        ]
-        return "\n".join(svg_lines)
-
-    def save_to_svg(self, filename: str, margin=10):
-        svg_content = self.to_svg_string(margin)
+    def save_to_svg(self, filename: str, margin=10, tolerance=0.0, precision=None):
         with open(filename, 'w', encoding='utf-8') as f:
-            f.write(svg_content)
+            self.write_svg(f, margin, tolerance, precision)
+
+
+def _save_svg_files(details: list, filenames: list, margin, tolerance, precision) -> list:
+    """Zapisuje pliki SVG części detali (także w procesie puli)."""
+    for detail, filename in zip(details, filenames):
+        detail.save_to_svg(filename, margin, tolerance, precision)
+    return filenames
 
 
 class LSTParser:
@@ -102,6 +361,18 @@ class LSTParser:
                 continue
         return tokens
 
+    def _parse_line(self, line: str, detail: "Detail"):
+        """Punkt(y) z pojedynczej linii geometrii (po strip()) o nietypowej postaci."""
+        # Przykładowe linie mogą zawierać współrzędne w postaci np. "N70X-0.249Y-2.853"
+        words = gcode_words(line)
+        if "X" in words and "Y" in words:
+            detail.add_point(float(words["X"]), float(words["Y"]))
+        else:
+            # Alternatywnie, jeżeli linia zawiera ciąg liczb, dodajemy je w parach.
+            nums = self._parse_numbers_from_line(line)
+            for i in range(0, len(nums) - 1, 2):
+                detail.add_point(nums[i], nums[i + 1])
+
     def parse_content(self, content: str) -> list:
         """
         Parsuje zawartość pliku LST, wyodrębniając z niego detale.
@@ -111,6 +382,52 @@ class LSTParser:
         :param content: Zawartość pliku LST.
         :return: Lista obiektów Detail.
         """
+        if any(ch in content for ch in _LINE_FALLBACK_CHARS):
+            return self._parse_content_lines(content)
+        if "\r" in content:
+            content = content.replace("\r\n", "\n").replace("\r", "\n")
+        return self._parse_sections(content, MARKER_RE, MOTION_LINE_RE, None)
+
+    def parse_bytes(self, data: bytes, encoding: str = "cp1250") -> list:
+        """
+        Parsuje surowe bajty pliku LST bez dekodowania całości – liczby są konwertowane
+        bezpośrednio z bajtów, a dekodowane są tylko linie o nietypowej postaci.
+        Wynik jest taki sam jak parse_content(data.decode(encoding)).
+        Dane mogą być też zmapowanym plikiem (LSTReader.data) – kopiowane są wtedy
+        tylko bajty kolejnych sekcji geometrii.
+        """
+        if (encoding.lower() != "cp1250"
+                or any(data.find(b) != -1 for b in _BYTES_FALLBACK + _CP1250_UNDEFINED)):
+            return self.parse_content(str(data, encoding))
+        if _LONE_CR_RE_BYTES.search(data):
+            data = bytes(data).replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+        return self._parse_sections(data, MARKER_RE_BYTES, MOTION_LINE_RE_BYTES, encoding)
+
+    def _parse_sections(self, content, marker_re, motion_re, encoding) -> list:
+        """
+        Szybka ścieżka: sekcje START_TEXT ... STOP_TEXT są wyznaczane jednym wyszukiwaniem
+        znaczników, a linie geometrii w sekcji – jednym findall. Semantyka jak w _parse_content_lines.
+        """
+        self.details = []
+        for start, end in geometry_sections(content, marker_re):
+            detail = Detail(name=f"Detail_{len(self.details) + 1}")
+            self._parse_geometry(content[start:end], detail, motion_re, encoding)
+            self.details.append(detail)
+        return self.details
+
+    def _parse_geometry(self, block, detail: "Detail", motion_re, encoding):
+        append = detail.points.coords.append
+        for x, y, other in motion_re.findall(block):
+            if x:
+                append(float(x))
+                append(float(y))
+            elif other:
+                line = other.strip() if encoding is None else other.decode(encoding).strip()
+                if line:
+                    self._parse_line(line, detail)
+
+    def _parse_content_lines(self, content: str) -> list:
+        """Wzorcowe parsowanie linia po linii – dla treści ze znakami spoza szybkiej ścieżki."""
         self.details = []
         current_detail = None
         in_geometry = False
@@ -137,40 +454,44 @@ class LSTParser:
 
             # Jeżeli jesteśmy w sekcji geometrii, przetwarzaj linie zawierające współrzędne
             if in_geometry and current_detail:
-                # Przykładowe linie mogą zawierać współrzędne w postaci np. "N70X-0.249Y-2.853"
-                # Użyjemy wyrażenia regularnego, aby wyłuskać wartości X i Y.
-                m = re.search(r'[Xx]([-+]?\d*\.?\d+)', line)
-                n = re.search(r'[Yy]([-+]?\d*\.?\d+)', line)
-                if m and n:
-                    try:
-                        x = float(m.group(1))
-                        y = float(n.group(1))
-                        current_detail.add_point(x, y)
-                    except ValueError:
-                        pass
-                else:
-                    # Alternatywnie, jeżeli linia zawiera ciąg liczb, dodajemy je w parach.
-                    nums = self._parse_numbers_from_line(line)
-                    for i in range(0, len(nums) - 1, 2):
-                        current_detail.add_point(nums[i], nums[i + 1])
+                self._parse_line(line, current_detail)
         # Jeśli na końcu mamy niezamknięty detal, dodaj go.
         if current_detail:
             self.details.append(current_detail)
         return self.details
 
     def parse_file(self, file_path: str) -> list:
-        with open(file_path, 'r', encoding='cp1250') as f:
-            content = f.read()
-        return self.parse_content(content)
+        with LSTReader(file_path) as reader:
+            return self.parse_bytes(reader.data)
 
-    def save_details(self, output_dir: str, margin=10):
+    def save_details(self, output_dir: str, margin=10, tolerance=0.0, precision=None, workers: int = None):
+        """
+        Zapisuje podglądy SVG detali. Domyślnie z pełną geometrią (jak to_svg_string);
+        opcjonalne uproszczenie (tolerance) i zaokrąglenie (precision) – np. SVG_SIMPLIFY_TOLERANCE
+        i SVG_PRECISION – znacznie zmniejsza pliki.
+        Duże programy są zapisywane równolegle w puli procesów (workers – domyślnie liczba CPU).
+        """
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
+        filenames = []
         for idx, detail in enumerate(self.details, start=1):
             safe_name = re.sub(r'[^A-Za-z0-9_\-]', '_', detail.name)
-            filename = os.path.join(output_dir, f"detail_{idx}_{safe_name}.svg")
-            detail.save_to_svg(filename, margin)
-            print(f"Zapisano detal {idx} do pliku: {filename}")
+            filenames.append(os.path.join(output_dir, f"detail_{idx}_{safe_name}.svg"))
+
+        workers = min(workers or os.cpu_count() or 1, len(self.details) // MIN_DETAILS_PER_WORKER)
+        if workers < 2:
+            _save_svg_files(self.details, filenames, margin, tolerance, precision)
+            saved = [filenames]
+        else:
+            chunk = -(-len(self.details) // workers)
+            starts = range(0, len(self.details), chunk)
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                saved = list(executor.map(_save_svg_files,
+                                          [self.details[i:i + chunk] for i in starts],
+                                          [filenames[i:i + chunk] for i in starts],
+                                          [margin] * len(starts), [tolerance] * len(starts),
+                                          [precision] * len(starts)))
+        print(f"Zapisano {sum(map(len, saved))} detali do katalogu: {output_dir}")
 
 
 if __name__ == "__main__":
@@ -178,9 +499,12 @@ if __name__ == "__main__":
     lst_filename = "mc0929n5.LST"  # Podaj nazwę lub ścieżkę do pliku LST
     output_folder = "wyniki_svg"  # Folder wyjściowy, gdzie zostaną zapisane pliki SVG
 
+    from lst_metrics import measure_file
+
     parser = LSTParser()
     details = parser.parse_file(lst_filename)
     print(f"Znaleziono {len(details)} detali w pliku {lst_filename}.")
-    for idx, det in enumerate(details, start=1):
-        print(f"Detal {idx} ({det.name}): liczba punktów = {len(det.points)}")
+    for idx, (det, metrics) in enumerate(zip(details, measure_file(lst_filename)), start=1):
+        print(f"Detal {idx} ({det.name}): liczba punktów = {len(det.points)}, "
+              f"długość cięcia = {metrics.cut_length:.1f} mm, przebicia = {metrics.pierce_count}")
     parser.save_details(output_folder)
@@ -0,0 +1,188 @@
+"""
+Program cięcia z pliku LST wczytywany jednym przebiegiem po pliku.
+LSTReader.read_sections przekazuje sekcje do zarejestrowanych konsumentów:
+  - BEGIN_EINRICHTEPLAN_INFO – nagłówek programu (tabela MM/DA, jeśli jest),
+  - BEGIN_PARTS_IN_PROGRAM   – tabela detali: definicje kolumn MM,AT i rekordy DA,
+  - BEGIN_PROGRAMM           – geometria detali (sekcje START_TEXT ... STOP_TEXT, lst_metrics).
+Wynik (LSTProgram) zasila models.Program (parse_lst) i ProgramData (parse_lst_file).
+"""
+
+import csv
+import ntpath
+import os
+import re
+from dataclasses import dataclass, field
+from lst_geo_extractor import collect_da_blocks, parse_da_block
+from lst_metrics import measure_sections
+from lst_reader import LSTReader
+from models import Program, Detail
+from program_data import ProgramData
+
+# Kolumny tabeli detali, gdy plik nie zawiera definicji MM,AT (układ jak w generate_geo_file_content)
+DEFAULT_PART_COLUMNS = [
+    "Geometriefilename", "Anzahl", "Bearbeitungszeit", "Abmessung X", "Abmessung Y",
+    "Gewicht", "Teilenummer", "Drehlage", "Schnittlaenge", "Reserve 1", "Reserve 2",
+    "Reserve 3", "Tafel X", "Tafel Y", "Reserve 4", "Laser X", "Laser Y",
+]
+
+# Kolumny nagłówka EINRICHTEPLAN_INFO z materiałem i grubością blachy (pierwsza pasująca).
+# Opisy kolumn MM,AT zależą od konfiguracji TruTops, więc nazwy nie są stałe – materiał
+# i grubość można też odczytać z nazwy tabeli technologicznej "<materiał>-<grubość>"
+# (np. "1.0038-5"), tej samej co pole "Material (Technologietabelle)" raportu HTML.
+# Program bez materiału lub grubości jest odrzucany – nie jest wyceniany stawkami domyślnymi.
+MATERIAL_COLUMNS = ("Material", "Materialbezeichnung", "Werkstoff")
+THICKNESS_COLUMNS = ("Blechdicke", "Dicke", "Materialdicke")
+TECHNOLOGY_COLUMNS = ("Technologietabelle", "Material (Technologietabelle)")
+TECHNOLOGY_RE = re.compile(r"\s*([^\s-]+)-(\d+(?:[.,]\d+)?)")
+
+
+@dataclass
+class LSTProgram:
+    name: str
+    header: dict = field(default_factory=dict)
+    parts: list = field(default_factory=list)     # rekordy DA jako słowniki kolumna -> wartość
+    geometry: dict = field(default_factory=dict)  # nazwa GEO (casefold) -> GeometryMetrics sekcji START_TEXT
+
+
+def read_table(reader: LSTReader, start: int, end: int) -> list:
+    """
+    Tabela sekcji: definicje kolumn "MM,AT,..." (opis kolumny w polu 8)
+    i rekordy DA (z liniami kontynuacyjnymi "*") zamienione na słowniki.
+    """
+    lines = list(reader.lines(start, end))
+    columns = [
+        fields[8] for fields in csv.reader(
+            (line for line in lines if line.startswith("MM,AT,")), quotechar="'", skipinitialspace=True
+        ) if len(fields) > 8
+    ]
+    columns = columns or DEFAULT_PART_COLUMNS
+    return [dict(zip(columns, parse_da_block(block))) for block in collect_da_blocks(lines)]
+
+
+def _read_geometry(reader: LSTReader, start: int, end: int) -> dict:
+    """Metryki sekcji geometrii według nazwy pliku GEO; sekcje bez nazwy są pomijane."""
+    geometry = {}
+    for name, metrics in measure_sections(reader.data, start, end):
+        if name:
+            geometry.setdefault(name.casefold(), metrics)
+    return geometry
+
+
+def read_lst_program(file_path: str, data: bytes = None) -> LSTProgram:
+    """Wczytuje nagłówek, tabelę detali i metryki geometrii w jednym przebiegu po pliku."""
+    with LSTReader(file_path, data=data) as reader:
+        sections = reader.read_sections({
+            "EINRICHTEPLAN_INFO": read_table,
+            "PARTS_IN_PROGRAM": read_table,
+            "PROGRAMM": _read_geometry,
+        })
+    header_rows = sections.get("EINRICHTEPLAN_INFO") or [{}]
+    return LSTProgram(
+        name=os.path.splitext(ntpath.basename(file_path))[0],
+        header=header_rows[0],
+        parts=sections.get("PARTS_IN_PROGRAM", []),
+        geometry=sections.get("PROGRAMM", {}),
+    )
+
+
+def _first(mapping: dict, keys, default=""):
+    for key in keys:
+        if mapping.get(key):
+            return mapping[key]
+    return default
+
+
+def material_and_thickness(lst: LSTProgram) -> tuple:
+    """
+    Materiał i grubość blachy [mm] z nagłówka programu: z kolumn MATERIAL_COLUMNS
+    i THICKNESS_COLUMNS, a brakujące – z nazwy tabeli technologicznej (TECHNOLOGY_COLUMNS).
+    Zgłasza ValueError, gdy którejś wartości nie ma – wycena stawkami domyślnymi
+    (stal czarna, grubość 0) byłaby błędna.
+    """
+    material = _first(lst.header, MATERIAL_COLUMNS).strip()
+    thickness = _to_float(_first(lst.header, THICKNESS_COLUMNS, "0"))
+    technology = TECHNOLOGY_RE.match(_first(lst.header, TECHNOLOGY_COLUMNS))
+    if technology:
+        material = material or technology.group(1)
+        thickness = thickness or _to_float(technology.group(2))
+    missing = []
+    if not material:
+        missing.append("materiału")
+    if not thickness > 0:
+        missing.append("grubości blachy")
+    if missing:
+        raise ValueError(
+            f"Program LST {lst.name}: brak {' i '.join(missing)} w nagłówku EINRICHTEPLAN_INFO "
+            f"(kolumny: {', '.join(MATERIAL_COLUMNS + THICKNESS_COLUMNS + TECHNOLOGY_COLUMNS)})"
+        )
+    return material, thickness
+
+
+def _to_float(value, default=0.0) -> float:
+    try:
+        return float(str(value).replace(",", "."))
+    except ValueError:
+        return default
+
+
+def parse_lst(file_path: str, data: bytes = None) -> Program:
+    """
+    Parsuje plik LST do modelu Program, tak jak parsery PDF i HTML.
+    Długość cięcia pochodzi z sekcji geometrii (lst_metrics) wskazującej ten sam plik GEO
+    co rekord DA (porównanie nazw bez wielkości liter), a gdy takiej sekcji nie ma –
+    z kolumny Schnittlaenge.
+    """
+    lst = read_lst_program(file_path, data)
+    material, thickness = material_and_thickness(lst)
+    details = []
+    for part in lst.parts:
+        name = ntpath.splitext(ntpath.basename(part.get("Geometriefilename", "")))[0]
+        try:
+            quantity = int(part.get("Anzahl", "1"))
+        except ValueError:
+            quantity = 1
+        x = _to_float(part.get("Abmessung X"))
+        y = _to_float(part.get("Abmessung Y"))
+        # Bearbeitungszeit w minutach – jak w pozostałych parserach czas cięcia zapisujemy w godzinach
+        cut_time = int(round(_to_float(part.get("Bearbeitungszeit")) * 60)) / 3600.0
+        metrics = lst.geometry.get(name.casefold()) if name else None
+        if metrics is not None:
+            cut_length = metrics.cut_length
+        else:
+            cut_length = _to_float(part.get("Schnittlaenge"))
+        details.append(Detail(
+            name=name,
+            quantity=quantity,
+            dimensions=f"{x:.2f} x {y:.2f} mm",
+            cut_time=cut_time,
+            cut_length=cut_length,
+            weight=_to_float(part.get("Gewicht")),
+        ))
+
+    # LST nie zawiera czasu maszynowego programu – suma czasów obróbki detali
+    total_seconds = int(round(sum(d.cut_time * d.quantity for d in details) * 3600))
+    hours, rest = divmod(total_seconds, 3600)
+    machine_time = f"{hours}:{rest // 60:02d}:{rest % 60:02d}"
+    program = Program(
+        name=lst.name,
+        material=material,
+        thicknes=thickness,
+        machine_time=machine_time,
+        program_counts=1,
+        details=details,
+    )
+    return program
+
+
+def parse_lst_file(file_path: str) -> ProgramData:
+    """Dane programu LST dla parser_dispatcher – wiersze detali jako słowniki (kolumna -> wartość)."""
+    lst = read_lst_program(file_path)
+    material, thickness = material_and_thickness(lst)
+    return ProgramData(
+        program_name=lst.name,
+        material=material,
+        thickness=thickness,
+        program_time="",
+        program_counts="1",
+        details_table_rows=lst.parts,
+    )
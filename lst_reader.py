@@ -0,0 +1,110 @@
+"""
+Odczyt dużych plików LST przez mmap.
+Plik nie jest wczytywany ani dekodowany w całości – znaczniki sekcji
+(BEGIN_PARTS_IN_PROGRAM, START_TEXT, ...) są wyszukiwane bezpośrednio w zmapowanych bajtach,
+a linie dekodowane z cp1250 dopiero wtedy, gdy są potrzebne.
+Podział na linie odpowiada trybowi tekstowemu open() (uniwersalne znaki nowej linii).
+"""
+
+import mmap
+import re
+
+# Znaczniki sekcji pliku LST: BEGIN_<nazwa> ... ENDE_<nazwa>
+SECTION_RE = re.compile(rb"^[ \t]*(BEGIN|ENDE)_(\w+)", re.M)
+
+
+class LSTReader:
+    def __init__(self, path: str, encoding: str = "cp1250", data: bytes = None):
+        """Jeśli podano data, czytnik działa na tych bajtach, a path służy tylko do opisu."""
+        self.path = path
+        self.encoding = encoding
+        self._file = None
+        if data is not None:
+            self.data = data
+            return
+        self._file = open(path, "rb")
+        try:
+            self.data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Pustego pliku nie da się zmapować
+            self.data = b""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        if self._file:
+            self._file.close()
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def find(self, marker: str, start: int = 0, end: int = None) -> int:
+        """Pozycja (w bajtach) pierwszego wystąpienia znacznika lub -1."""
+        end = len(self.data) if end is None else end
+        return self.data.find(marker.encode(self.encoding), start, end)
+
+    def line_start(self, pos: int) -> int:
+        """Początek linii zawierającej bajt o pozycji pos."""
+        return max(self.data.rfind(b"\n", 0, pos), self.data.rfind(b"\r", 0, pos)) + 1
+
+    def seek(self, marker: str, start: int = 0) -> int:
+        """Początek pierwszej linii zawierającej znacznik (od pozycji start) lub -1."""
+        pos = self.find(marker, start)
+        return -1 if pos == -1 else self.line_start(pos)
+
+    def iter_lines(self, start: int = 0, end: int = None):
+        """Kolejne linie (bajty, bez znaków nowej linii) z zakresu [start, end)."""
+        data = self.data
+        end = len(data) if end is None else end
+        pos = start
+        while pos < end:
+            newline = data.find(b"\n", pos, end)
+            stop = end if newline == -1 else newline
+            line = data[pos:stop]
+            if line.endswith(b"\r"):
+                line = line[:-1]
+            if b"\r" in line:
+                yield from line.split(b"\r")
+            else:
+                yield line
+            pos = stop + 1
+
+    def lines(self, start: int = 0, end: int = None):
+        """Kolejne linie z zakresu [start, end), dekodowane pojedynczo."""
+        encoding = self.encoding
+        for line in self.iter_lines(start, end):
+            yield line.decode(encoding)
+
+    def line_end(self, pos: int) -> int:
+        """Pozycja początku linii następującej po linii zawierającej bajt pos."""
+        newline = self.data.find(b"\n", pos)
+        return len(self.data) if newline == -1 else newline + 1
+
+    def read_sections(self, consumers: dict) -> dict:
+        """
+        Jeden przebieg po znacznikach BEGIN_<nazwa>/ENDE_<nazwa>: zawartość każdej sekcji
+        (bez linii znaczników), dla której zarejestrowano konsumenta, jest przekazywana
+        jako consumers[nazwa](reader, start, end). Zwraca wyniki konsumentów według nazw sekcji.
+        Sekcja bez znacznika końca trwa do końca pliku.
+        """
+        results = {}
+        open_name = None
+        start = 0
+        for marker in SECTION_RE.finditer(self.data):
+            kind, name = marker.group(1), marker.group(2).decode("ascii")
+            if kind == b"BEGIN":
+                if open_name is None and name in consumers:
+                    open_name = name
+                    start = self.line_end(marker.end())
+            elif name == open_name:
+                results[name] = consumers[name](self, start, self.line_start(marker.start()))
+                open_name = None
+        if open_name is not None:
+            results[open_name] = consumers[open_name](self, start, len(self.data))
+        return results
@@ -10,7 +10,7 @@ from PyQt5 import QtCore, QtGui, QtWidgets
 from PyQt5.QtWidgets import QFileDialog
 from parser_dispatcher import get_program_data
 from detail_data import get_element_data
-import glob
+from utils import get_directory_index
 
 
 class MainWindow(QtWidgets.QMainWindow):
@@ -133,6 +133,7 @@ class MainWindow(QtWidgets.QMainWindow):
             # Jeśli wczytano plik HTML, przypisujemy ścieżki do rysunków bmp
             if file_path.lower().endswith(".html"):
                 base_dir = os.path.dirname(file_path)
+                image_index = get_directory_index(base_dir)
                 for detail in self.detail_list:
                     # Upewnij się, że nazwy są bez zbędnych spacji
                     prog_name = self.program_data.program_name.strip()
@@ -140,7 +141,7 @@ class MainWindow(QtWidgets.QMainWindow):
                     # Wzorzec: nazwa-programu_nazwa-detalu*.bmp
                     pattern = os.path.join(base_dir, f"*{prog_name}_{det_name}*.bmp")
                     print("Szukam plików według wzorca:", pattern)
-                    matches = glob.glob(pattern)
+                    matches = image_index.match_top_level(f"{prog_name}_{det_name}", ".bmp")
                     if matches:
                         print("Znaleziono:", matches)
                         detail.drawing_path = matches[0]
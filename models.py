@@ -1,5 +1,6 @@
 from dataclasses import dataclass, field
 from typing import List, Optional
+from pricing import classify_material, rate_tables, price_program, program_total
 
 @dataclass
 class Detail:
@@ -13,28 +14,12 @@ class Detail:
     image_path: Optional[str] = None  # ścieżka do obrazka (BMP) detalu
 
     def cutting_cost(self, config: dict, material: str) -> float:
-        material_lower = material.lower()
-        if "1.4301" in material_lower:
-            rate = config.get("cutting_costs", {}).get("stal_nierdzewna", 6.0)
-        elif "1.0038" in material_lower or "st37" in material_lower:
-            rate = config.get("cutting_costs", {}).get("stal_czarna", 5.0)
-        elif "aluminium" in material_lower:
-            rate = config.get("cutting_costs", {}).get("aluminium", 4.5)
-        else:
-            rate = config.get("cutting_costs", {}).get("stal_czarna", 5.0)
-        return round(self.cut_time * rate, 2)
+        cutting_rates, _ = rate_tables(config)
+        return round(self.cut_time * cutting_rates[classify_material(material)], 2)
 
     def material_cost(self, config: dict, material: str) -> float:
-        material_lower = material.lower()
-        if "1.4301" in material_lower:
-            cost = config.get("material_costs", {}).get("stal_nierdzewna", 3.0)
-        elif "1.0038" in material_lower or "st37" in material_lower:
-            cost = config.get("material_costs", {}).get("stal_czarna", 2.5)
-        elif "aluminium" in material_lower:
-            cost = config.get("material_costs", {}).get("aluminium", 1.5)
-        else:
-            cost = config.get("material_costs", {}).get("stal_czarna", 2.5)
-        return round(self.weight * cost, 2)
+        _, material_rates = rate_tables(config)
+        return round(self.weight * material_rates[classify_material(material)], 2)
 
     def total_cost(self, config: dict, material: str) -> float:
         return round(self.cutting_cost(config, material) + self.material_cost(config, material), 2)
@@ -53,9 +38,7 @@ class Program:
         return sum(detail.cut_time * detail.quantity for detail in self.details)
 
     def total_cost(self, config: dict) -> float:
-        details_cost = sum(detail.total_cost(config, self.material) * detail.quantity for detail in self.details)
-        bending_cost = config.get("suma_kosztow_giecia", 0.0)
-        return round(details_cost + bending_cost, 2)
+        return program_total(price_program(self, config), config)
 
     def add_detail(self, detail: Detail):
         self.details.append(detail)
@@ -1,7 +1,7 @@
 import re
 from models import Program, Detail
-from pdf_utils import find_field, find_in_section, extract_all_detail_images
-from utils import copy_image_to_static
+from pdf_utils import extract_all_detail_images
+from utils import store_pdf_image
 
 def parse_detail_section(section_text: str) -> Detail:
     """
@@ -97,45 +97,157 @@ def parse_detail_section(section_text: str) -> Detail:
         image_path=None
     )
 
-def parse_pdf_new(doc, full_text: str) -> Program:
+DETAIL_BLOCK_START = "Informacja o pojedynczych detalach/zleceniu"
+DETAIL_BLOCK_END = "Zlecenia wykonania"
+
+# Wzorce nagłówka – sprawdzane na przesuwanym oknie kilku ostatnich linii
+PROGRAM_NAME_RE = re.compile(r"Liczba detali:\s*Liczba arkuszy:\s*\n\s*(\S+)", re.IGNORECASE | re.MULTILINE)
+PROGRAM_COUNTS_RE = re.compile(r"Czas\s+trwania\s*\n\s*(\S+)\s+(\d+)", re.IGNORECASE | re.MULTILINE)
+MATERIAL_RE = re.compile(r"[A-Z0-9]+----[0-9x]+\s*\((\d+\.\d+)\)", re.IGNORECASE)
+DIMENSIONS_RE = re.compile(r'(\d+,\d+)\s*x\s*(\d+,\d+)\s*x\s*(\d+,\d+)\s*mm', re.IGNORECASE)
+MACHINE_TIME_RE = re.compile(r"Czas trwania", re.IGNORECASE)
+SECTION_START_RE = re.compile(r"(?:#\s*)?Nr\s*(?:czesci|części):", re.IGNORECASE)
+
+# Liczba ostatnich linii, na których szukane są wzorce nagłówka obejmujące kilka linii
+HEADER_WINDOW = 3
+
+
+def iter_span_lines(cache):
+    """
+    Generator par (numer strony, linia) nowego formatu PDF – strona po stronie, bez
+    sklejania całego dokumentu. Linia to teksty spanów rozdzielone spacjami (PyMuPDF "dict").
+    """
+    for page_number in range(len(cache)):
+        page_dict = cache.page_dict(page_number, keep=False)
+        for block in page_dict.get("blocks", []):
+            if "lines" in block:
+                for line in block["lines"]:
+                    yield page_number, "".join(span["text"] + " " for span in line["spans"])
+            elif "text" in block:
+                for line in block["text"].split("\n"):
+                    yield page_number, line
+
+
+class NewFormatScanner:
+    """
+    Automat stanów rozpoznający kolejno podawane linie nowego formatu PDF:
+    pola nagłówka programu, blok "Informacja o pojedynczych detalach/zleceniu"
+    oraz poszczególne sekcje "Nr części:". Pamięta tylko bieżącą sekcję detalu
+    i kilka ostatnich linii, więc zużycie pamięci nie zależy od rozmiaru raportu.
+    """
+
+    HEADER, DETAILS, DONE = range(3)
+
+    def __init__(self):
+        self.state = self.HEADER
+        self.window = []
+        self.program_name = None
+        self.program_counts = None
+        self.material = None
+        self.thicknes = None
+        self.machine_time = None
+        self._machine_time_pending = False
+        self.section_lines = []
+        self.section_count = 0
+        self.detail_page = None
+        self.details = []
+
+    def feed(self, line: str, page_number: int = None):
+        self._scan_header(line)
+        if self.state == self.HEADER:
+            if DETAIL_BLOCK_START not in line:
+                return
+            line = line.split(DETAIL_BLOCK_START, 1)[1].lstrip()
+            self.state = self.DETAILS
+            self.detail_page = page_number
+        if self.state == self.DETAILS:
+            if DETAIL_BLOCK_END in line:
+                self._feed_detail_line(line.split(DETAIL_BLOCK_END, 1)[0])
+                self._end_section()
+                self.state = self.DONE
+            else:
+                self._feed_detail_line(line)
+
+    def close(self):
+        if self.state == self.DETAILS:
+            self._end_section()
+            self.state = self.DONE
+
+    def _scan_header(self, line: str):
+        if self.machine_time is None:
+            if self._machine_time_pending:
+                if line.strip():
+                    self.machine_time = line.strip()
+            else:
+                m = MACHINE_TIME_RE.search(line)
+                if m:
+                    rest = line[m.end():]
+                    rest = rest[1:] if rest.startswith(":") else rest
+                    if rest.strip():
+                        self.machine_time = rest.strip()
+                    else:
+                        self._machine_time_pending = True
+
+        self.window.append(line)
+        if len(self.window) > HEADER_WINDOW:
+            self.window.pop(0)
+        if (self.program_name is not None and self.program_counts is not None
+                and self.material is not None and self.thicknes is not None):
+            return
+        text = "\n".join(self.window) + "\n"
+        if self.program_name is None:
+            m = PROGRAM_NAME_RE.search(text)
+            if m:
+                self.program_name = m.group(1).strip()
+        if self.program_counts is None:
+            m = PROGRAM_COUNTS_RE.search(text)
+            if m:
+                self.program_counts = int(m.group(2))
+        if self.material is None:
+            m = MATERIAL_RE.search(text)
+            if m:
+                self.material = m.group(1).strip()
+        if self.thicknes is None:
+            m = DIMENSIONS_RE.search(text)
+            if m:
+                try:
+                    self.thicknes = abs(float(m.group(3).replace(",", ".")))
+                except Exception:
+                    self.thicknes = 0.0
+
+    def _feed_detail_line(self, line: str):
+        m = SECTION_START_RE.match(line)
+        if m:
+            self._end_section()
+            line = line[m.end():]
+        self.section_lines.append(line)
+
+    def _end_section(self):
+        section = "\n".join(self.section_lines).strip()
+        self.section_lines = []
+        if not section:
+            return
+        self.section_count += 1
+        if "Plik geo:" in section:
+            self.details.append(parse_detail_section(section))
+
+
+def parse_pdf_new(cache, full_text: str = None) -> Program:
+    """
+    Parsuje PDF nowego typu wyłącznie ze słowników spanów – nie potrzebuje
+    pełnego tekstu dokumentu (parametr full_text pozostaje dla zgodności).
+    """
     try:
-        combined_text = ""
-        for page in doc:
-            page_dict = page.get_text("dict")
-            for block in page_dict.get("blocks", []):
-                if "lines" in block:
-                    for line in block["lines"]:
-                        for span in line["spans"]:
-                            combined_text += span["text"] + " "
-                        combined_text += "\n"
-                elif "text" in block:
-                    combined_text += block["text"] + "\n"
-
-        prog_name_match = re.search(r"Liczba detali:\s*Liczba arkuszy:\s*\n\s*(\S+)", combined_text,
-                                    re.IGNORECASE | re.MULTILINE)
-        program_name = prog_name_match.group(1).strip() if prog_name_match else ""
-
-        rep_match = re.search(r"Czas\s+trwania\s*\n\s*(\S+)\s+(\d+)", combined_text,
-                              re.IGNORECASE | re.MULTILINE)
-        program_counts = int(rep_match.group(2)) if rep_match else 0
-
-        material_match = re.search(r"[A-Z0-9]+----[0-9x]+\s*\((\d+\.\d+)\)", combined_text,
-                                   re.IGNORECASE)
-        material = material_match.group(1).strip() if material_match else ""
-
-        dimensions_regex = r'(\d+,\d+)\s*x\s*(\d+,\d+)\s*x\s*(\d+,\d+)\s*mm'
-        dim_match = re.search(dimensions_regex, combined_text, re.IGNORECASE)
-        if dim_match:
-            thick_str = dim_match.group(3).replace(",", ".")
-            try:
-                thicknes = abs(float(thick_str))
-            except Exception:
-                thicknes = 0.0
-        else:
-            thicknes = 0.0
+        scanner = NewFormatScanner()
+        for page_number, line in iter_span_lines(cache):
+            scanner.feed(line, page_number)
+        scanner.close()
 
-        machine_time = find_field(combined_text, "Czas trwania")
-        machine_time = re.sub(r"\s*\[.*\]", "", machine_time).strip()
+        program_name = scanner.program_name or ""
+        program_counts = scanner.program_counts or 0
+        material = scanner.material or ""
+        thicknes = scanner.thicknes or 0.0
+        machine_time = re.sub(r"\s*\[.*\]", "", scanner.machine_time or "").strip()
 
         print("Nowy PDF:")
         print("1. Nazwa programu:", program_name)
@@ -143,31 +255,13 @@ def parse_pdf_new(doc, full_text: str) -> Program:
         print("3. Czas trwania:", machine_time)
         print("4. Ilość powtórzeń programu:", program_counts)
         print("5. GRUBOŚĆ:", thicknes)
+        print("Found", scanner.section_count, "detail sections")
 
-        if "Informacja o pojedynczych detalach/zleceniu" in combined_text:
-            detail_block = combined_text.split("Informacja o pojedynczych detalach/zleceniu", 1)[1].strip()
-            if "Zlecenia wykonania" in detail_block:
-                detail_block = detail_block.split("Zlecenia wykonania", 1)[0].strip()
-        else:
-            detail_block = ""
-
-        print("Detail block (wycięty):")
-        print(detail_block)
-
-        detail_sections = re.split(r"(?im)^(?:#\s*)?Nr\s*(?:czesci|części):", detail_block)
-        detail_sections = [sec.strip() for sec in detail_sections if sec.strip()]
-        print("Found", len(detail_sections), "detail sections")
-
-        details = []
-        for sec in detail_sections:
-            if "Plik geo:" in sec:
-                det = parse_detail_section(sec)
-                details.append(det)
-
-        images = extract_all_detail_images(doc)
+        details = scanner.details
+        images = extract_all_detail_images(cache, scanner.detail_page)
         for i, det in enumerate(details):
             if i < len(images):
-                det.image_path = copy_image_to_static(images[i])
+                det.image_path = store_pdf_image(images[i])
 
         prog = Program(
             name=program_name,
@@ -1,9 +1,9 @@
 import re
 from models import Program, Detail
-from pdf_utils import find_field, find_in_section, extract_all_detail_images, extract_detail_name, find_multiline_field
-from utils import copy_image_to_static
+from pdf_utils import LabelIndex, extract_all_detail_images, extract_detail_name
+from utils import store_pdf_image
 
-def parse_pdf_old(doc, full_text: str) -> Program:
+def parse_pdf_old(cache, full_text: str) -> Program:
     """
     Parsuje plik PDF starego typu – dodatkowo wyodrębnia:
       - czas obróbki z etykiety "CZAS OBRÓBKI:" (wartość w minutach) przeliczany na godziny,
@@ -12,13 +12,15 @@ def parse_pdf_old(doc, full_text: str) -> Program:
       - wagę detalu z etykiety "CIĘŻAR:" (wartość zakończona "kg").
       Wymiary są zaokrąglane do dwóch miejsc po przecinku.
     """
-    program_name_full = find_field(full_text, "NAZWA PROGRAMU")
+    # Jedno przejście po tekście buduje indeks etykiet – dalej tylko wyszukiwanie w słowniku
+    header = LabelIndex(full_text)
+    program_name_full = header.get("NAZWA PROGRAMU")
     program_name = program_name_full[:-2] if len(program_name_full) >= 2 else program_name_full
-    material = find_field(full_text, r"MATERIAŁ \(ARKUSZ\)")
-    machine_time_full = find_field(full_text, "CZAS MASZYNOWY")
+    material = header.get("MATERIAŁ (ARKUSZ)")
+    machine_time_full = header.get("CZAS MASZYNOWY")
     machine_time = machine_time_full[0:11] if len(machine_time_full) >= 11 else machine_time_full
     try:
-        program_counts = int(find_field(full_text, "ILOŚĆ PRZEBIEGÓW PROGRAMU"))
+        program_counts = int(header.get("ILOŚĆ PRZEBIEGÓW PROGRAMU"))
     except ValueError:
         program_counts = 0
     material_sub = material[:10]
@@ -50,21 +52,22 @@ def parse_pdf_old(doc, full_text: str) -> Program:
         details_text = ""
 
     detail_sections = re.split(r"NUMER CZĘŚCI:", details_text)[1:]
-    images = extract_all_detail_images(doc)
+    images = extract_all_detail_images(cache)
     if len(images) == len(detail_sections) + 1:
         images.pop()
     details = []
     image_index = 0
     detail_counter = 1
     for sec in detail_sections:
-        geo_name_full = find_multiline_field(sec, "NAZWA PLIKU GEO")
+        fields = LabelIndex(sec)
+        geo_name_full = fields.get_multiline("NAZWA PLIKU GEO")
         geo_name = extract_detail_name(geo_name_full)
-        quantity = find_in_section(sec, "ILOŚĆ")
+        quantity = fields.get("ILOŚĆ")
         try:
             quantity = int(quantity)
         except ValueError:
             quantity = 1
-        raw_dimensions = find_in_section(sec, "WYMIARY")
+        raw_dimensions = fields.get("WYMIARY")
         m = re.match(r"([\d,\.]+)\s*x\s*([\d,\.]+)", raw_dimensions)
         if m:
             x = float(m.group(1).replace(',', '.'))
@@ -72,7 +75,7 @@ def parse_pdf_old(doc, full_text: str) -> Program:
             dimensions = f"{x:.2f} x {y:.2f} mm"
         else:
             dimensions = raw_dimensions
-        cut_time_str = find_in_section(sec, "CZAS OBRÓBKI")
+        cut_time_str = fields.get("CZAS OBRÓBKI")
         # Usuwamy dodatkowe teksty, wyciągamy tylko liczbę przed "min"
         m = re.search(r'([\d\.]+)\s*min', cut_time_str, re.IGNORECASE)
         if m:
@@ -81,7 +84,7 @@ def parse_pdf_old(doc, full_text: str) -> Program:
             cut_time = total_seconds / 3600.0
         else:
             cut_time = 0.0
-        weight_str = find_in_section(sec, "CIĘŻAR")
+        weight_str = fields.get("CIĘŻAR")
         if weight_str.endswith("kg"):
             m = re.search(r'([\d,\.]+)\s*kg', weight_str, re.IGNORECASE)
             if m:
@@ -94,9 +97,8 @@ def parse_pdf_old(doc, full_text: str) -> Program:
         cut_length = 0.0
 
         if image_index < len(images):
-            original_image_path = images[image_index]
+            image_path = store_pdf_image(images[image_index])
             image_index += 1
-            image_path = copy_image_to_static(original_image_path)
         else:
             image_path = None
 
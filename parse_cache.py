@@ -0,0 +1,175 @@
+"""
+Trwała pamięć podręczna wyników parsowania plików programów (PDF/HTML/LST).
+Kluczem jest skrót SHA-256 zawartości pliku oraz wersja kodu parserów –
+zmiana któregokolwiek modułu parsera automatycznie unieważnia stare wpisy.
+Wynik zależny od plików obok raportu (rysunki detali HTML) dostaje dodatkowo
+skrót tych plików (context), więc zmiana rysunków również unieważnia wpis.
+Rozmiar katalogu jest ograniczony, a najdawniej używane wpisy są usuwane (LRU).
+"""
+
+import functools
+import hashlib
+import os
+import pickle
+import uuid
+from utils import TEMP_IMAGE_DIR, ensure_temp_image_dir
+
+CACHE_DIR = os.path.join(os.getcwd(), "cache")
+
+# Moduły, których kod wpływa na wynik parsowania
+PARSER_MODULES = [
+    "html_parser.py",
+    "pdf_parser.py",
+    "pdf_utils.py",
+    "old_pdf_file_parser.py",
+    "new_pdf_file_parser.py",
+    "models.py",
+    "utils.py",
+    "parser_dispatcher.py",
+    "lst_program.py",
+    "lst_reader.py",
+    "lst_parser.py",
+    "lst_metrics.py",
+    "lst_geo_extractor.py",
+]
+
+CHUNK_SIZE = 1024 * 1024
+
+
+@functools.lru_cache(maxsize=1)
+def parser_version() -> str:
+    """Zwraca skrót kodu źródłowego parserów (zmienia się przy każdej zmianie parsera)."""
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256()
+    for module in PARSER_MODULES:
+        path = os.path.join(base_dir, module)
+        digest.update(module.encode("utf-8"))
+        try:
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        except OSError:
+            continue
+    return digest.hexdigest()[:16]
+
+
+def file_digest(file_path: str) -> str:
+    """Liczy skrót SHA-256 pliku, czytając go fragmentami."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def stream_digest(stream) -> tuple:
+    """
+    Czyta strumień (np. przesyłany plik) fragmentami, licząc SHA-256 w locie.
+    Zwraca (skrót, zawartość) – plik nie jest zapisywany ani czytany ponownie.
+    """
+    digest = hashlib.sha256()
+    chunks = []
+    for chunk in iter(lambda: stream.read(CHUNK_SIZE), b""):
+        digest.update(chunk)
+        chunks.append(chunk)
+    return digest.hexdigest(), b"".join(chunks)
+
+
+class ParseCache:
+    """
+    Pamięć podręczna obiektów Program wraz z obrazami detali.
+    Każdy wpis to jeden plik pickle w katalogu cache_dir; czas modyfikacji
+    pliku pełni rolę znacznika ostatniego użycia dla polityki LRU.
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR, max_bytes: int = 256 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def key(self, digest: str, kind: str, context: str = None) -> str:
+        key = f"{kind}_{digest}_{parser_version()}"
+        return f"{key}_{context}" if context else key
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ".pkl")
+
+    def get(self, key: str):
+        """Zwraca zapamiętany Program (z odtworzonymi obrazami) albo None."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                entry = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Uszkodzony wpis cache {path}: {e}")
+            self._remove(path)
+            return None
+        # Odświeżenie znacznika ostatniego użycia (LRU)
+        os.utime(path, None)
+        program = entry["program"]
+        for detail, image in zip(program.details, entry["images"]):
+            detail.image_path = _restore_image(image) if image else None
+        return program
+
+    def put(self, key: str, program):
+        """Zapisuje Program wraz z zawartością jego obrazów i przycina cache do limitu."""
+        images = [_read_image(detail.image_path) for detail in program.details]
+        entry = {"program": program, "images": images}
+        path = self._path(key)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Nie udało się zapisać wpisu cache {path}: {e}")
+            self._remove(tmp_path)
+            return
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".pkl"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+        entries.sort()
+        while entries and total > self.max_bytes:
+            _, size, path = entries.pop(0)
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _read_image(image_path):
+    if not image_path or not os.path.exists(image_path):
+        return None
+    with open(image_path, "rb") as f:
+        return os.path.basename(image_path), f.read()
+
+
+def _restore_image(image) -> str:
+    """Zapisuje obraz z cache do TEMP_IMAGE_DIR pod nową, unikalną nazwą."""
+    base_name, data = image
+    name, ext = os.path.splitext(base_name)
+    # Usuwamy poprzedni sufiks uuid, aby nazwy nie rosły przy kolejnych odtworzeniach
+    name = name.rsplit("_", 1)[0] if "_" in name else name
+    ensure_temp_image_dir()
+    unique_name = f"{name}_{uuid.uuid4().hex}{ext}"
+    with open(os.path.join(TEMP_IMAGE_DIR, unique_name), "wb") as f:
+        f.write(data)
+    return os.path.join("static", "images", "generated", unique_name)
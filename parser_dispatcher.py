@@ -1,21 +1,114 @@
 """
-Moduł wybierający odpowiedni parser (HTML, LST lub PDF) na podstawie rozszerzenia pliku.
+Rejestr formatów plików programów (HTML, LST, PDF).
+Format jest rozpoznawany po sygnaturze treści (%PDF-, <html, znaczniki BEGIN_),
+a gdy treść niczego nie rozstrzyga – po rozszerzeniu pliku.
+Moduł parsera (a z nim PyMuPDF, BeautifulSoup, PIL) jest importowany dopiero
+przy pierwszym pliku danego formatu, dzięki czemu aplikacja, GUI i narzędzia wsadowe
+startują bez ładowania bibliotek, które mogą nie być potrzebne.
 """
 
+import importlib
 import os
-from html_parser import parse_html_file
-from lst_parser import parse_lst_file
-from pdf_parser import parse_pdf_file
-from program_data import ProgramData
+import threading
+from dataclasses import dataclass
 
+# Ile bajtów z początku pliku jest czytanych przy rozpoznawaniu formatu
+SIGNATURE_BYTES = 4096
 
-def get_program_data(file_path):
+
+@dataclass(frozen=True)
+class ParserFormat:
+    name: str                  # nazwa formatu (klucz pamięci podręcznej, komunikaty)
+    extensions: tuple          # rozszerzenia (małe litery, z kropką)
+    signatures: tuple          # znaczniki treści (bajty, porównanie bez wielkości liter)
+    module: str                # moduł parsera, importowany przy pierwszym użyciu
+    program_func: str          # funkcja (file_path, data=None, ...) -> models.Program
+    program_data_func: str = None  # funkcja (file_path) -> ProgramData, jeśli format ją ma
+    anchored: bool = True      # sygnatura musi wystąpić na początku treści (po BOM i białych znakach)
+
+
+FORMATS = (
+    ParserFormat("pdf", (".pdf",), (b"%PDF-",), "pdf_parser", "parse_pdf"),
+    ParserFormat("html", (".html",), (b"<!doctype html", b"<html"), "html_parser", "parse_html"),
+    # Plik LST nie musi zaczynać się od sekcji – znacznik szukany jest w całym nagłówku
+    ParserFormat("lst", (".lst",), (b"BEGIN_EINRICHTEPLAN_INFO", b"BEGIN_PARTS_IN_PROGRAM", b"BEGIN_PROGRAMM"),
+                 "lst_program", "parse_lst", "parse_lst_file", anchored=False),
+)
+
+_modules = {}
+_modules_lock = threading.Lock()
+
+
+def supported_extensions() -> tuple:
+    return tuple(ext for fmt in FORMATS for ext in fmt.extensions)
+
+
+def format_by_extension(file_path: str) -> ParserFormat:
     ext = os.path.splitext(file_path)[1].lower()
-    if ext == ".html":
-        return parse_html_file(file_path)
-    elif ext == ".lst":
-        return parse_lst_file(file_path)
-    elif ext == ".pdf":
-        return parse_pdf_file(file_path)
+    for fmt in FORMATS:
+        if ext in fmt.extensions:
+            return fmt
+    return None
+
+
+def format_by_signature(head: bytes) -> ParserFormat:
+    """Format rozpoznany po początku treści pliku albo None."""
+    lowered = head.lower()
+    stripped = lowered.lstrip(b"\xef\xbb\xbf").lstrip()
+    for fmt in FORMATS:
+        for signature in fmt.signatures:
+            signature = signature.lower()
+            if stripped.startswith(signature) if fmt.anchored else signature in lowered:
+                return fmt
+    return None
+
+
+def detect_format(file_path: str, data: bytes = None) -> ParserFormat:
+    """
+    Format pliku: najpierw według sygnatury treści (z data lub z początku pliku),
+    a gdy jej brak – według rozszerzenia. Zwraca None dla nieobsługiwanego pliku.
+    """
+    if data is not None:
+        head = bytes(data[:SIGNATURE_BYTES])
     else:
-        raise ValueError("Unsupported file type: " + ext)
+        try:
+            with open(file_path, "rb") as f:
+                head = f.read(SIGNATURE_BYTES)
+        except OSError:
+            head = b""
+    return format_by_signature(head) or format_by_extension(file_path)
+
+
+def load_parser(fmt: ParserFormat):
+    """Moduł parsera formatu – importowany przy pierwszym wywołaniu i zapamiętywany."""
+    module = _modules.get(fmt.name)
+    if module is None:
+        with _modules_lock:
+            module = _modules.get(fmt.name)
+            if module is None:
+                module = _modules[fmt.name] = importlib.import_module(fmt.module)
+    return module
+
+
+def _require_format(file_path: str, data: bytes = None, fmt: ParserFormat = None) -> ParserFormat:
+    fmt = fmt or detect_format(file_path, data)
+    if fmt is None:
+        raise ValueError("Unsupported file type: " + os.path.splitext(file_path)[1].lower())
+    return fmt
+
+
+def parse_program(file_path: str, data: bytes = None, fmt: ParserFormat = None, pdf_workers: int = 1):
+    """Parsuje plik programu do models.Program parserem wykrytego (lub podanego) formatu."""
+    fmt = _require_format(file_path, data, fmt)
+    parse = getattr(load_parser(fmt), fmt.program_func)
+    if fmt.name == "pdf":
+        return parse(file_path, workers=pdf_workers, data=data)
+    return parse(file_path, data=data)
+
+
+def get_program_data(file_path):
+    """Dane programu (ProgramData) dla GUI main_gui – dostępne dla formatów z program_data_func."""
+    fmt = _require_format(file_path)
+    if fmt.program_data_func is None:
+        raise ValueError(f"Format {fmt.name.upper()} nie udostępnia danych ProgramData: {file_path}")
+    return getattr(load_parser(fmt), fmt.program_data_func)(file_path)
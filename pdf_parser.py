@@ -1,27 +1,149 @@
 # pdf_parser.py
+import logging
+import multiprocessing
+import os
+import threading
 import fitz  # PyMuPDF
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from models import Program, Detail
 import old_pdf_file_parser
 import new_pdf_file_parser
 from pdf_utils import *  # Import funkcji pomocniczych
 
+logger = logging.getLogger(__name__)
 
-def parse_pdf(file_path: str) -> Program:
+# Poniżej tej liczby stron na proces narzut puli procesów przewyższa zysk
+MIN_PAGES_PER_WORKER = 8
+
+# Wspólna pula procesów do odczytu stron – tworzona przy pierwszym użyciu i używana przez
+# wszystkie wywołania parse_pdf. Kontekst "spawn", bo fork procesu z wieloma wątkami
+# (serwer Flask, wątki zadań) nie jest bezpieczny; procesy uruchamiane są dopiero w miarę potrzeb.
+_page_pool = None
+_page_pool_lock = threading.Lock()
+
+
+def _open_pdf(source):
+    """Otwiera dokument ze ścieżki albo bezpośrednio z bajtów (bez zapisu na dysk)."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return fitz.open(stream=source, filetype="pdf")
+    return fitz.open(source)
+
+
+def _extract_pages(source, page_numbers: list, want_text: bool = True, want_dict: bool = True) -> list:
+    """
+    Funkcja procesu roboczego – otwiera własny uchwyt dokumentu (obiektów fitz
+    nie można współdzielić między wątkami/procesami) i zwraca dla podanych stron
+    tekst, słownik spanów, listę obrazów oraz dane wyodrębnionych obrazów.
+    Tekst i słownik spanów są pobierane tylko wtedy, gdy potrzebuje ich wybrany parser.
+    """
+    doc = _open_pdf(source)
+    results = []
+    seen_xrefs = set()
+    # Tylko zakres od pierwszej strony wie, że poprzedza sekcję detali – pozostałe wyodrębniają obrazy zawsze
+    in_detail_section = page_numbers[0] > 0
+    try:
+        for page_number in page_numbers:
+            page = doc.load_page(page_number)
+            text = page.get_text("text") if want_text else None
+            page_dict = None
+            if want_dict:
+                page_dict = page.get_text("dict")
+                # Bloki obrazów (type 1) nie są potrzebne parserom, a zawierają surowe bajty
+                page_dict["blocks"] = [b for b in page_dict.get("blocks", []) if b.get("type", 0) == 0]
+            images = page.get_images(full=True)
+            image_data = {}
+            if not in_detail_section:
+                marker_text = text if text is not None else _dict_text(page_dict)
+                in_detail_section = any(marker in marker_text for marker in DETAIL_MARKERS)
+            for img in images:
+                xref = img[0]
+                if in_detail_section and xref not in seen_xrefs:
+                    seen_xrefs.add(xref)
+                    image_data[xref] = doc.extract_image(xref)
+            results.append((page_number, text, page_dict, images, image_data))
+    finally:
+        doc.close()
+    return results
+
+
+def _dict_text(page_dict: dict) -> str:
+    return "\n".join(
+        " ".join(span["text"] for line in block["lines"] for span in line["spans"])
+        for block in page_dict.get("blocks", []) if "lines" in block
+    )
+
+
+def _get_page_pool() -> ProcessPoolExecutor:
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is None:
+            _page_pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1,
+                                             mp_context=multiprocessing.get_context("spawn"))
+        return _page_pool
+
+
+def _discard_page_pool(pool: ProcessPoolExecutor):
+    """Usuwa uszkodzoną pulę (np. po awarii procesu) – następne wywołanie utworzy nową."""
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is pool:
+            _page_pool = None
+    pool.shutdown(wait=False)
+
+
+def _preload_parallel(cache: PdfPageCache, source, workers: int, pdf_format: PdfFormat = None):
     """
-    Parsuje plik PDF – automatycznie wykrywa, czy jest to stary czy nowy format,
-    i wywołuje odpowiednią logikę parsowania.
+    Rozdziela strony na ciągłe zakresy (co najwyżej workers), przetwarza je we wspólnej
+    puli procesów i scala wyniki w cache. Gdy pula jest uszkodzona, brakujące strony
+    zostaną odczytane w bieżącym procesie.
     """
-    doc = fitz.open(file_path)
-    full_text = ""
-    for page in doc:
-        full_text += page.get_text("text")
-
-    # Jeśli w tekście występuje fraza charakterystyczna dla nowego formatu, np. "Plan konfiguracji:",
-    # wywołujemy funkcję obsługującą nowy typ pliku.
-    if "Plan konfiguracji:" in full_text:
-        program = new_pdf_file_parser.parse_pdf_new(doc, full_text)
+    page_count = len(cache)
+    workers = min(workers, page_count // MIN_PAGES_PER_WORKER)
+    if workers < 2:
+        return
+    # Nieznany format – pobieramy dane potrzebne obu parserom
+    want_text = pdf_format is None or pdf_format.name == "old"
+    want_dict = pdf_format is None or pdf_format.name == "new"
+    chunk = -(-page_count // workers)
+    ranges = [list(range(start, min(start + chunk, page_count))) for start in range(0, page_count, chunk)]
+    pool = _get_page_pool()
+    try:
+        for results in pool.map(_extract_pages, [source] * len(ranges), ranges,
+                                [want_text] * len(ranges), [want_dict] * len(ranges)):
+            for page_number, text, page_dict, images, image_data in results:
+                cache.preload(page_number, text=text, page_dict=page_dict, images=images)
+                for xref, base_image in image_data.items():
+                    cache.preload_image(xref, base_image)
+    except BrokenProcessPool:
+        logger.warning("Pula procesów PDF uszkodzona – strony zostaną odczytane sekwencyjnie")
+        _discard_page_pool(pool)
+
+
+def parse_pdf(file_path: str, workers: int = 1, data: bytes = None) -> Program:
+    """
+    Parsuje plik PDF – wykrywa format (stary/nowy) na podstawie pierwszych stron
+    i wywołuje odpowiednią logikę parsowania. Wybrany parser pobiera tylko te
+    dane stron, których potrzebuje (stary: tekst, nowy: słowniki spanów).
+    Przy workers > 1 strony dużych dokumentów są przetwarzane równolegle w puli procesów.
+    Jeśli podano data, dokument jest otwierany z pamięci, a file_path służy tylko do opisu.
+    """
+    source = data if data is not None else file_path
+    doc = _open_pdf(source)
+    # Każda strona jest odczytywana tylko raz – wyniki współdzielą wszystkie etapy parsowania.
+    cache = PdfPageCache(doc)
+    pdf_format = None
+    if workers and workers > 1:
+        pdf_format = detect_pdf_format(cache, full_scan=False)
+        _preload_parallel(cache, source, workers, pdf_format)
+    if pdf_format is None:
+        pdf_format = detect_pdf_format(cache)
+    logger.debug("Format PDF: %s (pewność %.1f, metoda: %s)", pdf_format.name, pdf_format.confidence, pdf_format.method)
+
+    if pdf_format.name == "new":
+        program = new_pdf_file_parser.parse_pdf_new(cache)
     else:
-        program = old_pdf_file_parser.parse_pdf_old(doc, full_text)
+        program = old_pdf_file_parser.parse_pdf_old(cache, cache.full_text())
 
     doc.close()
     return program
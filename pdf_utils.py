@@ -1,51 +1,304 @@
 # pdf_utils.py
 import fitz
 import re
-import os
-import tempfile
+import hashlib
+from dataclasses import dataclass
+
+# Frazy oznaczające początek sekcji z informacjami o detalach
+DETAIL_MARKERS = ("INFORMACJA O DETALU", "Informacja o pojedynczych detalach/zleceniu")
+
+
+@dataclass
+class PdfImage:
+    """Obraz wyodrębniony z PDF, trzymany w pamięci (bez plików tymczasowych)."""
+    page_number: int
+    xref: int
+    data: bytes
+    ext: str
+    digest: str
+
+    @property
+    def name(self) -> str:
+        return f"pdf_img_page{self.page_number}_xref{self.xref}"
+
+class LabelIndex:
+    """
+    Indeks etykieta -> wartość budowany jednym liniowym przejściem po tekście.
+    Linia "ETYKIETA: wartość" daje wartość z tej samej linii; gdy po dwukropku
+    nic nie ma, wartością jest następna niepusta linia. Wartość wieloliniowa
+    obejmuje kolejne linie aż do linii zaczynającej się od kolejnej etykiety
+    (co najmniej dwie litery bezpośrednio przed dwukropkiem).
+    Wyszukiwanie to słownik; etykiety spoza indeksu są szukane liniowo w tekście.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self._fields = {}
+        self._multiline = {}
+        lines = text.split("\n")
+        pending = []     # etykiety czekające na wartość z następnej niepustej linii
+        open_multi = []  # (etykieta, lista części) zbierane do następnej etykiety
+        for line in lines:
+            head, colon, rest = line.partition(":")
+            if _starts_label(head, colon):
+                for key, parts in open_multi:
+                    self._multiline.setdefault(key, " ".join(" ".join(parts).split()))
+                open_multi = []
+            else:
+                for key, parts in open_multi:
+                    parts.append(line)
+            stripped = line.strip()
+            if pending and stripped:
+                for key in pending:
+                    self._fields.setdefault(key, stripped)
+                pending = []
+            if not colon:
+                continue
+            key = head.strip().upper()
+            if not key or not key[0].isalpha():
+                continue
+            value = rest.strip()
+            if value:
+                self._fields.setdefault(key, value)
+            elif key not in self._fields:
+                pending.append(key)
+            if key not in self._multiline:
+                open_multi.append((key, [rest]))
+        for key, parts in open_multi:
+            self._multiline.setdefault(key, " ".join(" ".join(parts).split()))
+
+    def get(self, label: str) -> str:
+        value = self._fields.get(label.upper())
+        if value is not None:
+            return value
+        return _scan_field(self.text, label)
+
+    def get_multiline(self, label: str) -> str:
+        value = self._multiline.get(label.upper())
+        if value is not None:
+            return value
+        return _scan_multiline(self.text, label)
+
+
+def _starts_label(head: str, colon: str) -> bool:
+    """Linia zaczyna nową etykietę, jeśli przed pierwszym dwukropkiem są same litery (min. dwie)."""
+    return bool(colon) and len(head) >= 2 and head.isalpha()
+
+
+def _scan_multiline(text: str, label: str) -> str:
+    """Zapasowe, liniowe wyszukiwanie wartości wieloliniowej etykiety występującej w środku linii."""
+    match = re.search(re.escape(label) + ":", text, re.IGNORECASE)
+    if not match:
+        return ""
+    lines = text[match.end():].split("\n")
+    parts = [lines[0]]
+    for line in lines[1:]:
+        head, colon, _ = line.partition(":")
+        if _starts_label(head, colon):
+            break
+        parts.append(line)
+    return " ".join(" ".join(parts).split())
+
+
+def _scan_field(text: str, label: str) -> str:
+    """
+    Zapasowe wyszukiwanie etykiety występującej w środku linii (np. bez dwukropka).
+    Odpowiada wzorcowi "etykieta:?\\s*(.+)", ale działa w czasie liniowym:
+    literalne wyszukanie etykiety, a następnie ręczne pominięcie dwukropka i białych znaków.
+    """
+    match = re.search(re.escape(label), text, re.IGNORECASE)
+    if not match:
+        return ""
+    pos = match.end()
+    if text.startswith(":", pos):
+        pos += 1
+    length = len(text)
+    while pos < length and text[pos].isspace():
+        pos += 1
+    end = text.find("\n", pos)
+    return text[pos:end if end != -1 else length].strip()
+
 
 def find_field(text: str, label: str) -> str:
-    pattern = re.compile(rf"{label}:?\s*(.+)", re.IGNORECASE)
-    match = pattern.search(text)
-    return match.group(1).strip() if match else ""
+    return _scan_field(text, label)
 
 def find_in_section(section: str, label: str) -> str:
-    pattern = re.compile(rf"{label}:?\s*(.+)", re.IGNORECASE)
-    match = pattern.search(section)
-    return match.group(1).strip() if match else ""
-
-def extract_all_detail_images(doc) -> list:
-    first_marker_page = None
-    for page in doc:
-        page_text = page.get_text("text")
-        if ("INFORMACJA O DETALU" in page_text) or ("Informacja o pojedynczych detalach/zleceniu" in page_text):
-            first_marker_page = page.number
-            break
+    return _scan_field(section, label)
+
+class PdfPageCache:
+    """
+    Leniwa pamięć podręczna zawartości stron jednego dokumentu PDF.
+    Tekst ("text"), słownik spanów ("dict") i lista obrazów każdej strony
+    są pobierane z PyMuPDF co najwyżej raz – wszystkie etapy parsowania
+    (wykrycie formatu, parser starego/nowego typu, ekstrakcja obrazów)
+    czytają z tego samego obiektu.
+    """
+
+    def __init__(self, doc):
+        self.doc = doc
+        self._pages = {}
+        self._texts = {}
+        self._dicts = {}
+        self._images = {}
+        self._image_data = {}
+
+    def preload(self, page_number: int, text=None, page_dict=None, images=None):
+        """Uzupełnia cache danymi strony pobranymi wcześniej (np. w procesie roboczym)."""
+        if text is not None:
+            self._texts[page_number] = text
+        if page_dict is not None:
+            self._dicts[page_number] = page_dict
+        if images is not None:
+            self._images[page_number] = images
+
+    def preload_image(self, xref: int, base_image: dict):
+        self._image_data[xref] = base_image
+
+    def __len__(self) -> int:
+        return self.doc.page_count
+
+    def _page(self, page_number: int):
+        page = self._pages.get(page_number)
+        if page is None:
+            page = self.doc.load_page(page_number)
+            self._pages[page_number] = page
+        return page
+
+    def page_text(self, page_number: int) -> str:
+        text = self._texts.get(page_number)
+        if text is None:
+            text = self._page(page_number).get_text("text")
+            self._texts[page_number] = text
+        return text
+
+    def page_dict(self, page_number: int, keep: bool = True) -> dict:
+        """Słownik spanów strony; keep=False nie zatrzymuje go w cache (przetwarzanie strumieniowe)."""
+        page_dict = self._dicts.get(page_number)
+        if page_dict is None:
+            page_dict = self._page(page_number).get_text("dict")
+            if keep:
+                self._dicts[page_number] = page_dict
+        return page_dict
+
+    def page_images(self, page_number: int) -> list:
+        images = self._images.get(page_number)
+        if images is None:
+            images = self._page(page_number).get_images(full=True)
+            self._images[page_number] = images
+        return images
+
+    def extract_image(self, xref: int) -> dict:
+        base_image = self._image_data.get(xref)
+        if base_image is None:
+            base_image = self.doc.extract_image(xref)
+            self._image_data[xref] = base_image
+        return base_image
+
+    def full_text(self) -> str:
+        return "".join(self.page_text(n) for n in range(len(self)))
+
+    def find_page(self, *markers) -> int:
+        """Zwraca numer pierwszej strony zawierającej którykolwiek z markerów (lub None)."""
+        for n in range(len(self)):
+            page_text = self.page_text(n)
+            if any(marker in page_text for marker in markers):
+                return n
+        return None
+
+
+# Fraza występująca wyłącznie w raportach nowego typu
+NEW_FORMAT_MARKER = "Plan konfiguracji:"
+# Etykiety nagłówka raportów starego typu
+OLD_FORMAT_LABELS = ("NAZWA PROGRAMU", "CZAS MASZYNOWY", "MATERIAŁ (ARKUSZ)")
+# Liczba początkowych stron sprawdzanych przed pełnym skanowaniem dokumentu
+FORMAT_PREFIX_PAGES = 3
+
+
+@dataclass
+class PdfFormat:
+    """Wynik wykrywania formatu raportu PDF."""
+    name: str          # "old" albo "new"
+    confidence: float  # 0.0 - 1.0
+    method: str        # "first_page", "prefix" albo "full_scan"
+
+
+def _sniff_page(text: str):
+    if NEW_FORMAT_MARKER in text:
+        return "new"
+    if sum(label in text for label in OLD_FORMAT_LABELS) >= 2:
+        return "old"
+    return None
+
+
+def detect_pdf_format(cache: PdfPageCache, full_scan: bool = True) -> PdfFormat:
+    """
+    Rozpoznaje format raportu na podstawie pierwszej strony, a w razie
+    niejednoznaczności – kilku początkowych stron. Pełne skanowanie tekstu
+    dokumentu jest wykonywane tylko wtedy, gdy tanie sprawdzenia nic nie dały
+    (przy full_scan=False zwracane jest wtedy None).
+    """
+    if len(cache) == 0:
+        return PdfFormat("old", 0.0, "first_page")
+    guess = _sniff_page(cache.page_text(0))
+    if guess:
+        return PdfFormat(guess, 1.0 if guess == "new" else 0.9, "first_page")
+    for page_number in range(1, min(FORMAT_PREFIX_PAGES, len(cache))):
+        guess = _sniff_page(cache.page_text(page_number))
+        if guess:
+            return PdfFormat(guess, 0.8 if guess == "new" else 0.7, "prefix")
+    if not full_scan:
+        return None
+    guess = "new" if cache.find_page(NEW_FORMAT_MARKER) is not None else "old"
+    return PdfFormat(guess, 1.0, "full_scan")
+
+
+def extract_all_detail_images(cache: PdfPageCache, first_marker_page: int = None) -> list:
+    """
+    Zwraca listę obiektów PdfImage z rysunkami detali (w kolejności stron).
+    Strony przed sekcją detali są pomijane bez wyodrębniania obrazów.
+    Jeśli parser zna już stronę początku sekcji detali, można ją podać,
+    aby uniknąć przeszukiwania tekstu stron.
+    """
+    if first_marker_page is None:
+        first_marker_page = cache.find_page(*DETAIL_MARKERS)
     images_with_page = []
     if first_marker_page is not None:
-        for page in doc:
-            if page.number >= first_marker_page:
-                page_images = extract_page_images(doc, page.number)
-                images_with_page.extend(page_images)
-    if images_with_page and images_with_page[0][0] == first_marker_page:
+        images_by_xref = {}
+        images_by_digest = {}
+        for page_number in range(first_marker_page, len(cache)):
+            page_images = extract_page_images(cache, page_number, images_by_xref, images_by_digest)
+            images_with_page.extend(page_images)
+    if images_with_page and images_with_page[0].page_number == first_marker_page:
         images_with_page.pop(0)
-    return [img_path for (pg, img_path) in images_with_page]
+    return images_with_page
 
-def extract_page_images(doc, page_number: int) -> list:
-    page = doc.load_page(page_number)
-    image_info = page.get_images(full=True)
-    image_tuples = []
-    for img in image_info:
+def extract_page_images(cache: PdfPageCache, page_number: int, images_by_xref=None, images_by_digest=None) -> list:
+    """
+    Wyodrębnia obrazy strony do pamięci. Obraz o tym samym xref (lub tej samej
+    treści) jest dekodowany tylko raz – kolejne wystąpienia współdzielą dane.
+    """
+    if images_by_xref is None:
+        images_by_xref = {}
+    if images_by_digest is None:
+        images_by_digest = {}
+    images = []
+    for img in cache.page_images(page_number):
         xref = img[0]
-        base_image = doc.extract_image(xref)
-        image_bytes = base_image["image"]
-        temp_dir = tempfile.gettempdir()
-        image_filename = f"pdf_img_page{page_number}_xref{xref}.bmp"
-        image_path = os.path.join(temp_dir, image_filename)
-        with open(image_path, "wb") as f:
-            f.write(image_bytes)
-        image_tuples.append((page_number, image_path))
-    return image_tuples
+        image = images_by_xref.get(xref)
+        if image is None:
+            base_image = cache.extract_image(xref)
+            data = base_image["image"]
+            digest = hashlib.sha1(data).hexdigest()
+            image = images_by_digest.get(digest)
+            if image is None:
+                image = PdfImage(page_number, xref, data, base_image.get("ext", "bmp"), digest)
+                images_by_digest[digest] = image
+            images_by_xref[xref] = image
+        if image.page_number != page_number:
+            # Ta sama treść na innej stronie – nowy wpis, ale bez kopiowania danych
+            image = PdfImage(page_number, image.xref, image.data, image.ext, image.digest)
+        images.append(image)
+    return images
 
 def extract_detail_name(full_path: str) -> str:
     lower_path = full_path.lower()
@@ -61,8 +314,4 @@ def extract_detail_name(full_path: str) -> str:
     return detail_name.strip()
 
 def find_multiline_field(section: str, label: str) -> str:
-    pattern = re.compile(rf"{label}:([\s\S]+?)(?=\n[A-ZĄĆĘŁŃÓŚŹŻ]{{2,}}:|\Z)", re.IGNORECASE)
-    match = pattern.search(section)
-    if match:
-        return " ".join(match.group(1).strip().split())
-    return ""
+    return LabelIndex(section).get_multiline(label)
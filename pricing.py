@@ -0,0 +1,119 @@
+"""
+Wycena wsadowa detali.
+Zamiast wywoływać Detail.cutting_cost/material_cost dla każdego detalu osobno
+(każde wywołanie ponownie klasyfikuje materiał i przeszukuje konfigurację),
+detale programu lub całej wyceny są zamieniane na kolumny liczbowe
+(czas cięcia, waga, ilość, kod klasy materiału), a koszty liczone są w jednym przebiegu.
+Każdy różny napis materiału jest klasyfikowany tylko raz.
+"""
+
+import functools
+from array import array
+from dataclasses import dataclass
+
+# Klasy materiałów – indeks w krotce to kod klasy
+MATERIAL_CLASSES = ("stal_nierdzewna", "stal_czarna", "aluminium")
+STAINLESS, BLACK_STEEL, ALUMINIUM = range(len(MATERIAL_CLASSES))
+
+# Stawki domyślne, gdy brak ich w konfiguracji
+DEFAULT_CUTTING_RATES = {"stal_nierdzewna": 6.0, "stal_czarna": 5.0, "aluminium": 4.5}
+DEFAULT_MATERIAL_RATES = {"stal_nierdzewna": 3.0, "stal_czarna": 2.5, "aluminium": 1.5}
+
+
+@functools.lru_cache(maxsize=1024)
+def classify_material(material: str) -> int:
+    """Zwraca kod klasy materiału; nierozpoznane materiały liczone są jak stal czarna."""
+    material_lower = material.lower()
+    if "1.4301" in material_lower:
+        return STAINLESS
+    if "1.0038" in material_lower or "st37" in material_lower:
+        return BLACK_STEEL
+    if "aluminium" in material_lower:
+        return ALUMINIUM
+    return BLACK_STEEL
+
+
+def rate_tables(config: dict) -> tuple:
+    """Zwraca (stawki cięcia, ceny materiału) jako listy indeksowane kodem klasy materiału."""
+    cutting = config.get("cutting_costs", {})
+    material = config.get("material_costs", {})
+    return (
+        [cutting.get(name, DEFAULT_CUTTING_RATES[name]) for name in MATERIAL_CLASSES],
+        [material.get(name, DEFAULT_MATERIAL_RATES[name]) for name in MATERIAL_CLASSES],
+    )
+
+
+@dataclass
+class Pricing:
+    """Koszty detali w kolumnach – i-ty element każdej tablicy dotyczy i-tego detalu."""
+    cutting_cost: array
+    material_cost: array
+    total_cost: array
+    total_cost_quantity: array
+
+    def __len__(self) -> int:
+        return len(self.total_cost)
+
+    def details_cost(self) -> float:
+        """Suma kosztów detali z ilościami – w tej samej kolejności co dawniej Program.total_cost."""
+        return sum(self.total_cost_quantity)
+
+
+def price_columns(cut_time, weight, quantity, material_code, config: dict) -> Pricing:
+    """
+    Liczy koszty dla kolumn o równej długości: czas cięcia [h], waga [kg],
+    ilość i kod klasy materiału. Zaokrąglenia są takie same jak w metodach Detail.
+    """
+    cutting_rates, material_rates = rate_tables(config)
+    cutting_cost = array("d", [round(t * cutting_rates[c], 2) for t, c in zip(cut_time, material_code)])
+    material_cost = array("d", [round(w * material_rates[c], 2) for w, c in zip(weight, material_code)])
+    total_cost = array("d", [round(c + m, 2) for c, m in zip(cutting_cost, material_cost)])
+    total_cost_quantity = array("d", [t * q for t, q in zip(total_cost, quantity)])
+    return Pricing(cutting_cost, material_cost, total_cost, total_cost_quantity)
+
+
+def detail_columns(programs) -> tuple:
+    """Zamienia detale programów na kolumny (czas cięcia, waga, ilość, kod materiału)."""
+    cut_time = array("d")
+    weight = array("d")
+    quantity = array("d")
+    material_code = array("b")
+    for program in programs:
+        code = classify_material(program.material)
+        details = program.details
+        cut_time.extend([d.cut_time for d in details])
+        weight.extend([d.weight for d in details])
+        quantity.extend([d.quantity for d in details])
+        material_code.extend([code] * len(details))
+    return cut_time, weight, quantity, material_code
+
+
+def price_program(program, config: dict) -> Pricing:
+    """Wycena wszystkich detali jednego programu."""
+    return price_columns(*detail_columns([program]), config)
+
+
+def price_quote(programs, config: dict) -> list:
+    """
+    Wycena wielu programów (całej oferty) jednym przebiegiem po wspólnych kolumnach.
+    Zwraca listę (program, Pricing) w kolejności programów.
+    """
+    programs = list(programs)
+    pricing = price_columns(*detail_columns(programs), config)
+    result = []
+    start = 0
+    for program in programs:
+        stop = start + len(program.details)
+        result.append((program, Pricing(
+            pricing.cutting_cost[start:stop],
+            pricing.material_cost[start:stop],
+            pricing.total_cost[start:stop],
+            pricing.total_cost_quantity[start:stop],
+        )))
+        start = stop
+    return result
+
+
+def program_total(pricing: Pricing, config: dict) -> float:
+    """Koszt programu: suma kosztów detali z ilościami plus koszt gięcia z konfiguracji."""
+    return round(pricing.details_cost() + config.get("suma_kosztow_giecia", 0.0), 2)
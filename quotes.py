@@ -0,0 +1,125 @@
+"""
+Sesje wyceny po stronie serwera.
+Sesja trzyma wczytane programy wraz z ich wyceną (kolumny z pricing), dzięki czemu
+zmiana stawki jednego materiału wymaga przeliczenia tylko programów z tego materiału,
+a klient dostaje wyłącznie zmienione wartości (delty), zamiast przeliczać całą tabelę.
+Identyfikator sesji generuje serwer (secrets.token_urlsafe) – klient nie może go wybrać,
+a nieznany identyfikator jest odrzucany, a nie zakładany na nowo.
+"""
+
+import secrets
+import threading
+import time
+import uuid
+from pricing import classify_material, rate_tables, price_program, program_total
+
+# Czas (s) bez aktywności, po którym sesja wyceny jest usuwana
+QUOTE_SESSION_TTL = 4 * 3600
+# Liczba losowych bajtów identyfikatora sesji wyceny
+QUOTE_ID_BYTES = 32
+
+
+class QuoteSession:
+    def __init__(self, quote_id: str):
+        self.id = quote_id
+        self.programs = {}  # program_id -> Program
+        self.pricing = {}   # program_id -> Pricing
+        self.rates = None   # stawki (rate_tables), według których wyceniono programy sesji
+        self.touched = time.time()
+        self._lock = threading.Lock()
+
+    def add(self, program, config: dict, pricing=None) -> str:
+        """Dodaje program do sesji i zwraca jego identyfikator."""
+        program_id = uuid.uuid4().hex
+        pricing = pricing or price_program(program, config)
+        with self._lock:
+            self.programs[program_id] = program
+            self.pricing[program_id] = pricing
+            if self.rates is None:
+                self.rates = rate_tables(config)
+            self.touched = time.time()
+        return program_id
+
+    def remove(self, program_id: str) -> bool:
+        with self._lock:
+            self.touched = time.time()
+            self.pricing.pop(program_id, None)
+            return self.programs.pop(program_id, None) is not None
+
+    def reprice(self, config: dict) -> tuple:
+        """
+        Przelicza tylko programy z materiałów, których stawki zmieniły się od ostatniej wyceny
+        sesji, i porównuje wynik z poprzednią wyceną.
+        Zwraca (kody zmienionych klas materiału, delty), gdzie delty to:
+        program_id -> indeksy zmienionych wierszy, ich nowe koszty i koszt programu.
+        """
+        deltas = {}
+        with self._lock:
+            self.touched = time.time()
+            new_rates = rate_tables(config)
+            material_classes = changed_material_classes(self.rates or new_rates, new_rates)
+            self.rates = new_rates
+            for program_id, program in self.programs.items():
+                if classify_material(program.material) not in material_classes:
+                    continue
+                old = self.pricing[program_id]
+                new = price_program(program, config)
+                self.pricing[program_id] = new
+                rows = [
+                    i for i in range(len(new))
+                    if new.cutting_cost[i] != old.cutting_cost[i] or new.material_cost[i] != old.material_cost[i]
+                ]
+                if not rows:
+                    continue
+                deltas[program_id] = {
+                    "rows": rows,
+                    "cutting_cost": [new.cutting_cost[i] for i in rows],
+                    "material_cost": [new.material_cost[i] for i in rows],
+                    "total_cost": [new.total_cost[i] for i in rows],
+                    "total_cost_quantity": [new.total_cost_quantity[i] for i in rows],
+                    "program_total_cost": program_total(new, config),
+                }
+        return material_classes, deltas
+
+
+def changed_material_classes(old_rates: tuple, new_rates: tuple) -> set:
+    """Kody klas materiału, dla których zmieniła się stawka cięcia lub cena materiału."""
+    old_cutting, old_material = old_rates
+    new_cutting, new_material = new_rates
+    return {
+        code for code in range(len(old_cutting))
+        if old_cutting[code] != new_cutting[code] or old_material[code] != new_material[code]
+    }
+
+
+class QuoteStore:
+    """Sesje wyceny w pamięci procesu; klient wskazuje swoją sesję nagłówkiem X-Quote-Id."""
+
+    def __init__(self, ttl: float = QUOTE_SESSION_TTL):
+        self.ttl = ttl
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def create(self) -> QuoteSession:
+        """Zakłada sesję z losowym identyfikatorem wygenerowanym po stronie serwera."""
+        with self._lock:
+            self._prune()
+            quote_id = secrets.token_urlsafe(QUOTE_ID_BYTES)
+            while quote_id in self._sessions:
+                quote_id = secrets.token_urlsafe(QUOTE_ID_BYTES)
+            session = self._sessions[quote_id] = QuoteSession(quote_id)
+            return session
+
+    def get(self, quote_id: str) -> QuoteSession:
+        """Istniejąca sesja albo None – nieznany identyfikator nie zakłada sesji."""
+        if not quote_id:
+            return None
+        with self._lock:
+            self._prune()
+            return self._sessions.get(quote_id)
+
+    def _prune(self):
+        limit = time.time() - self.ttl
+        expired = [quote_id for quote_id, session in self._sessions.items() if session.touched < limit]
+        for quote_id in expired:
+            del self._sessions[quote_id]
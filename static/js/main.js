@@ -27,6 +27,7 @@ $(document).ready(function() {
   $(document).on("change", "#selectAllCheckbox", function() {
     var checked = $(this).prop("checked");
     $(".detailCheckbox").prop("checked", checked);
+    rowStates.forEach(function(state) { state.checked = checked; });
     recalcSummary();
   });
 
@@ -34,6 +35,36 @@ $(document).ready(function() {
     return 'program_' + Date.now() + '_' + Math.floor(Math.random() * 1000);
   }
 
+  // Sesja wyceny po stronie serwera – serwer trzyma wczytane programy i po zmianie
+  // stawek zwraca tylko zmienione koszty wierszy. Identyfikator sesji nadaje serwer (POST /quote)
+  // przy pierwszym wysyłaniu plików; kolejne wysyłki czekają na tę samą odpowiedź
+  // (gdy założenie sesji się nie powiedzie, pliki są wysyłane bez sesji).
+  var QUOTE_ID = null;
+  var quoteRequest = null;
+
+  function quoteReady() {
+    if (!quoteRequest) {
+      quoteRequest = $.ajax({url: '/quote', type: 'POST', dataType: 'json'}).then(function(response) {
+        QUOTE_ID = response.quote_id;
+      });
+    }
+    return quoteRequest;
+  }
+
+  // Nagłówki żądań z identyfikatorem sesji wyceny (jeśli sesja istnieje)
+  function quoteHeaders(headers) {
+    headers = $.extend({}, headers);
+    if (QUOTE_ID) headers["X-Quote-Id"] = QUOTE_ID;
+    return headers;
+  }
+
+  // Stan liczbowy wierszy detali – przeliczenia nie odczytują i nie parsują komórek tabeli
+  var rowStates = [];          // w kolejności wierszy tabeli
+  var programRows = {};        // programId -> stany wierszy (indeks = indeks detalu w programie)
+  var serverProgramIds = {};   // programId -> program_id w sesji serwera
+  var clientProgramIds = {};   // program_id w sesji serwera -> programId
+  var currentBendingRate = null;
+
   function formatSecondsToHMS(seconds) {
     var h = Math.floor(seconds / 3600);
     var m = Math.floor((seconds % 3600) / 60);
@@ -87,9 +118,14 @@ $(document).ready(function() {
       type: 'POST',
       data: JSON.stringify(newConfig),
       contentType: 'application/json',
+      headers: quoteHeaders(),
       success: function(response) {
         console.log("Konfiguracja zaktualizowana:", response);
-        recalcAllRows();
+        if (response.deltas) {
+          applyDeltas(response.deltas);
+        } else {
+          recalcAllRows();
+        }
         recalcSummary();
       },
       error: function(xhr, status, error) {
@@ -103,63 +139,86 @@ $(document).ready(function() {
     updateConfig();
   });
 
-  // Funkcje do pobierania stawek z formularza na podstawie tekstu z kolumny "Materiał"
-  function getCuttingRate(material) {
-    material = material.toLowerCase();
-    if (material.indexOf("1.4301") !== -1) {
-      return parseFloat($("#cuttingCostStainless").val()) || 0;
-    } else if (material.indexOf("1.0038") !== -1 || material.indexOf("st37") !== -1) {
-      return parseFloat($("#cuttingCostBlack").val()) || 0;
-    } else if (material.indexOf("aluminium") !== -1) {
-      return parseFloat($("#cuttingCostAluminium").val()) || 0;
-    }
-    return parseFloat($("#cuttingCostBlack").val()) || 0;
+  // Klasy materiałów jak w pricing.MATERIAL_CLASSES (indeks = kod klasy)
+  var MATERIAL_RATE_INPUTS = [
+    {cutting: "#cuttingCostStainless", material: "#materialCostStainless"},
+    {cutting: "#cuttingCostBlack", material: "#materialCostBlack"},
+    {cutting: "#cuttingCostAluminium", material: "#materialCostAluminium"}
+  ];
+
+  // Stawki z formularza, odczytane raz na całe przeliczenie
+  function readRates() {
+    return {
+      cutting: MATERIAL_RATE_INPUTS.map(function(inputs) { return parseFloat($(inputs.cutting).val()) || 0; }),
+      material: MATERIAL_RATE_INPUTS.map(function(inputs) { return parseFloat($(inputs.material).val()) || 0; }),
+      bending: parseFloat($("#bendingCostSum").val()) || 0
+    };
   }
 
-  function getMaterialRate(material) {
+  function materialKey(material) {
     material = material.toLowerCase();
-    if (material.indexOf("1.4301") !== -1) {
-      return parseFloat($("#materialCostStainless").val()) || 0;
-    } else if (material.indexOf("1.0038") !== -1 || material.indexOf("st37") !== -1) {
-      return parseFloat($("#materialCostBlack").val()) || 0;
+    if (material.indexOf("1.0038") !== -1 || material.indexOf("st37") !== -1) {
+      return "Stal czarna";
+    } else if (material.indexOf("1.4301") !== -1) {
+      return "Stal nierdzewna";
     } else if (material.indexOf("aluminium") !== -1) {
-      return parseFloat($("#materialCostAluminium").val()) || 0;
+      return "Aluminium";
     }
-    return parseFloat($("#materialCostBlack").val()) || 0;
+    return "Inne";
   }
 
-  // Funkcja przeliczająca koszty dla jednego wiersza detalu
-  function recalcRow($row) {
-    var cutTime = parseFloat($row.data("cut-time")) || 0; // czas cięcia w godzinach
-    var weight = parseFloat($row.data("weight")) || 0;
-    var material = $row.find("td").eq(3).text();
-    var newCuttingRate = getCuttingRate(material);
-    var newMaterialRate = getMaterialRate(material);
-    var newCuttingCost = cutTime * newCuttingRate;
-    var newMaterialCost = weight * newMaterialRate;
-    var baseCost = newCuttingCost + newMaterialCost;
-    var bendingCount = parseFloat($row.find("input.bending-input").val()) || 0;
-    if (bendingCount < 0) {
-      bendingCount = 0;
-      $row.find("input.bending-input").val(0);
-    }
-    var bendingCost = parseFloat($("#bendingCostSum").val()) || 0;
-    var newDetailCost = baseCost + (bendingCount * bendingCost);
-    // Ustawiamy wartości w kolumnach: Koszt cięcia (11), Koszt materiału (12), Koszt detalu (13)
-    $row.find("td").eq(11).text(newCuttingCost.toFixed(2));
-    $row.find("td").eq(12).text(newMaterialCost.toFixed(2));
-    $row.find("td").eq(13).text(newDetailCost.toFixed(2));
-
-    // Ostatnia kolumna: Całkowity koszt
-    var quantity = parseFloat($row.find("td").eq(10).text()) || 1;
-    var totalCost = newDetailCost * quantity;
-    $row.find("td").eq(14).text(totalCost.toFixed(2));
+  function round2(value) {
+    return Math.round(value * 100) / 100;
+  }
+
+  // Wylicza koszt detalu i całkowity ze stanu wiersza i wpisuje je do zapamiętanych komórek
+  function updateRowCosts(state, bendingRate) {
+    state.detailCost = state.cuttingCost + state.materialCost + state.bending * bendingRate;
+    state.totalCost = state.detailCost * state.quantity;
+    state.cells.cutting.textContent = state.cuttingCost.toFixed(2);
+    state.cells.material.textContent = state.materialCost.toFixed(2);
+    state.cells.detail.textContent = state.detailCost.toFixed(2);
+    state.cells.total.textContent = state.totalCost.toFixed(2);
+  }
+
+  // Przeliczenie wiersza na podstawie stawek z formularza (bez sesji serwera)
+  function recalcRow(state, rates) {
+    state.cuttingCost = round2(state.cutTime * rates.cutting[state.materialClass]);
+    state.materialCost = round2(state.weight * rates.material[state.materialClass]);
+    updateRowCosts(state, rates.bending);
   }
 
   // Przeliczenie wszystkich wierszy
   function recalcAllRows() {
-    $("#detailsTableBody tr").each(function(){
-      recalcRow($(this));
+    var rates = readRates();
+    currentBendingRate = rates.bending;
+    rowStates.forEach(function(state) {
+      recalcRow(state, rates);
+    });
+  }
+
+  // Nanosi zmienione przez serwer koszty; przy zmianie kosztu gięcia przelicza wiersze z gięciami
+  function applyDeltas(deltas) {
+    var bendingRate = readRates().bending;
+    var bendingChanged = bendingRate !== currentBendingRate;
+    currentBendingRate = bendingRate;
+    Object.keys(deltas).forEach(function(serverProgramId) {
+      var rows = programRows[clientProgramIds[serverProgramId]];
+      if (!rows) return;
+      var delta = deltas[serverProgramId];
+      delta.rows.forEach(function(rowIndex, k) {
+        var state = rows[rowIndex];
+        state.cuttingCost = delta.cutting_cost[k];
+        state.materialCost = delta.material_cost[k];
+        state.updatedByDelta = true;
+        updateRowCosts(state, bendingRate);
+      });
+    });
+    rowStates.forEach(function(state) {
+      if (bendingChanged && state.bending && !state.updatedByDelta) {
+        updateRowCosts(state, bendingRate);
+      }
+      state.updatedByDelta = false;
     });
   }
 
@@ -172,32 +231,16 @@ $(document).ready(function() {
     var totalPrice = 0;
     var materialBreakdown = {};
 
-    $("#detailsTableBody tr").each(function(){
-      var $row = $(this);
-      // Sprawdzamy, czy checkbox w pierwszej kolumnie jest zaznaczony
-      if ($row.find("input.detailCheckbox").prop("checked")) {
-        var qty = parseFloat($row.find("td").eq(10).text()) || 1;
-        detailCount += qty;
-        var cuttingCost = parseFloat($row.find("td").eq(11).text()) || 0;
-        totalCuttingCost += cuttingCost;
-        var materialCost = parseFloat($row.find("td").eq(12).text()) || 0;
-        totalMaterialCost += materialCost;
-        var rowTotal = parseFloat($row.find("td").eq(14).text()) || 0;
-        totalPrice += rowTotal;
-        var materialText = $row.find("td").eq(3).text().toLowerCase();
-        var key = "Inne";
-        if (materialText.indexOf("1.0038") !== -1 || materialText.indexOf("st37") !== -1) {
-          key = "Stal czarna";
-        } else if (materialText.indexOf("1.4301") !== -1) {
-          key = "Stal nierdzewna";
-        } else if (materialText.indexOf("aluminium") !== -1) {
-          key = "Aluminium";
-        }
-        if (!materialBreakdown[key]) {
-          materialBreakdown[key] = 0;
-        }
-        materialBreakdown[key] += materialCost;
+    rowStates.forEach(function(state) {
+      if (!state.checked) return;
+      detailCount += state.quantity;
+      totalCuttingCost += state.cuttingCost;
+      totalMaterialCost += state.materialCost;
+      totalPrice += state.totalCost;
+      if (!materialBreakdown[state.materialKey]) {
+        materialBreakdown[state.materialKey] = 0;
       }
+      materialBreakdown[state.materialKey] += state.materialCost;
     });
 
     var summaryHtml = "<p>Ilość detali: " + detailCount + "</p>";
@@ -214,97 +257,311 @@ $(document).ready(function() {
 
   // Nasłuchiwanie zmian w polach "Ilość gięć" w tabeli detali
   $(document).on("change", ".bending-input", function() {
-    var $row = $(this).closest("tr");
-    recalcRow($row);
+    var state = $(this).closest("tr").data("rowState");
+    if (!state) return;
+    var bendingCount = parseFloat($(this).val()) || 0;
+    if (bendingCount < 0) {
+      bendingCount = 0;
+      $(this).val(0);
+    }
+    state.bending = bendingCount;
+    updateRowCosts(state, readRates().bending);
     recalcSummary();
   });
 
   // Nasłuchiwanie zmian checkboxów detali
   $(document).on("change", ".detailCheckbox", function() {
+    var state = $(this).closest("tr").data("rowState");
+    if (state) state.checked = $(this).prop("checked");
     recalcSummary();
   });
 
-  // Obsługa uploadu pliku
-  $("#fileInput").change(function(){
-    var fileName = $(this).val().split("\\").pop();
-    var programId = generateProgramId();
-    $("#loading").show();
-    var file = $(this)[0].files[0];
-    if (!file) return;
-    var formData = new FormData();
-    formData.append("file", file);
+  // Odstęp (ms) między zapytaniami o stan zadania parsowania
+  var JOB_POLL_INTERVAL = 500;
+
+  // Format odpowiedzi z detalami w kolumnach (tablica wartości dla każdego pola)
+  var UPLOAD_HEADERS = {"X-Response-Format": "columnar"};
+
+  // Zwraca detale programu jako listę obiektów niezależnie od formatu odpowiedzi
+  function programDetails(response) {
+    if (response.format !== "columnar") {
+      return response.details;
+    }
+    var columns = response.details;
+    var names = Object.keys(columns);
+    var details = [];
+    for (var i = 0; i < response.detail_count; i++) {
+      var detail = $.extend({}, response.detail_defaults);
+      for (var j = 0; j < names.length; j++) {
+        detail[names[j]] = columns[names[j]][i];
+      }
+      details.push(detail);
+    }
+    return details;
+  }
+
+  // Dodaje program i jego detale do tabel na podstawie danych zwróconych przez serwer
+  function addProgram(response, programId) {
+    // Dodajemy wiersz programu do tabeli programów
+    var programsTbody = $("#programsTableBody");
+    var progRow = "<tr data-program-id='" + programId + "'>";
+    progRow += "<td><button class='btn btn-danger btn-sm remove-program' data-program-id='" + programId + "'>-</button></td>";
+    progRow += "<td>" + (response.name || "") + "</td>";
+    progRow += "<td>" + (response.material || "") + "</td>";
+    progRow += "<td>" + (response.thicknes || "") + "</td>";
+    progRow += "<td>" + (response.machine_time || "") + "</td>";
+    progRow += "<td>" + (response.program_counts || "") + "</td>";
+    progRow += "</tr>";
+    programsTbody.append(progRow);
+
+    // Dodajemy wiersze detali do tabeli – jednym wstawieniem HTML, koszty podaje serwer
+    var details = programDetails(response);
+    var detailRows = [];
+    details.forEach(function(detail) {
+      var detailRow = "<tr data-program-id='" + programId + "'>";
+      detailRow += "<td><input type='checkbox' class='detailCheckbox' checked></td>";
+      if(detail.image_path) {
+        detailRow += "<td><img src='" + detail.image_path + "' alt='Rysunek' style='max-width:100px;'></td>";
+      } else {
+        detailRow += "<td></td>";
+      }
+      detailRow += "<td>" + detail.name + "</td>";
+      detailRow += "<td>" + (response.material || "") + "</td>";
+      detailRow += "<td>" + (response.thicknes || "") + "</td>";
+      detailRow += "<td>" + (detail.dim_x || "") + "</td>";
+      detailRow += "<td>" + (detail.dim_y || "") + "</td>";
+      detailRow += "<td>" + parseFloat(detail.weight).toFixed(2) + "</td>"; // waga
+      // Ilość gięć
+      detailRow += "<td><input type='number' class='bending-input' value='0' min='0' style='width:100%; background:inherit; border:none; text-align:center;'/></td>";
+      // Czas cięcia
+      detailRow += "<td>" + formatSecondsToHMS(detail.cut_time * 3600) + "</td>";
+      // Ilość
+      detailRow += "<td>" + detail.quantity + "</td>";
+      // Koszt cięcia, koszt materiału, koszt detalu, całkowity koszt (wypełnia updateRowCosts)
+      detailRow += "<td></td><td></td><td></td><td></td>";
+      detailRow += "</tr>";
+      detailRows.push(detailRow);
+    });
+    var $newRows = $(detailRows.join("")).appendTo("#detailsTableBody");
+
+    var rates = readRates();
+    currentBendingRate = rates.bending;
+    var key = materialKey(response.material || "");
+    var states = [];
+    $newRows.each(function(index) {
+      var detail = details[index];
+      var cells = this.cells;
+      var state = {
+        programId: programId,
+        cutTime: parseFloat(detail.cut_time) || 0, // czas cięcia w godzinach
+        weight: parseFloat(detail.weight) || 0,
+        quantity: parseFloat(detail.quantity) || 1,
+        materialClass: response.material_class || 0,
+        materialKey: key,
+        bending: 0,
+        checked: true,
+        cells: {cutting: cells[11], material: cells[12], detail: cells[13], total: cells[14]}
+      };
+      $(this).data("rowState", state);
+      if (detail.cutting_cost !== undefined && detail.material_cost !== undefined) {
+        state.cuttingCost = detail.cutting_cost;
+        state.materialCost = detail.material_cost;
+        updateRowCosts(state, rates.bending);
+      } else {
+        recalcRow(state, rates);
+      }
+      states.push(state);
+      rowStates.push(state);
+    });
+    programRows[programId] = states;
+    if (response.program_id) {
+      serverProgramIds[programId] = response.program_id;
+      clientProgramIds[response.program_id] = programId;
+    }
 
+    // Jeśli plugin colResizable jest dostępny, inicjujemy go
+    if (typeof $.fn.colResizable === "function") {
+      $("#detailsTable").colResizable({ liveDrag: true });
+    } else {
+      console.warn("colResizable plugin is not loaded");
+    }
+
+    // Podsumowanie po dodaniu programu
+    recalcSummary();
+  }
+
+  function showJobStatus(job) {
+    var stages = {
+      queued: "W kolejce",
+      cache: "Sprawdzanie pamięci podręcznej",
+      parsing: "Parsowanie pliku",
+      pricing: "Wycena detali",
+      done: "Gotowe",
+      error: "Błąd"
+    };
+    $("#loadingStatus").text((stages[job.stage] || job.stage) + " (" + job.progress + "%) – " + job.filename);
+  }
+
+  // Odpytuje serwer o stan zadania, aż do jego zakończenia; wynik przekazuje do onResult
+  function pollJob(jobId, onResult) {
     $.ajax({
-      url: '/upload',
-      type: 'POST',
-      data: formData,
-      contentType: false,
-      processData: false,
-      success: function(response) {
+      url: '/jobs/' + jobId,
+      type: 'GET',
+      dataType: 'json',
+      success: function(job) {
+        showJobStatus(job);
+        if (!job.done) {
+          setTimeout(function() { pollJob(jobId, onResult); }, JOB_POLL_INTERVAL);
+          return;
+        }
         $("#loading").hide();
-        // Dodajemy wiersz programu do tabeli programów
-        var programsTbody = $("#programsTableBody");
-        var progRow = "<tr data-program-id='" + programId + "'>";
-        progRow += "<td><button class='btn btn-danger btn-sm remove-program' data-program-id='" + programId + "'>-</button></td>";
-        progRow += "<td>" + (response.name || "") + "</td>";
-        progRow += "<td>" + (response.material || "") + "</td>";
-        progRow += "<td>" + (response.thicknes || "") + "</td>";
-        progRow += "<td>" + (response.machine_time || "") + "</td>";
-        progRow += "<td>" + (response.program_counts || "") + "</td>";
-        progRow += "</tr>";
-        programsTbody.append(progRow);
-
-        // Dodajemy wiersze detali do tabeli
-        var detailsTbody = $("#detailsTableBody");
-        response.details.forEach(function(detail) {
-          // W kolumnach "Koszt detalu" i "Całkowity koszt" wstawiamy puste wartości (zamiast detail.total_cost)
-          var detailRow = "<tr data-program-id='" + programId + "' data-cut-time='" + detail.cut_time + "' data-weight='" + detail.weight + "'>";
-          detailRow += "<td><input type='checkbox' class='detailCheckbox' checked></td>";
-          if(detail.image_path) {
-            detailRow += "<td><img src='" + detail.image_path + "' alt='Rysunek' style='max-width:100px;'></td>";
-          } else {
-            detailRow += "<td></td>";
-          }
-          detailRow += "<td>" + detail.name + "</td>";
-          detailRow += "<td>" + (response.material || "") + "</td>";
-          detailRow += "<td>" + (response.thicknes || "") + "</td>";
-          detailRow += "<td>" + (detail.dim_x || "") + "</td>";
-          detailRow += "<td>" + (detail.dim_y || "") + "</td>";
-          detailRow += "<td>" + parseFloat(detail.weight).toFixed(2) + "</td>"; // waga
-          // Ilość gięć
-          detailRow += "<td><input type='number' class='bending-input' value='0' min='0' style='width:100%; background:inherit; border:none; text-align:center;'/></td>";
-          // Czas cięcia
-          detailRow += "<td>" + formatSecondsToHMS(detail.cut_time * 3600) + "</td>";
-          // Ilość
-          detailRow += "<td>" + detail.quantity + "</td>";
-          // Koszt cięcia (puste, bo recalcRow ustawi)
-          detailRow += "<td></td>";
-          // Koszt materiału (puste)
-          detailRow += "<td></td>";
-          // Koszt detalu (puste)
-          detailRow += "<td></td>";
-          // Całkowity koszt (puste)
-          detailRow += "<td></td>";
-          detailRow += "</tr>";
-          detailsTbody.append(detailRow);
-        });
-
-        // Jeśli plugin colResizable jest dostępny, inicjujemy go
-        if (typeof $.fn.colResizable === "function") {
-          $("#detailsTable").colResizable({ liveDrag: true });
+        if (job.stage === "done") {
+          onResult(job.result);
         } else {
-          console.warn("colResizable plugin is not loaded");
+          alert("Wystąpił błąd: " + job.error);
         }
-
-        // Automatycznie przeliczamy wiersze i podsumowanie po dodaniu
-        recalcAllRows();
-        setTimeout(function() {
-          recalcSummary();
-        }, 300);
       },
-      error: function(xhr) {
-        $("#loading").hide();
-        alert("Wystąpił błąd: " + xhr.responseJSON.error);
+      error: showUploadError
+    });
+  }
+
+  function showUploadError(xhr) {
+    $("#loading").hide();
+    alert("Wystąpił błąd: " + (xhr.responseJSON ? xhr.responseJSON.error : xhr.statusText));
+  }
+
+  // Wysyła jeden plik; wynik zadania to dane jednego programu
+  function uploadFile(file) {
+    var programId = generateProgramId();
+    $("#loading").show();
+    $("#loadingStatus").text("Wysyłanie pliku " + file.name + "...");
+    var formData = new FormData();
+    formData.append("file", file);
+
+    quoteReady().always(function() {
+      $.ajax({
+        url: '/upload',
+        type: 'POST',
+        data: formData,
+        headers: quoteHeaders(UPLOAD_HEADERS),
+        contentType: false,
+        processData: false,
+        success: function(job) {
+          // Serwer zwraca identyfikator zadania – wynik pobieramy, odpytując o jego stan
+          showJobStatus(job);
+          pollJob(job.job_id, function(result) {
+            addProgram(result, programId);
+          });
+        },
+        error: showUploadError
+      });
+    });
+  }
+
+  // Wysyła wiele plików (np. cały katalog) w jednym żądaniu; każdy program dostaje własny wiersz
+  function uploadFiles(files) {
+    $("#loading").show();
+    $("#loadingStatus").text("Wysyłanie plików (" + files.length + ")...");
+    var formData = new FormData();
+    files.forEach(function(item) {
+      formData.append("files", item.file, item.path || item.file.name);
+    });
+
+    quoteReady().always(function() {
+      $.ajax({
+        url: '/upload_batch',
+        type: 'POST',
+        data: formData,
+        headers: quoteHeaders(UPLOAD_HEADERS),
+        contentType: false,
+        processData: false,
+        success: function(job) {
+          showJobStatus(job);
+          pollJob(job.job_id, function(result) {
+            result.programs.forEach(function(item) {
+              addProgram(item.program, generateProgramId());
+            });
+            if (result.errors.length) {
+              alert("Nie udało się wczytać plików:\n" + result.errors.map(function(e) {
+                return e.filename + ": " + e.error;
+              }).join("\n"));
+            }
+          });
+        },
+        error: showUploadError
+      });
+    });
+  }
+
+  // Obsługa uploadu pliku
+  $("#fileInput").change(function(){
+    var files = Array.prototype.slice.call($(this)[0].files);
+    if (files.length === 1) {
+      uploadFile(files[0]);
+    } else if (files.length > 1) {
+      uploadFiles(files.map(function(file) { return {file: file}; }));
+    }
+    // Pozwala ponownie wybrać ten sam plik
+    $(this).val("");
+  });
+
+  // Rekurencyjnie zbiera pliki z upuszczonego elementu (plik lub katalog)
+  function collectEntryFiles(entry, files) {
+    return new Promise(function(resolve) {
+      if (entry.isFile) {
+        entry.file(function(file) {
+          files.push({file: file, path: entry.fullPath.replace(/^\//, "")});
+          resolve();
+        }, function() { resolve(); });
+      } else if (entry.isDirectory) {
+        var reader = entry.createReader();
+        var entries = [];
+        // readEntries zwraca wyniki porcjami – czytamy do pustej porcji
+        var readBatch = function() {
+          reader.readEntries(function(batch) {
+            if (!batch.length) {
+              Promise.all(entries.map(function(child) {
+                return collectEntryFiles(child, files);
+              })).then(function() { resolve(); });
+              return;
+            }
+            entries = entries.concat(Array.prototype.slice.call(batch));
+            readBatch();
+          }, function() { resolve(); });
+        };
+        readBatch();
+      } else {
+        resolve();
+      }
+    });
+  }
+
+  // Upuszczenie plików lub całego katalogu programów na stronę
+  $(document).on("dragover", function(e) {
+    e.preventDefault();
+  });
+
+  $(document).on("drop", function(e) {
+    e.preventDefault();
+    var dataTransfer = e.originalEvent.dataTransfer;
+    if (!dataTransfer || !$("#fileInput").length) return;
+    var files = [];
+    var pending = [];
+    if (dataTransfer.items && dataTransfer.items.length && dataTransfer.items[0].webkitGetAsEntry) {
+      Array.prototype.forEach.call(dataTransfer.items, function(item) {
+        var entry = item.webkitGetAsEntry();
+        if (entry) pending.push(collectEntryFiles(entry, files));
+      });
+    } else {
+      Array.prototype.forEach.call(dataTransfer.files, function(file) {
+        files.push({file: file});
+      });
+    }
+    Promise.all(pending).then(function() {
+      if (files.length === 1 && /\.(html|pdf|lst)$/i.test(files[0].file.name)) {
+        uploadFile(files[0].file);
+      } else if (files.length) {
+        uploadFiles(files);
       }
     });
   });
@@ -314,6 +571,17 @@ $(document).ready(function() {
     var programId = $(this).data("program-id");
     $("#programsTableBody tr[data-program-id='" + programId + "']").remove();
     $("#detailsTableBody tr[data-program-id='" + programId + "']").remove();
+    rowStates = rowStates.filter(function(state) { return state.programId !== programId; });
+    delete programRows[programId];
+    var serverProgramId = serverProgramIds[programId];
+    if (serverProgramId) {
+      delete serverProgramIds[programId];
+      delete clientProgramIds[serverProgramId];
+      $.ajax({
+        url: '/quote/' + encodeURIComponent(QUOTE_ID) + '/programs/' + serverProgramId,
+        type: 'DELETE'
+      });
+    }
     recalcSummary();
   });
 });
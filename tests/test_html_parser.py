@@ -0,0 +1,70 @@
+import random
+import pytest
+from html_parser import _scan_bs4, _scan_events
+
+# Raport w układzie generowanym przez TruTops: nagłówek z kotwicami w komentarzach
+# i tabela detali (wiersz z obrazkiem i numerem części, potem wiersze opisu)
+REPORT = "\n".join([
+    "<html><head><title>Raport</title></head><body>",
+    "<table>",
+    "<!--Programm-Nummer und Bemerkung-->",
+    "<tr><td>Program:</td><td><b>PROG0003</b></td></tr>",
+    "<!--Material (Technologietabelle)-->",
+    "<tr><td>Materiał:</td><td><b>1.0038-5 3000x1500</b></td></tr>",
+    "<!--Maschinenzeit/Tafel-->",
+    "<tr><td>Czas:</td><td><nobr>1:02:03 [h:m:s]</nobr></td></tr>",
+    "<!--Anzahl Programmdurchlauefe-->",
+    "<tr><td>Powtórzenia:</td><td>4</td></tr>",
+    "</table>",
+    "<!--HTML-Block: Einzelteil-Informationen mit Grafiken, ohne Barcode-->",
+    "<table>",
+    *(
+        row
+        for i in range(1, 4)
+        for row in (
+            f'<tr><td><img src="DETAL_{i}.BMP"></td><td>NUMER CZĘŚCI: {i}</td></tr>',
+            f"<tr><td>NAZWA PLIKU GEO:</td><td>C:\\Geometrie\\DETAL_{i}.GEO</td></tr>",
+            f"<tr><td>ILOŚĆ:</td><td>{i}</td></tr>",
+            "<tr><td>WYMIARY:</td><td>100,000 x 50,000 mm</td></tr>",
+            "<tr><td>CZAS OBRÓBKI:</td><td>1.50 min</td></tr>",
+            "<tr><td>CIĘŻAR:</td><td>0.250 kg</td></tr>",
+            "<tr><td>&nbsp;</td><td>&nbsp;</td></tr>",
+        )
+    ),
+    "</table>",
+    "</body></html>",
+])
+
+# Fragmenty psujące raport – wcześniej tokenizowane inaczej niż przez html.parser
+FRAGMENTS = [
+    "<![CDATA[x]]>", "</ td>", "</tr>", "</b>", "<", "<p>", "</", "&", "&amp", "&#65", "&#x1c;", "&#128;",
+    "&foo;", "<!x>", "<?pi?>", "<!-- c -->", "<!--", "-->", "<br>", "</br>", "<br/>", "<td/>", "<b/>",
+    "<script>s</script>", "<style>", "<template>", "</template>", "<rt>r</rt>", "<img src>", "<td>",
+    "</td>", "<table>", "</table>", "<tr>", "<nobr>", ">", "'", "<a href='x>y'>", "<!DOCTYPE html>",
+    "< td>", "<td\n>", "<1", "<!--Anzahl Programmdurchlauefe-->",
+]
+
+
+def test_engines_match_on_report():
+    header, rows = _scan_events(REPORT)
+    assert (header, rows) == _scan_bs4(REPORT)
+    assert header["machine_time"] == "1:02:03"
+    assert rows[0] == [("", "DETAL_1.BMP"), ("NUMER CZĘŚCI: 1", None)]
+
+
+@pytest.mark.parametrize("fragment", ["<![CDATA[x]]>", "</ td>", "</tr>", "</b>", "<"])
+def test_engines_match_with_fragment(fragment):
+    for anchor in ("1:02:03", "<td>CZAS OB", "<p>", "</td></tr>"):
+        position = REPORT.find(anchor) + 3
+        document = REPORT[:position] + fragment + REPORT[position:]
+        assert _scan_events(document) == _scan_bs4(document)
+
+
+def test_engines_match_on_mutated_reports():
+    rng = random.Random(0)
+    for _ in range(300):
+        document = REPORT
+        for _ in range(rng.choice((1, 2, 4))):
+            position = rng.randrange(len(document) + 1)
+            document = document[:position] + rng.choice(FRAGMENTS) + document[position:]
+        assert _scan_events(document) == _scan_bs4(document), document
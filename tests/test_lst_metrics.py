@@ -0,0 +1,38 @@
+import pytest
+from lst_metrics import measure_geometry, measure_sections
+
+# Kwadrat 10 x 10 mm: jeden przejazd do punktu startowego i jeden kontur
+SQUARE = "N10G0X0Y0\nN20G1X10Y0\nN30G1X10Y10\nN40G1X0Y10\nN50G1X0Y0\n"
+
+
+@pytest.mark.parametrize("line", [
+    "PLATE_X500Y500",
+    "BLECH_100X50",
+    "BLECH_G1.5",
+    "(C:\\Geo\\G1X5Y5.GEO)",
+    "(X500 Y500",
+    "; G0 X500 Y500",
+])
+def test_text_lines_do_not_add_moves(line):
+    for block in (line + "\n" + SQUARE, SQUARE + line + "\n"):
+        for content in (block, block.encode("cp1250")):
+            metrics = measure_geometry(content)
+            assert metrics.pierce_count == 1
+            assert metrics.rapid_length == 0.0
+            assert metrics.cut_length == 40.0
+            assert metrics.area == 100.0
+
+
+def test_comment_after_motion_words():
+    metrics = measure_geometry("N10G0X0Y0\nN20 G1 X10 Y0 (X99 Y99) M07\nN30 G1 X10 Y10 ; G0 X50\n")
+    assert metrics.pierce_count == 1
+    assert metrics.rapid_length == 0.0
+    assert metrics.cut_length == 20.0
+
+
+def test_named_section_with_gcode_like_name():
+    content = "START_TEXT\n(C:\\Geo\\BLECH_G1.5.GEO)\n" + SQUARE + "STOP_TEXT\n"
+    [(name, metrics)] = measure_sections(content)
+    assert name == "BLECH_G1.5"
+    assert metrics.cut_length == 40.0
+    assert metrics.pierce_count == 1
@@ -0,0 +1,54 @@
+import os
+from lst_parser import LSTParser, SVG_PRECISION, SVG_SIMPLIFY_TOLERANCE
+
+# Kontur z punktem prawie współliniowym (usuwanym przez uproszczenie) i współrzędnymi
+# z wieloma miejscami po przecinku (zmienianymi przez zaokrąglenie)
+CONTENT = """BEGIN_PROGRAMM
+START_TEXT
+N10G90
+N20G0X0Y0
+N30G1X10.0004Y0
+N40G1X20Y0.01
+N50G1X20Y10.123456
+N60G1X0Y10
+N70G1X0Y0
+STOP_TEXT
+ENDE_PROGRAMM
+"""
+
+# Podgląd zapisany przez pierwotny parser (pełna geometria, bez zaokrągleń)
+EXPECTED_SVG = (
+    '<svg xmlns="http://www.w3.org/2000/svg" width="40.0" height="30.123455999999997" '
+    'viewBox="0 0 40.0 30.123455999999997">\n'
+    '  <polygon points="10.0,10.0 20.0004,10.0 30.0,10.01 30.0,20.123455999999997 10.0,20.0 10.0,10.0" '
+    'fill="none" stroke="black" stroke-width="1" />\n'
+    '</svg>'
+)
+
+
+def _saved_svgs(output_dir, **options):
+    parser = LSTParser()
+    parser.parse_content(CONTENT)
+    parser.save_details(str(output_dir), **options)
+    return [
+        open(os.path.join(output_dir, name), encoding="utf-8").read()
+        for name in sorted(os.listdir(output_dir))
+    ]
+
+
+def test_save_details_default_matches_unsimplified_output(tmp_path):
+    parser = LSTParser()
+    detail, = parser.parse_content(CONTENT)
+
+    default = _saved_svgs(tmp_path / "default")
+    unsimplified = _saved_svgs(tmp_path / "full", tolerance=0.0, precision=None)
+
+    assert default == unsimplified == [detail.to_svg_string()] == [EXPECTED_SVG]
+
+
+def test_save_details_simplifies_only_on_request(tmp_path):
+    simplified, = _saved_svgs(tmp_path, tolerance=SVG_SIMPLIFY_TOLERANCE, precision=SVG_PRECISION)
+
+    assert simplified != EXPECTED_SVG
+    assert "20.0004" not in simplified
+    assert "20.123" in simplified and "20.123455999999997" not in simplified
@@ -0,0 +1,83 @@
+import pytest
+from lst_program import parse_lst, parse_lst_file
+
+# Nagłówek programu z tabelą technologiczną (materiał i grubość w jednym polu)
+HEADER = """BEGIN_EINRICHTEPLAN_INFO
+ZA,MM,1
+MM,AT,1,'   ',1,2,1,1,'Technologietabelle',T,'C1'
+ZA,DA,1
+DA,'1.4301-2 3000x1500'
+ENDE_EINRICHTEPLAN_INFO
+"""
+
+# Nagłówek z osobnymi kolumnami materiału i grubości
+COLUMNS_HEADER = """BEGIN_EINRICHTEPLAN_INFO
+ZA,MM,2
+MM,AT,1,'   ',1,2,1,1,'Material',T,'C1'
+MM,AT,1,'   ',2,2,1,1,'Blechdicke',T,'C2'
+ZA,DA,1
+DA,'1.0038',4.000
+ENDE_EINRICHTEPLAN_INFO
+"""
+
+# Trzy detale; sekcje geometrii w odwrotnej kolejności niż rekordy DA, trzeci rekord bez sekcji
+CONTENT = """BEGIN_PARTS_IN_PROGRAM
+ZA,DA,3
+DA,'C:\\Geometrie\\KWADRAT.GEO',1,1.00,10.000,10.000,0.500,1,0,
+*99.000,0,0,0,10.000,10.000,0,5.000,5.000
+DA,'C:\\Geometrie\\PASEK.GEO',2,1.00,20.000,5.000,0.500,2,0,
+*77.000,0,0,0,20.000,5.000,0,10.000,2.500
+DA,'C:\\Geometrie\\BRAK.GEO',1,1.00,1.000,1.000,0.100,3,0,
+*4.000,0,0,0,1.000,1.000,0,0.500,0.500
+ENDE_PARTS_IN_PROGRAM
+BEGIN_PROGRAMM
+START_TEXT
+(C:\\Geometrie\\pasek.geo)
+N10G0X0Y0
+N20G1X20Y0
+N30G1X20Y5
+N40G1X0Y5
+N50G1X0Y0
+STOP_TEXT
+START_TEXT
+(C:\\Geometrie\\KWADRAT.GEO)
+N60G0X0Y0
+N70G1X10Y0
+N80G1X10Y10
+N90G1X0Y10
+N100G1X0Y0
+STOP_TEXT
+ENDE_PROGRAMM
+"""
+
+
+def test_cut_length_joined_by_geo_name(tmp_path):
+    path = tmp_path / "program.LST"
+    path.write_text(HEADER + CONTENT, encoding="cp1250")
+    program = parse_lst(str(path))
+    lengths = {detail.name: detail.cut_length for detail in program.details}
+    # Geometria przypisana po nazwie pliku GEO, nie po pozycji sekcji
+    assert lengths["KWADRAT"] == 40.0
+    assert lengths["PASEK"] == 50.0
+    # Detal bez sekcji geometrii – długość z kolumny Schnittlaenge
+    assert lengths["BRAK"] == 4.0
+
+
+def test_material_and_thickness_from_header(tmp_path):
+    path = tmp_path / "program.LST"
+    path.write_text(COLUMNS_HEADER + CONTENT, encoding="cp1250")
+    program = parse_lst(str(path))
+    assert (program.material, program.thicknes) == ("1.0038", 4.0)
+
+    path.write_text(HEADER + CONTENT, encoding="cp1250")
+    program = parse_lst(str(path))
+    assert (program.material, program.thicknes) == ("1.4301", 2.0)
+
+
+def test_program_without_material_is_rejected(tmp_path):
+    path = tmp_path / "program.LST"
+    path.write_text(CONTENT, encoding="cp1250")
+    with pytest.raises(ValueError, match="materiału i grubości"):
+        parse_lst(str(path))
+    with pytest.raises(ValueError, match="materiału i grubości"):
+        parse_lst_file(str(path))
@@ -1,9 +1,11 @@
+import hashlib
 import os
 import re
 import shutil
 import uuid
+import io
 import atexit
-from PIL import Image
+import threading
 
 def normalize_filename(name: str) -> str:
     """
@@ -12,24 +14,146 @@ def normalize_filename(name: str) -> str:
     """
     return re.sub(r'\s+', ' ', name).strip()
 
+class DirectoryIndex:
+    """
+    Indeks plików katalogu (rekursywnie): znormalizowana nazwa (lower) -> pełna ścieżka.
+    Przy powtarzającej się nazwie wygrywa pierwszy plik w kolejności os.walk,
+    tak jak przy przeszukiwaniu katalogu plik po pliku.
+    Zapamiętuje mtime każdego podkatalogu – zmiana zawartości któregokolwiek
+    z nich unieważnia indeks.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.by_name = {}
+        self.top_level = []  # nazwy plików bezpośrednio w katalogu (kolejność os.listdir)
+        self.mtimes = {}
+        for root, dirs, files in os.walk(directory):
+            try:
+                self.mtimes[root] = os.stat(root).st_mtime_ns
+            except OSError:
+                continue
+            if root == directory:
+                self.top_level = list(files)
+            for f in files:
+                self.by_name.setdefault(normalize_filename(f).lower(), os.path.join(root, f))
+
+    def is_stale(self) -> bool:
+        try:
+            if os.stat(self.directory).st_mtime_ns != self.mtimes.get(self.directory):
+                return True
+        except OSError:
+            return True
+        for root, mtime in self.mtimes.items():
+            try:
+                if os.stat(root).st_mtime_ns != mtime:
+                    return True
+            except OSError:
+                return True
+        return False
+
+    def find(self, target_name: str) -> str:
+        return self.by_name.get(normalize_filename(target_name).lower())
+
+    def match_top_level(self, fragment: str, extension: str) -> list:
+        """
+        Pliki z samego katalogu (bez podkatalogów), których nazwa zawiera 'fragment'
+        i kończy się rozszerzeniem 'extension' – odpowiednik glob("*fragment*.ext").
+        Porównanie bez rozróżniania wielkości liter, jak glob w Windows (X.BMP pasuje do ".bmp").
+        """
+        fragment = fragment.casefold()
+        extension = extension.casefold()
+        matches = []
+        for f in self.top_level:
+            name = f.casefold()
+            if not f.startswith('.') and name.endswith(extension) and fragment in name[:len(name) - len(extension)]:
+                matches.append(os.path.join(self.directory, f))
+        return matches
+
+    def signature(self, extensions: tuple) -> str:
+        """
+        Skrót nazw, rozmiarów i czasów modyfikacji plików o podanych rozszerzeniach,
+        które zwraca find() – zmienia się także przy nadpisaniu pliku (bez zmiany mtime katalogu).
+        """
+        digest = hashlib.sha256()
+        for name, path in sorted(self.by_name.items()):
+            if not name.endswith(extensions):
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            digest.update(f"{name}\0{st.st_size}\0{st.st_mtime_ns}\n".encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+
+_directory_indexes = {}
+_directory_indexes_lock = threading.Lock()
+
+
+def get_directory_index(directory: str) -> DirectoryIndex:
+    """
+    Zwraca indeks plików katalogu. Indeks jest budowany raz i trzymany między
+    kolejnymi parsowaniami; przebudowujemy go tylko, gdy zmienił się mtime katalogu.
+    Pusty katalog (os.path.dirname samej nazwy pliku) oznacza bieżący katalog roboczy.
+    """
+    directory = os.path.abspath(directory or os.curdir)
+    with _directory_indexes_lock:
+        index = _directory_indexes.get(directory)
+    if index is None or index.is_stale():
+        index = DirectoryIndex(directory)
+        with _directory_indexes_lock:
+            _directory_indexes[directory] = index
+    return index
+
+
 def find_file_recursive(directory: str, target_name: str) -> str:
     """
     Przeszukuje katalog 'directory' (rekursywnie) w poszukiwaniu pliku,
     którego znormalizowana nazwa (porównanie case-insensitive)
     odpowiada 'target_name' (również znormalizowanej).
     Zwraca pełną ścieżkę do pliku, jeśli zostanie znaleziony, lub None.
+    Korzysta z indeksu katalogu zamiast przechodzić go przy każdym wywołaniu.
     """
-    target_norm = normalize_filename(target_name).lower()
-    for root, dirs, files in os.walk(directory):
-        for f in files:
-            if normalize_filename(f).lower() == target_norm:
-                return os.path.join(root, f)
-    return None
+    return get_directory_index(directory).find(target_name)
 
-# Ustawiamy TEMP_IMAGE_DIR jako podfolder "generated" w katalogu static/images
+# Ustawiamy TEMP_IMAGE_DIR jako podfolder "generated" w katalogu static/images.
+# Katalog powstaje dopiero przy zapisie pierwszego obrazu, a czyszczenie przy wyjściu
+# (clear_generated_images) jest rejestrowane wtedy w atexit – samo importowanie modułu
+# nie ma skutków ubocznych (także w procesach roboczych puli).
 TEMP_IMAGE_DIR = os.path.join(os.getcwd(), "static", "images", "generated")
-if not os.path.exists(TEMP_IMAGE_DIR):
-    os.makedirs(TEMP_IMAGE_DIR)
+DEFAULT_TEMP_IMAGE_DIR = TEMP_IMAGE_DIR
+
+_cleanup_registered = False
+_cleanup_lock = threading.Lock()
+
+
+def ensure_temp_image_dir() -> str:
+    """Tworzy TEMP_IMAGE_DIR (jeśli trzeba) i rejestruje jego czyszczenie przy wyjściu z procesu."""
+    global _cleanup_registered
+    if not _cleanup_registered:
+        with _cleanup_lock:
+            if not _cleanup_registered:
+                atexit.register(clear_generated_images)
+                _cleanup_registered = True
+    os.makedirs(TEMP_IMAGE_DIR, exist_ok=True)
+    return TEMP_IMAGE_DIR
+
+
+def set_temp_image_dir(directory: str):
+    """
+    Zmienia katalog zapisu obrazów detali w bieżącym procesie (np. katalog tymczasowy
+    przetwarzania wsadowego), aby nie zapełniać static/images/generated aplikacji.
+    """
+    global TEMP_IMAGE_DIR
+    TEMP_IMAGE_DIR = directory
+
+
+def _image_path(unique_name: str) -> str:
+    """URL względny obrazu w static/images/generated albo pełna ścieżka w katalogu ustawionym przez set_temp_image_dir."""
+    if TEMP_IMAGE_DIR == DEFAULT_TEMP_IMAGE_DIR:
+        return os.path.join("static", "images", "generated", unique_name)
+    return os.path.join(TEMP_IMAGE_DIR, unique_name)
 
 
 def copy_image_to_static(image_path: str) -> str:
@@ -39,15 +163,14 @@ def copy_image_to_static(image_path: str) -> str:
     Zwraca URL względny, np. "static/images/generated/nazwa_pliku_unikalna.png".
     """
     # Używamy TEMP_IMAGE_DIR jako docelowego katalogu
-    dest_dir = TEMP_IMAGE_DIR
-    if not os.path.exists(dest_dir):
-        os.makedirs(dest_dir)
+    dest_dir = ensure_temp_image_dir()
     base_name = os.path.basename(image_path)
     name, ext = os.path.splitext(base_name)
 
     # Jeśli obraz jest BMP, konwertuj do PNG
     if ext.lower() == ".bmp":
         try:
+            from PIL import Image
             img = Image.open(image_path)
             unique_name = f"{name}_{uuid.uuid4().hex}.png"
             dest_path = os.path.join(dest_dir, unique_name)
@@ -64,13 +187,56 @@ def copy_image_to_static(image_path: str) -> str:
         shutil.copy(image_path, dest_path)
 
     # Zwracamy ścieżkę względną, uwzględniając folder "generated"
-    return os.path.join("static", "images", "generated", unique_name)
+    return _image_path(unique_name)
+
+# Formaty, które przeglądarka wyświetla bez konwersji
+WEB_IMAGE_FORMATS = {"png", "jpg", "jpeg"}
+
+# Skrót treści obrazu -> zapisany plik; ten sam obraz nie jest kodowany ani zapisywany ponownie
+_saved_images = {}
+
+
+def save_image_bytes(name: str, data: bytes, ext: str, digest: str = None) -> str:
+    """
+    Zapisuje obraz przekazany jako bajty bezpośrednio do TEMP_IMAGE_DIR (jeden zapis na dysk).
+    Formaty nieobsługiwane przez przeglądarkę (np. BMP) są konwertowane do PNG w pamięci.
+    Zwraca URL względny, np. "static/images/generated/nazwa_pliku_unikalna.png".
+    """
+    if digest is not None:
+        saved = _saved_images.get(digest)
+        if saved and os.path.exists(saved):
+            return saved
+    ensure_temp_image_dir()
+    ext = ext.lower().lstrip(".")
+    if ext not in WEB_IMAGE_FORMATS:
+        try:
+            from PIL import Image
+            img = Image.open(io.BytesIO(data))
+            buffer = io.BytesIO()
+            img.save(buffer, format="PNG")
+            data = buffer.getvalue()
+            ext = "png"
+        except Exception as e:
+            print("Błąd konwersji obrazu:", e)
+    unique_name = f"{name}_{uuid.uuid4().hex}.{ext}"
+    with open(os.path.join(TEMP_IMAGE_DIR, unique_name), "wb") as f:
+        f.write(data)
+    rel_path = _image_path(unique_name)
+    if digest is not None:
+        _saved_images[digest] = rel_path
+    return rel_path
+
+def store_pdf_image(image) -> str:
+    """Zapisuje obraz PdfImage do katalogu statycznego i zwraca jego URL względny."""
+    return save_image_bytes(image.name, image.data, image.ext, image.digest)
 
 def clear_generated_images():
     """
     Usuwa wszystkie pliki w katalogu TEMP_IMAGE_DIR ("static/images/generated"),
     pozostawiając sam folder oraz inne pliki w static/images nietknięte.
     """
+    if not os.path.isdir(TEMP_IMAGE_DIR):
+        return
     for filename in os.listdir(TEMP_IMAGE_DIR):
         file_path = os.path.join(TEMP_IMAGE_DIR, filename)
         try:
@@ -79,5 +245,4 @@ def clear_generated_images():
                 print(f"Usunięto: {file_path}")
         except Exception as e:
             print(f"Błąd przy usuwaniu {file_path}: {e}")
-
-atexit.register(clear_generated_images)
+    _saved_images.clear()